@@ -0,0 +1,132 @@
+"""
+Сквозной бенчмарк проверки позиций на локальной заглушке витрины.
+
+Поднимает StubStorefront, направляет на него settings.WB_SEARCH_URL и
+settings.WB_SEARCH_API_URL и выполняет серию проверок через WildberriesParser.
+Печатает перцентили задержки проверки, число страниц в секунду, процессорное
+время и память (вместе с процессами браузера) на одну проверку.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_e2e [--backend playwright|api] [--checks N] [--latency SEC]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from config import settings
+from utils import log
+from parser import WildberriesParser, PageCache
+from .stats import ResourceSampler, summarize
+from .storefront import StubStorefront
+
+
+async def run_checks(storefront: StubStorefront, args: argparse.Namespace) -> Dict[str, List[float]]:
+    """
+    Выполняет серию проверок и собирает замеры по каждой.
+
+    Args:
+        storefront: Запущенная заглушка витрины
+        args: Параметры бенчмарка
+
+    Returns:
+        Словарь со списками замеров: latency_ms, pages, cpu_s, rss_mb и числом ошибок в errors
+    """
+    rng = random.Random(args.seed)
+    sampler = ResourceSampler()
+    page_cache = PageCache(ttl=args.page_cache_ttl) if args.page_cache_ttl else None
+    parser = WildberriesParser(backend=args.backend, page_cache=page_cache)
+    samples = {"latency_ms": [], "pages": [], "cpu_s": [], "rss_mb": [], "errors": [0]}
+
+    try:
+        await parser.initialize()
+        for check in range(args.warmup + args.checks):
+            search_query = f"запрос {check % args.queries}"
+            expected = {}
+            for _ in range(args.articles):
+                position = rng.randint(1, args.pages * args.page_size)
+                article = storefront.article_at(search_query, position)
+                expected.setdefault(article, position)
+
+            pages_before = sum(storefront.requests.values())
+            cpu_before = sampler.cpu_seconds()
+            started = time.perf_counter()
+            positions, _ = await parser.search_articles_positions(search_query, list(expected))
+            latency = time.perf_counter() - started
+
+            if check < args.warmup:
+                continue
+
+            samples["latency_ms"].append(latency * 1000)
+            samples["pages"].append(sum(storefront.requests.values()) - pages_before)
+            samples["cpu_s"].append(sampler.cpu_seconds() - cpu_before)
+            samples["rss_mb"].append(sampler.rss_mb())
+            samples["errors"][0] += sum(1 for article, position in expected.items()
+                                        if positions.get(article) != position)
+    finally:
+        await parser.close()
+
+    return samples
+
+
+def main():
+    """Запускает бенчмарк и печатает сводку."""
+    arg_parser = argparse.ArgumentParser(description="Сквозной бенчмарк проверки позиций на заглушке витрины")
+    arg_parser.add_argument("--backend", choices=["playwright", "api"], default=settings.WB_SEARCH_BACKEND,
+                            help="Бэкенд получения выдачи")
+    arg_parser.add_argument("--checks", type=int, default=20, help="Количество измеряемых проверок")
+    arg_parser.add_argument("--warmup", type=int, default=2, help="Количество проверок для прогрева")
+    arg_parser.add_argument("--queries", type=int, default=5, help="Количество разных запросов")
+    arg_parser.add_argument("--articles", type=int, default=1, help="Артикулов в одной проверке")
+    arg_parser.add_argument("--pages", type=int, default=5, help="Страниц выдачи по каждому запросу")
+    arg_parser.add_argument("--page-size", type=int, default=settings.WB_PAGE_SIZE, help="Карточек на странице")
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="Задержка ответа заглушки в секундах")
+    arg_parser.add_argument("--concurrency", type=int, default=settings.WB_PAGE_CONCURRENCY,
+                            help="Одновременно загружаемых страниц")
+    arg_parser.add_argument("--page-cache-ttl", type=int, default=0,
+                            help="Время жизни кэша страниц в секундах (0 - без кэша)")
+    arg_parser.add_argument("--data-dir", type=Path, default=None, help="Каталог с сохраненными страницами *.html")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Зерно выбора артикулов")
+    arg_parser.add_argument("--log-level", default="ERROR", help="Уровень логирования парсера")
+    args = arg_parser.parse_args()
+
+    log.remove()
+    log.add(sys.stderr, level=args.log_level)
+
+    with StubStorefront(pages_per_query=args.pages, page_size=args.page_size,
+                        latency=args.latency, data_dir=args.data_dir) as storefront:
+        settings.WB_SEARCH_URL = storefront.search_url
+        settings.WB_SEARCH_API_URL = storefront.api_url
+        settings.WB_PAGE_SIZE = args.page_size
+        settings.WB_PAGE_CONCURRENCY = args.concurrency
+        # Обход заканчивается на странице "ничего не найдено", а не на пределе безопасного поиска
+        settings.SAFE_SEARCH = False
+        # Заглушка локальная: ограничитель частоты измерял бы собственный предел, а не парсер
+        settings.RATE_LIMIT_ENABLED = False
+
+        started = time.perf_counter()
+        samples = asyncio.run(run_checks(storefront, args))
+        elapsed = sum(samples["latency_ms"]) / 1000
+
+    latency = summarize(samples["latency_ms"])
+    pages = sum(samples["pages"])
+    checks = len(samples["latency_ms"])
+
+    print(f"бэкенд: {args.backend}, проверок: {checks}, задержка заглушки: {args.latency * 1000:.0f} мс, "
+          f"параллельных страниц: {args.concurrency}")
+    print(f"задержка проверки, мс: p50 {latency['p50']:.1f}  p90 {latency['p90']:.1f}  "
+          f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}")
+    print(f"страниц: {pages} ({pages / max(checks, 1):.1f} на проверку), "
+          f"страниц в секунду: {pages / elapsed if elapsed else 0:.1f}")
+    print(f"CPU на проверку, с: p50 {summarize(samples['cpu_s'])['p50']:.3f}  "
+          f"всего {sum(samples['cpu_s']):.2f}")
+    print(f"RSS с дочерними процессами, МБ: p50 {summarize(samples['rss_mb'])['p50']:.0f}  "
+          f"max {summarize(samples['rss_mb'])['max']:.0f}")
+    print(f"неверных позиций: {samples['errors'][0]}, общее время: {time.perf_counter() - started:.1f} с")
+
+
+if __name__ == "__main__":
+    main()
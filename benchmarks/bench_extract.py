@@ -0,0 +1,122 @@
+"""
+Микробенчмарк извлечения артикулов со страницы выдачи.
+
+Сравнивает исходный разбор BeautifulSoup, сканер HTML и сбор артикулов
+в браузере одним вызовом evaluate по скорости и пиковой памяти, а также
+поиск позиции последнего товара страницы через WildberriesParser._find_article_position.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_extract [--data-dir DIR] [--repeat N] [--browser]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from parser import ArticleExtractor, WildberriesParser
+from .pages import load_pages
+
+
+def measure(extract: Callable[[str], List[str]], html_content: str, repeat: int) -> Dict[str, float]:
+    """
+    Измеряет время и пиковую память функции извлечения.
+
+    Args:
+        extract: Функция извлечения артикулов из HTML
+        html_content: HTML страницы
+        repeat: Количество повторов
+
+    Returns:
+        Словарь с медианным временем (мс) и пиковой памятью (КБ)
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        extract(html_content)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    extract(html_content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"median_ms": statistics.median(timings), "peak_kb": peak / 1024}
+
+
+async def measure_browser(pages: Dict[str, str], repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Измеряет сбор артикулов в браузере через ArticleExtractor.from_page.
+
+    Args:
+        pages: Словарь имя страницы -> HTML
+        repeat: Количество повторов
+
+    Returns:
+        Словарь имя страницы -> медианное время (мс)
+    """
+    from playwright.async_api import async_playwright
+
+    results = {}
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        page = await browser.new_page()
+        for name, html_content in pages.items():
+            await page.set_content(html_content)
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await ArticleExtractor.from_page(page)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            # Для сравнения: выгрузка HTML, которую заменяет сбор в браузере
+            started = time.perf_counter()
+            await page.content()
+            content_ms = (time.perf_counter() - started) * 1000
+
+            results[name] = {"median_ms": statistics.median(timings), "content_ms": content_ms}
+        await browser.close()
+
+    return results
+
+
+def main():
+    """Запускает бенчмарк и печатает таблицу результатов."""
+    arg_parser = argparse.ArgumentParser(description="Бенчмарк извлечения артикулов из выдачи")
+    arg_parser.add_argument("--data-dir", type=Path, default=None, help="Каталог с сохраненными страницами *.html")
+    arg_parser.add_argument("--repeat", type=int, default=20, help="Количество повторов")
+    arg_parser.add_argument("--browser", action="store_true", help="Измерить также сбор артикулов в браузере")
+    args = arg_parser.parse_args()
+
+    pages = load_pages(args.data_dir)
+    parser = WildberriesParser()
+    strategies = {
+        "bs4": ArticleExtractor.from_html_bs4,
+        "scanner": ArticleExtractor.from_html,
+    }
+
+    print(f"{'страница':<28}{'КБ':>8}{'карточек':>10}  {'стратегия':<10}{'медиана, мс':>13}{'пик, КБ':>11}")
+    for name, html_content in pages.items():
+        expected = ArticleExtractor.from_html_bs4(html_content)
+        for strategy, extract in strategies.items():
+            if extract(html_content) != expected:
+                raise AssertionError(f"{strategy}: результат не совпадает с bs4 на {name}")
+
+            result = measure(extract, html_content, args.repeat)
+            print(f"{name:<28}{len(html_content) / 1024:>8.0f}{len(expected):>10}  {strategy:<10}"
+                  f"{result['median_ms']:>13.2f}{result['peak_kb']:>11.0f}")
+
+        if expected:
+            result = measure(lambda html: parser._find_article_position(html, expected[-1]), html_content, args.repeat)
+            print(f"{name:<28}{'':>8}{'':>10}  {'position':<10}{result['median_ms']:>13.2f}{result['peak_kb']:>11.0f}")
+
+    if args.browser:
+        for name, result in asyncio.run(measure_browser(pages, args.repeat)).items():
+            print(f"{name:<28}{'':>8}{'':>10}  {'browser':<10}{result['median_ms']:>13.2f}"
+                  f"   (page.content(): {result['content_ms']:.2f} мс)")
+
+
+if __name__ == "__main__":
+    main()
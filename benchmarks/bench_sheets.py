@@ -0,0 +1,84 @@
+"""
+Бенчмарк записи результатов в Google Sheets на заглушке сервиса.
+
+Сравнивает запись по одной строке (GoogleSheetsClient.add_position_data:
+чтение столбцов и запись строки на каждый результат) с BufferedSheetsWriter
+по времени и числу вызовов API.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_sheets [--rows N] [--latency SEC] [--flush-size N]
+"""
+import argparse
+import sys
+import time
+from typing import Dict
+
+from utils import log, GoogleSheetsClient, BufferedSheetsWriter
+from .fake_sheets import FakeSheetsClient
+
+
+def bench_per_row(rows: int, latency: float) -> Dict[str, float]:
+    """
+    Записывает строки по одной через GoogleSheetsClient.add_position_data.
+
+    Args:
+        rows: Количество строк
+        latency: Задержка вызова API в секундах
+
+    Returns:
+        Словарь с временем (с), числом вызовов API и записанных строк
+    """
+    client = FakeSheetsClient(latency, spreadsheet_id="per-row")
+    started = time.perf_counter()
+    for index in range(rows):
+        GoogleSheetsClient.add_position_data(client, "2024-01-01 00:00:00", str(index), index + 1, "запрос")
+    elapsed = time.perf_counter() - started
+    return {"seconds": elapsed, "calls": sum(client.service.calls.values()), "rows": len(client.service.rows) - 1}
+
+
+def bench_buffered(rows: int, latency: float, flush_size: int) -> Dict[str, float]:
+    """
+    Записывает строки через BufferedSheetsWriter.
+
+    Args:
+        rows: Количество строк
+        latency: Задержка вызова API в секундах
+        flush_size: Размер буфера
+
+    Returns:
+        Словарь с временем (с), числом вызовов API и записанных строк
+    """
+    client = FakeSheetsClient(latency, spreadsheet_id=f"buffered-{flush_size}")
+    started = time.perf_counter()
+    with BufferedSheetsWriter(client, max_rows=flush_size, max_delay=3600) as writer:
+        for index in range(rows):
+            writer.add("2024-01-01 00:00:00", str(index), index + 1, "запрос")
+    elapsed = time.perf_counter() - started
+    return {"seconds": elapsed, "calls": sum(client.service.calls.values()), "rows": len(client.service.rows) - 1}
+
+
+def main():
+    """Запускает бенчмарк и печатает таблицу результатов."""
+    arg_parser = argparse.ArgumentParser(description="Бенчмарк записи результатов в Google Sheets")
+    arg_parser.add_argument("--rows", type=int, default=200, help="Количество строк")
+    arg_parser.add_argument("--latency", type=float, default=0.1, help="Задержка вызова API в секундах")
+    arg_parser.add_argument("--flush-size", type=int, default=100, help="Размер буфера BufferedSheetsWriter")
+    arg_parser.add_argument("--log-level", default="ERROR", help="Уровень логирования парсера")
+    args = arg_parser.parse_args()
+
+    log.remove()
+    log.add(sys.stderr, level=args.log_level)
+
+    results = {
+        "по одной строке": bench_per_row(args.rows, args.latency),
+        f"буфер {args.flush_size}": bench_buffered(args.rows, args.latency, args.flush_size),
+    }
+
+    print(f"{'способ':<18}{'строк':>8}{'вызовов API':>13}{'время, с':>11}{'строк/с':>10}")
+    for name, result in results.items():
+        print(f"{name:<18}{result['rows']:>8}{result['calls']:>13}{result['seconds']:>11.2f}"
+              f"{result['rows'] / result['seconds']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Бенчмарк времени запуска main.py в каждом режиме.
+
+Каждый режим запускается в отдельном процессе интерпретатора. Справка выполняется
+целиком (python main.py); для остальных режимов измеряется путь до запуска сервиса:
+импорт main.py, настройка логирования и импорт сервиса режима, без подключения к
+Google Sheets, Redis и витрине. Для каждого режима печатаются перцентили времени
+запуска и тяжелые пакеты, которые режим загрузил.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_startup [--runs N] [--importtime] [--top N]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .stats import summarize
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Пакеты проекта (в отчете --importtime учитываются только сторонние пакеты)
+PROJECT_PACKAGES = {"main", "config", "services", "tasks", "parser", "utils"}
+# Пакеты, загрузка которых заметна во времени запуска
+HEAVY_PACKAGES = ["celery", "billiard", "googleapiclient", "playwright", "aiohttp", "bs4", "redis", "psutil"]
+
+# Режим -> код, который выполняет процесс режима
+MODES = {
+    "python": "pass",
+    "справка": "import sys, main; sys.argv = ['main.py']; main.main()",
+    "--check": "import main; main.setup_logging(); from services import CheckService",
+    "--worker": "import main; main.setup_logging(); from services import WorkerService",
+    "--beat": "import main; main.setup_logging(); from services import BeatService",
+    "--start": "import main; main.setup_logging(); from services import CeleryProcessManager",
+}
+
+# Печатает в последней строке вывода загруженные тяжелые пакеты
+_REPORT_MODULES = (
+    "\nimport json as _json, sys as _sys\n"
+    f"print(_json.dumps([name for name in {HEAVY_PACKAGES!r} if name in _sys.modules]))"
+)
+
+
+def run_mode(code: str, importtime: bool = False) -> Tuple[float, List[str], str]:
+    """
+    Выполняет код режима в новом процессе интерпретатора.
+
+    Args:
+        code: Код режима
+        importtime: Запустить интерпретатор с -X importtime
+
+    Returns:
+        Кортеж (время от запуска до завершения процесса в мс, загруженные тяжелые пакеты,
+        вывод -X importtime)
+    """
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code + _REPORT_MODULES]
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"Режим завершился с ошибкой:\n{result.stderr}")
+    return elapsed_ms, json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def top_imports(importtime_output: str, count: int) -> List[Tuple[str, float]]:
+    """
+    Выбирает сторонние пакеты с наибольшим временем импорта.
+
+    Время пакета - наибольшее суммарное (cumulative) время среди его модулей,
+    то есть время первого импорта пакета со всеми зависимостями.
+
+    Args:
+        importtime_output: Вывод -X importtime
+        count: Число пакетов
+
+    Returns:
+        Список (пакет, время импорта в мс)
+    """
+    totals: Dict[str, float] = {}
+    for line in importtime_output.splitlines():
+        parts = line[len("import time:"):].split("|") if line.startswith("import time:") else []
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        package = parts[2].strip().split(".")[0]
+        if package in PROJECT_PACKAGES:
+            continue
+        totals[package] = max(totals.get(package, 0.0), int(parts[1]) / 1000)
+    return sorted(totals.items(), key=lambda item: -item[1])[:count]
+
+
+def main():
+    """Запускает бенчмарк и печатает таблицу результатов."""
+    arg_parser = argparse.ArgumentParser(description="Бенчмарк времени запуска main.py по режимам")
+    arg_parser.add_argument("--runs", type=int, default=10, help="Количество запусков каждого режима")
+    arg_parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES), help="Режимы запуска")
+    arg_parser.add_argument("--importtime", action="store_true",
+                            help="Показать самые долгие импорты сторонних пакетов в каждом режиме (-X importtime)")
+    arg_parser.add_argument("--top", type=int, default=5, help="Число пакетов в отчете --importtime")
+    args = arg_parser.parse_args()
+
+    # Прогрев: компиляция байт-кода и файловый кэш не должны попадать в замеры
+    for mode in args.modes:
+        run_mode(MODES[mode])
+
+    print(f"{'режим':<10}{'p50, мс':>9}{'p90, мс':>9}{'max, мс':>9}  загруженные пакеты")
+    for mode in args.modes:
+        samples, loaded = [], []
+        for _ in range(args.runs):
+            elapsed_ms, loaded, _ = run_mode(MODES[mode])
+            samples.append(elapsed_ms)
+        stats = summarize(samples)
+        print(f"{mode:<10}{stats['p50']:>9.0f}{stats['p90']:>9.0f}{stats['max']:>9.0f}  {', '.join(loaded) or '-'}")
+
+    if args.importtime:
+        for mode in args.modes:
+            _, _, output = run_mode(MODES[mode], importtime=True)
+            imports = ", ".join(f"{name} {ms:.0f}" for name, ms in top_imports(output, args.top))
+            print(f"{mode}: {imports or '-'} (мс)")
+
+
+if __name__ == "__main__":
+    main()
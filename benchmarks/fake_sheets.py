@@ -0,0 +1,105 @@
+"""
+Заглушка сервиса Google Sheets для бенчмарков записи результатов.
+
+Повторяет цепочку вызовов service.spreadsheets().values().get/update/append(...).execute(),
+которую используют GoogleSheetsClient и BufferedSheetsWriter, и добавляет
+к каждому вызову задержку сети.
+"""
+import re
+import threading
+import time
+from typing import Dict, List
+
+_ROW_RE = re.compile(r"[A-Z]+(\d+)")
+
+
+class FakeSheetsService:
+    """Сервис Google Sheets в памяти с подсчетом вызовов API."""
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Инициализация сервиса.
+
+        Args:
+            latency: Задержка каждого вызова API в секундах
+        """
+        self.latency = latency
+        self.rows: List[list] = []
+        self.calls: Dict[str, int] = {"get": 0, "update": 0, "append": 0}
+        self._lock = threading.Lock()
+
+    def spreadsheets(self) -> "FakeSheetsService":
+        return self
+
+    def values(self) -> "FakeSheetsService":
+        return self
+
+    def get(self, spreadsheetId: str, range: str) -> "_Request":
+        return _Request(self, "get", range)
+
+    def update(self, spreadsheetId: str, range: str, valueInputOption: str, body: dict) -> "_Request":
+        return _Request(self, "update", range, body["values"])
+
+    def append(self, spreadsheetId: str, range: str, valueInputOption: str,
+               insertDataOption: str, body: dict) -> "_Request":
+        return _Request(self, "append", range, body["values"])
+
+    def execute(self, method: str, cell_range: str, values: List[list]) -> dict:
+        """Выполняет вызов API над строками в памяти."""
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            self.calls[method] += 1
+            if method == "get":
+                start, end = self._bounds(cell_range)
+                values = [list(row) for row in self.rows[start:end]]
+                # Как и настоящий API, не возвращаем пустые строки в конце диапазона
+                while values and not values[-1]:
+                    values.pop()
+                return {"values": values}
+
+            if method == "append":
+                self.rows.extend(list(row) for row in values)
+            else:
+                start, _ = self._bounds(cell_range)
+                while len(self.rows) < start + len(values):
+                    self.rows.append([])
+                self.rows[start:start + len(values)] = [list(row) for row in values]
+            return {}
+
+    @staticmethod
+    def _bounds(cell_range: str):
+        """Возвращает границы строк диапазона вида A2:D2 или A:D (с нуля, конец не включительно)."""
+        rows = [int(match) for match in _ROW_RE.findall(cell_range)]
+        if not rows:
+            return 0, None
+        return rows[0] - 1, rows[1] if len(rows) > 1 else None
+
+
+class _Request:
+    """Отложенный вызов API, выполняемый методом execute()."""
+
+    def __init__(self, service: FakeSheetsService, method: str, cell_range: str, values: List[list] = None):
+        self.service = service
+        self.method = method
+        self.cell_range = cell_range
+        self.values = values or []
+
+    def execute(self) -> dict:
+        return self.service.execute(self.method, self.cell_range, self.values)
+
+
+class FakeSheetsClient:
+    """Клиент с интерфейсом GoogleSheetsClient, работающий с FakeSheetsService."""
+
+    def __init__(self, latency: float = 0.0, spreadsheet_id: str = "benchmark"):
+        """
+        Инициализация клиента.
+
+        Args:
+            latency: Задержка каждого вызова API в секундах
+            spreadsheet_id: Идентификатор таблицы
+        """
+        self.spreadsheet_id = spreadsheet_id
+        self.service = FakeSheetsService(latency)
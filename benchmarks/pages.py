@@ -0,0 +1,90 @@
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Каталог с сохраненными страницами выдачи Wildberries (*.html)
+DATA_DIR = Path(__file__).parent / "data"
+
+_CARD_TEMPLATE = """
+<article id="c{nm_id}" class="product-card product-card--hoverable j-card-item" data-nm-id="{nm_id}" data-card-index="{index}">
+  <div class="product-card__wrapper">
+    <a class="product-card__link j-card-link" href="https://www.wildberries.ru/catalog/{nm_id}/detail.aspx" aria-label="Товар {nm_id}"></a>
+    <div class="product-card__img-wrap"><img class="j-thumbnail" src="//basket-01.wbbasket.ru/vol{vol}/part{part}/{nm_id}/images/c246x328/1.webp" alt="Товар"></div>
+    <div class="product-card__middle-wrap">
+      <p class="product-card__price price"><span class="price__wrap"><ins class="price__lower-price">{price}&nbsp;₽</ins></span></p>
+      <h2 class="product-card__brand-wrap"><span class="product-card__brand">Бренд {brand}</span><span class="product-card__name">&nbsp;/ Товар {nm_id}</span></h2>
+      <p class="product-card__rating-wrap"><span class="address-rate-mini">4,{rating}</span><span class="product-card__count">{reviews} оценок</span></p>
+    </div>
+  </div>
+</article>"""
+
+
+def generate_nm_ids(count: int, seed: int = 0) -> List[str]:
+    """
+    Генерирует уникальные артикулы для синтетической выдачи.
+
+    Args:
+        count: Количество артикулов
+        seed: Зерно генератора
+
+    Returns:
+        Список артикулов
+    """
+    rng = random.Random(seed)
+    return [str(nm_id) for nm_id in rng.sample(range(10_000_000, 400_000_000), count)]
+
+
+def render_search_page(nm_ids: List[str], query: str = "запрос") -> str:
+    """
+    Собирает HTML страницы выдачи с разметкой карточек как на витрине.
+
+    Args:
+        nm_ids: Артикулы карточек в порядке выдачи
+        query: Поисковый запрос для заголовка
+
+    Returns:
+        HTML страницы
+    """
+    cards = "".join(
+        _CARD_TEMPLATE.format(
+            nm_id=nm_id,
+            index=index,
+            vol=int(nm_id) // 100000,
+            part=int(nm_id) // 1000,
+            price=1000 + index * 7,
+            brand=index % 17,
+            rating=index % 10,
+            reviews=index * 13 % 5000,
+        )
+        for index, nm_id in enumerate(nm_ids)
+    )
+    return (
+        "<!DOCTYPE html><html lang=\"ru\"><head><meta charset=\"utf-8\">"
+        f"<title>{query} - купить в интернет-магазине Wildberries</title></head>"
+        "<body><div id=\"app\"><div class=\"catalog-page\"><div class=\"product-card-list\">"
+        f"{cards}"
+        "</div></div></div></body></html>"
+    )
+
+
+def load_pages(data_dir: Optional[Path] = None, synthetic: int = 5, page_size: int = 100) -> Dict[str, str]:
+    """
+    Загружает сохраненные страницы выдачи, а при их отсутствии генерирует синтетические.
+
+    Args:
+        data_dir: Каталог с файлами *.html (по умолчанию benchmarks/data)
+        synthetic: Количество синтетических страниц, если сохраненных нет
+        page_size: Количество карточек на синтетической странице
+
+    Returns:
+        Словарь имя страницы -> HTML
+    """
+    data_dir = data_dir or DATA_DIR
+    pages = {path.name: path.read_text(encoding="utf-8") for path in sorted(data_dir.glob("*.html"))}
+    if pages:
+        return pages
+
+    return {
+        f"synthetic-{page_num}.html": render_search_page(generate_nm_ids(page_size, seed=page_num))
+        for page_num in range(1, synthetic + 1)
+    }
@@ -0,0 +1,84 @@
+from typing import Dict, List, Sequence
+
+import psutil
+
+
+def percentile(values: Sequence[float], share: float) -> float:
+    """
+    Возвращает перцентиль выборки с линейной интерполяцией.
+
+    Args:
+        values: Значения выборки
+        share: Доля от 0 до 1 (0.5 - медиана)
+
+    Returns:
+        Значение перцентиля; 0 для пустой выборки
+    """
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * share
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """
+    Возвращает p50, p90, p99 и максимум выборки.
+
+    Args:
+        values: Значения выборки
+
+    Returns:
+        Словарь p50, p90, p99, max
+    """
+    return {
+        "p50": percentile(values, 0.5),
+        "p90": percentile(values, 0.9),
+        "p99": percentile(values, 0.99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+class ResourceSampler:
+    """Замер процессорного времени и памяти процесса вместе с дочерними (браузер, драйвер)."""
+
+    def __init__(self):
+        self.process = psutil.Process()
+
+    def _processes(self) -> List[psutil.Process]:
+        """Возвращает текущий процесс и все его дочерние процессы."""
+        return [self.process] + self.process.children(recursive=True)
+
+    def cpu_seconds(self) -> float:
+        """
+        Возвращает суммарное процессорное время (user + system) процессов.
+
+        Returns:
+            Секунды процессорного времени
+        """
+        total = 0.0
+        for process in self._processes():
+            try:
+                times = process.cpu_times()
+                total += times.user + times.system
+            except psutil.Error:
+                continue
+        return total
+
+    def rss_mb(self) -> float:
+        """
+        Возвращает суммарную резидентную память процессов.
+
+        Returns:
+            Память в МБ
+        """
+        total = 0
+        for process in self._processes():
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
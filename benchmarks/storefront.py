@@ -0,0 +1,213 @@
+"""
+Локальная заглушка витрины Wildberries для бенчмарков без доступа к сети.
+
+Отдает страницы выдачи по адресу /catalog/0/search.aspx?search=...&page=N
+и JSON поискового API по адресу /search?query=...&page=N. Выдача по каждому
+запросу детерминирована; сохраненные страницы из benchmarks/data отдаются
+как есть, иначе страницы генерируются.
+"""
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from parser import ArticleExtractor
+from .pages import DATA_DIR, generate_nm_ids, render_search_page
+
+NO_RESULTS_HTML = (
+    "<!DOCTYPE html><html lang=\"ru\"><head><meta charset=\"utf-8\"></head><body>"
+    "<div class=\"catalog-page\"><h1>По Вашему запросу ничего не найдено</h1></div>"
+    "</body></html>"
+)
+
+
+class StubStorefront:
+    """
+    HTTP-сервер, имитирующий страницы выдачи и поисковое API витрины.
+
+    Каждый запрос к выдаче содержит pages_per_query страниц; дальше отдается
+    страница "ничего не найдено" (и пустой ответ API). Задержка latency
+    добавляется к каждому ответу, чтобы имитировать сеть.
+    """
+
+    def __init__(self, pages_per_query: int = 5, page_size: int = 100, latency: float = 0.0,
+                 data_dir: Optional[Path] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Инициализация заглушки.
+
+        Args:
+            pages_per_query: Количество страниц выдачи по каждому запросу
+            page_size: Количество карточек на синтетической странице
+            latency: Задержка ответа в секундах
+            data_dir: Каталог с сохраненными страницами *.html (по умолчанию benchmarks/data)
+            host: Адрес сервера
+            port: Порт сервера (0 - любой свободный)
+        """
+        self.pages_per_query = pages_per_query
+        self.page_size = page_size
+        # Число карточек на отдельных синтетических страницах вместо page_size: номер страницы -> число
+        self.page_sizes: Dict[int, int] = {}
+        self.latency = latency
+        # Код ответа поискового API вместо выдачи (например, 403 или 500); None - обычный ответ
+        self.api_status: Optional[int] = None
+        self.host = host
+        self.port = port
+
+        data_dir = data_dir or DATA_DIR
+        self.recorded = [path.read_text(encoding="utf-8") for path in sorted(data_dir.glob("*.html"))]
+        self.requests: Dict[str, int] = {"html": 0, "api": 0}
+        # Параметр dest каждого запроса к поисковому API (регион доставки)
+        self.dests: List[str] = []
+
+        self._pages: Dict[Tuple[str, int], Tuple[List[str], str]] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        """Адрес сервера."""
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def search_url(self) -> str:
+        """Префикс адреса страницы выдачи в формате settings.WB_SEARCH_URL."""
+        return f"{self.base_url}/catalog/0/search.aspx?search="
+
+    @property
+    def api_url(self) -> str:
+        """Адрес поискового API в формате settings.WB_SEARCH_API_URL."""
+        return f"{self.base_url}/search"
+
+    def start(self) -> "StubStorefront":
+        """
+        Запускает сервер в фоновом потоке.
+
+        Returns:
+            Эта же заглушка
+        """
+        handler = type("_Handler", (_StorefrontHandler,), {"storefront": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="stub-storefront", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Останавливает сервер."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubStorefront":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def page(self, search_query: str, page_num: int) -> Tuple[List[str], str]:
+        """
+        Возвращает артикулы и HTML страницы выдачи.
+
+        Args:
+            search_query: Поисковый запрос
+            page_num: Номер страницы (начиная с 1)
+
+        Returns:
+            Кортеж (артикулы в порядке выдачи, HTML); для страниц за пределами
+            выдачи - пустой список и страница "ничего не найдено"
+        """
+        if not 1 <= page_num <= self.pages_per_query:
+            return [], NO_RESULTS_HTML
+
+        key = (search_query, page_num)
+        with self._lock:
+            cached = self._pages.get(key)
+        if cached is not None:
+            return cached
+
+        seed = zlib.crc32(f"{search_query}|{page_num}".encode("utf-8"))
+        if self.recorded:
+            html_content = self.recorded[seed % len(self.recorded)]
+            nm_ids = ArticleExtractor.from_html(html_content)
+        else:
+            nm_ids = generate_nm_ids(self.page_sizes.get(page_num, self.page_size), seed=seed)
+            html_content = render_search_page(nm_ids, search_query)
+
+        with self._lock:
+            self._pages[key] = (nm_ids, html_content)
+        return nm_ids, html_content
+
+    def article_at(self, search_query: str, position: int) -> Optional[str]:
+        """
+        Возвращает артикул, стоящий на заданной позиции выдачи.
+
+        Args:
+            search_query: Поисковый запрос
+            position: Позиция (начиная с 1)
+
+        Returns:
+            Артикул или None, если позиция за пределами выдачи
+        """
+        remaining = position
+        for page_num in range(1, self.pages_per_query + 1):
+            nm_ids, _ = self.page(search_query, page_num)
+            if remaining <= len(nm_ids):
+                return nm_ids[remaining - 1]
+            remaining -= len(nm_ids)
+        return None
+
+    def _count(self, kind: str, dest: Optional[str] = None) -> None:
+        """Увеличивает счетчик запросов и запоминает регион запроса к API."""
+        with self._lock:
+            self.requests[kind] += 1
+            if dest is not None:
+                self.dests.append(dest)
+
+
+class _StorefrontHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов к заглушке витрины."""
+
+    storefront: StubStorefront
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        page_num = int(params.get("page", ["1"])[0])
+
+        if url.path == "/catalog/0/search.aspx":
+            self.storefront._count("html")
+            _, html_content = self.storefront.page(params.get("search", [""])[0], page_num)
+            self._respond(html_content.encode("utf-8"), "text/html; charset=utf-8")
+        elif url.path == "/search":
+            self.storefront._count("api", params.get("dest", [""])[0])
+            if self.storefront.api_status is not None:
+                self.send_error(self.storefront.api_status)
+                return
+            nm_ids, _ = self.storefront.page(params.get("query", [""])[0], page_num)
+            payload = {"data": {"products": [{"id": int(nm_id)} for nm_id in nm_ids]}}
+            self._respond(json.dumps(payload).encode("utf-8"), "text/plain; charset=utf-8")
+        else:
+            self.send_error(404)
+
+    def _respond(self, body: bytes, content_type: str) -> None:
+        """Отправляет ответ после задержки заглушки."""
+        if self.storefront.latency:
+            time.sleep(self.storefront.latency)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Клиент отменил загрузку страницы, которая оказалась не нужна
+            pass
+
+    def log_message(self, format, *args):
+        # Запросы бенчмарка не пишем в вывод
+        return
@@ -2,7 +2,6 @@ import argparse
 
 from utils import log, setup_logging
 from config import settings
-from services import WorkerService, BeatService, CeleryProcessManager, CheckService
 
 
 def main():
@@ -17,23 +16,30 @@ def main():
     parser.add_argument('--start', action='store_true', help='Запустить весь сервис (worker и beat)')
     args = parser.parse_args()
 
+    # Сервисы импортируются в ветке режима запуска: каждый режим загружает только
+    # свои подсистемы (одиночная проверка - без Celery, справка - только настройки)
     if args.check:
         # Запускаем одиночную проверку
+        from services import CheckService
         CheckService.run_check()
     elif args.worker:
         # Запускаем только worker
+        from services import WorkerService
         WorkerService.start_worker()
     elif args.beat:
         # Запускаем только beat
+        from services import BeatService
         BeatService.start_beat()
     elif args.start:
         # Запускаем оба компонента в отдельных процессах
+        from services import CeleryProcessManager
         process_manager = CeleryProcessManager()
-        worker_process, beat_process = process_manager.start_celery_processes()
+        worker_processes, beat_process = process_manager.start_celery_processes()
 
         try:
             # Ожидаем завершения процессов
-            worker_process.join()
+            for worker_process in worker_processes:
+                worker_process.join()
             beat_process.join()
         except KeyboardInterrupt:
             log.info("Получен сигнал прерывания. Завершаем работу...")
@@ -1,5 +1,58 @@
-from .wildberries import WildberriesParser
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .wildberries import WildberriesParser
+    from .browser_pool import BrowserPool
+    from .extractors import ArticleExtractor
+    from .rank_index import RankIndex
+    from .page_cache import PageCache
+    from .retry import RetryPolicy
+    from .rate_limiter import RateLimiter
+    from .identity_pool import IdentityPool
+    from .region_sweep import RegionSweep
+    from .pipeline import CheckPipeline
+    from .memory_governor import MemoryGovernor
+
+# Имя -> модуль пакета. Модули импортируются при первом обращении к имени:
+# одиночной проверке не нужен, например, контроль памяти воркера
+_LAZY = {
+    'WildberriesParser': '.wildberries',
+    'BrowserPool': '.browser_pool',
+    'ArticleExtractor': '.extractors',
+    'RankIndex': '.rank_index',
+    'PageCache': '.page_cache',
+    'RetryPolicy': '.retry',
+    'RateLimiter': '.rate_limiter',
+    'IdentityPool': '.identity_pool',
+    'RegionSweep': '.region_sweep',
+    'CheckPipeline': '.pipeline',
+    'MemoryGovernor': '.memory_governor',
+}
 
 __all__ = [
-    'WildberriesParser'
-]
\ No newline at end of file
+    'WildberriesParser',
+    'BrowserPool',
+    'ArticleExtractor',
+    'RankIndex',
+    'PageCache',
+    'RetryPolicy',
+    'RateLimiter',
+    'IdentityPool',
+    'RegionSweep',
+    'CheckPipeline',
+    'MemoryGovernor'
+]
+
+
+def __getattr__(name: str):
+    """Импортирует модуль пакета при первом обращении к его имени."""
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
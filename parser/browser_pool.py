@@ -0,0 +1,257 @@
+import asyncio
+import os
+import threading
+from typing import Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from utils import log, Metrics
+from config import settings
+
+
+class BrowserPool:
+    """
+    Долгоживущий браузер процесса, выдающий задачам изолированные контексты.
+
+    Браузер перезапускается, если он перестал отвечать, выдал
+    settings.BROWSER_POOL_MAX_USES контекстов или дочерние процессы браузера
+    заняли больше settings.BROWSER_POOL_MAX_MEMORY_MB памяти. Перезапуск
+    откладывается, пока выданные контексты не будут возвращены. Каждый
+    перезапуск сообщает, сколько памяти браузера он освободил.
+    """
+
+    _instance: Optional["BrowserPool"] = None
+    _instance_pid: Optional[int] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_uses: Optional[int] = None, max_memory_mb: Optional[int] = None):
+        """
+        Инициализация пула.
+
+        Args:
+            max_uses: Число выданных контекстов до перезапуска браузера
+            max_memory_mb: Предел памяти дочерних процессов браузера в МБ
+        """
+        self.max_uses = max_uses or settings.BROWSER_POOL_MAX_USES
+        self.max_memory_mb = max_memory_mb or settings.BROWSER_POOL_MAX_MEMORY_MB
+        self.playwright: Optional[Playwright] = None
+        self.browser: Optional[Browser] = None
+        self.uses = 0
+        self.active = 0
+        self._lock = asyncio.Lock()
+        self._recycle_pending = False
+        self._recycle_reason = ""
+
+    @classmethod
+    def instance(cls) -> "BrowserPool":
+        """
+        Возвращает пул текущего процесса.
+
+        Returns:
+            Экземпляр BrowserPool
+        """
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance_pid != os.getpid():
+                cls._instance = cls()
+                cls._instance_pid = os.getpid()
+            return cls._instance
+
+    @classmethod
+    def current(cls) -> Optional["BrowserPool"]:
+        """
+        Возвращает пул текущего процесса, не создавая его.
+
+        Returns:
+            Экземпляр BrowserPool или None, если пул еще не создавался
+        """
+        if cls._instance_pid != os.getpid():
+            return None
+        return cls._instance
+
+    async def start(self) -> None:
+        """Запускает Playwright и браузер."""
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=True)
+        self.uses = 0
+        self._recycle_pending = False
+        self._recycle_reason = ""
+        log.info("Браузер пула запущен")
+
+    async def close(self) -> None:
+        """Закрывает браузер и останавливает Playwright."""
+        async with self._lock:
+            await self._close_browser()
+            if self.playwright:
+                await self.playwright.stop()
+                self.playwright = None
+        log.info("Пул браузера закрыт")
+
+    async def acquire_context(self, **context_options) -> BrowserContext:
+        """
+        Выдает новый изолированный контекст браузера.
+
+        Args:
+            **context_options: Параметры Browser.new_context
+
+        Returns:
+            Контекст браузера; после использования его нужно вернуть через release_context
+        """
+        async with self._lock:
+            if not self.is_healthy():
+                if self.browser:
+                    log.warning("Браузер пула не отвечает, перезапускаем")
+                    await self._restart("unhealthy")
+                else:
+                    await self.start()
+            elif self._recycle_pending and self.active == 0:
+                await self._restart(self._recycle_reason)
+
+            context = await self.browser.new_context(**context_options)
+            self.uses += 1
+            self.active += 1
+            return context
+
+    async def release_context(self, context: BrowserContext) -> None:
+        """
+        Закрывает контекст и проверяет условия перезапуска браузера.
+
+        Args:
+            context: Контекст, полученный через acquire_context
+        """
+        try:
+            await context.close()
+        except Exception as e:
+            log.warning(f"Ошибка при закрытии контекста браузера: {e}")
+
+        async with self._lock:
+            self.active = max(self.active - 1, 0)
+
+            if self.uses >= self.max_uses and not self._recycle_pending:
+                log.info(f"Браузер выдал {self.uses} контекстов, планируем перезапуск")
+                self._schedule_recycle("max_uses")
+
+            memory_mb = self.memory_usage_mb()
+            if memory_mb > self.max_memory_mb and not self._recycle_pending:
+                log.warning(f"Память браузера {memory_mb:.0f} МБ превышает предел {self.max_memory_mb} МБ, "
+                            f"планируем перезапуск")
+                self._schedule_recycle("browser_memory")
+
+            if self._recycle_pending and self.active == 0:
+                await self._restart(self._recycle_reason)
+
+    async def request_recycle(self, reason: str) -> bool:
+        """
+        Планирует плавный перезапуск браузера.
+
+        Браузер перезапускается сразу, если выданных контекстов нет, иначе -
+        при возврате последнего контекста.
+
+        Args:
+            reason: Причина перезапуска для отчета
+
+        Returns:
+            bool: True, если браузер перезапущен сразу
+        """
+        async with self._lock:
+            self._schedule_recycle(reason)
+            if self.active == 0 and self.browser is not None:
+                await self._restart(reason)
+                return True
+            return False
+
+    async def shutdown(self, reason: str) -> bool:
+        """
+        Останавливает браузер и драйвер Playwright, если выданных контекстов нет.
+
+        Следующий acquire_context запустит их заново. Если контексты еще
+        используются, планируется плавный перезапуск.
+
+        Args:
+            reason: Причина остановки для отчета
+
+        Returns:
+            bool: True, если браузер и драйвер остановлены
+        """
+        async with self._lock:
+            if self.active > 0:
+                self._schedule_recycle(reason)
+                return False
+
+            before_mb = self.memory_usage_mb()
+            await self._close_browser()
+            if self.playwright:
+                await self.playwright.stop()
+                self.playwright = None
+            self._report_recycle(reason, before_mb)
+            return True
+
+    def is_healthy(self) -> bool:
+        """
+        Проверяет, что браузер запущен и соединение с ним активно.
+
+        Returns:
+            bool: True, если браузером можно пользоваться
+        """
+        return self.browser is not None and self.browser.is_connected()
+
+    @staticmethod
+    def memory_usage_mb() -> float:
+        """
+        Считает суммарную память (RSS) дочерних процессов: драйвера Playwright и браузера.
+
+        Returns:
+            Объем памяти в МБ
+        """
+        # psutil нужен только воркеру для контроля памяти
+        import psutil
+
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+    def _schedule_recycle(self, reason: str) -> None:
+        """Отмечает, что браузер нужно перезапустить, когда освободятся контексты."""
+        if not self._recycle_pending:
+            self._recycle_reason = reason
+        self._recycle_pending = True
+
+    async def _restart(self, reason: str = "") -> None:
+        """
+        Перезапускает браузер и сообщает, сколько памяти освобождено. Вызывается под блокировкой.
+
+        Args:
+            reason: Причина перезапуска для отчета
+        """
+        before_mb = self.memory_usage_mb()
+        await self._close_browser()
+        await self.start()
+        self._report_recycle(reason or "restart", before_mb)
+
+    def _report_recycle(self, reason: str, before_mb: float) -> None:
+        """
+        Логирует и учитывает в метриках память, освобожденную перезапуском браузера.
+
+        Args:
+            reason: Причина перезапуска
+            before_mb: Память дочерних процессов до перезапуска в МБ
+        """
+        after_mb = self.memory_usage_mb()
+        reclaimed_mb = max(before_mb - after_mb, 0.0)
+        log.info(f"Браузер пула перезапущен ({reason}): память браузера {before_mb:.0f} -> {after_mb:.0f} МБ, "
+                 f"освобождено {reclaimed_mb:.0f} МБ")
+        Metrics.inc('wb_browser_recycles_total', reason=reason)
+        Metrics.inc('wb_memory_reclaimed_bytes_total', reclaimed_mb * 1024 * 1024, source='browser')
+
+    async def _close_browser(self) -> None:
+        """Закрывает браузер, если он запущен."""
+        if self.browser:
+            try:
+                await self.browser.close()
+            except Exception as e:
+                log.warning(f"Ошибка при закрытии браузера пула: {e}")
+            self.browser = None
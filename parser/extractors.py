@@ -0,0 +1,122 @@
+import asyncio
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, TypeVar
+
+from playwright.async_api import Page
+
+from config import settings
+
+T = TypeVar("T")
+
+# Селектор карточки товара в выдаче
+PRODUCT_CARD_SELECTOR = 'article[class*="product-card"]'
+
+# Собирает артикулы карточек в порядке выдачи за один вызов evaluate
+EXTRACT_NM_IDS_JS = """
+selector => Array.from(document.querySelectorAll(selector), card => card.getAttribute('data-nm-id'))
+"""
+
+# Открывающий тег <article ...> с учетом кавычек в значениях атрибутов
+_ARTICLE_TAG_RE = re.compile(r"""<article\b((?:[^>"']|"[^"]*"|'[^']*')*)>""", re.IGNORECASE)
+_CLASS_ATTR_RE = re.compile(r"""\sclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+_NM_ID_ATTR_RE = re.compile(r"""\sdata-nm-id\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+
+
+class ArticleExtractor:
+    """Извлечение артикулов (data-nm-id) карточек товаров из страницы выдачи."""
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_pid: Optional[int] = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    async def offload(cls, func: Callable[..., T], *args) -> T:
+        """
+        Выполняет разбор в пуле потоков извлечения, не блокируя цикл событий.
+
+        Пока один ответ разбирается, цикл событий продолжает загрузку других
+        страниц. При settings.EXTRACT_THREADS = 0 разбор выполняется на месте.
+
+        Args:
+            func: Функция разбора
+            *args: Аргументы функции
+
+        Returns:
+            Результат функции
+        """
+        if settings.EXTRACT_THREADS <= 0:
+            return func(*args)
+
+        with cls._executor_lock:
+            # Потоки пула не переживают fork, поэтому в дочернем процессе создается новый пул
+            if cls._executor is None or cls._executor_pid != os.getpid():
+                cls._executor = ThreadPoolExecutor(max_workers=settings.EXTRACT_THREADS,
+                                                   thread_name_prefix="extract")
+                cls._executor_pid = os.getpid()
+            executor = cls._executor
+
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    @staticmethod
+    async def from_page(page: Page) -> List[str]:
+        """
+        Собирает артикулы прямо в браузере, без выгрузки HTML страницы.
+
+        Args:
+            page: Вкладка браузера со страницей выдачи
+
+        Returns:
+            Список артикулов в порядке выдачи
+        """
+        return await page.evaluate(EXTRACT_NM_IDS_JS, PRODUCT_CARD_SELECTOR)
+
+    @staticmethod
+    def from_html(html_content: str) -> List[str]:
+        """
+        Извлекает артикулы из HTML однопроходным сканированием открывающих тегов.
+
+        Эквивалентно селектору PRODUCT_CARD_SELECTOR, но не строит DOM.
+
+        Args:
+            html_content: HTML страницы с результатами поиска
+
+        Returns:
+            Список артикулов в порядке выдачи
+        """
+        nm_ids = []
+        for tag in _ARTICLE_TAG_RE.finditer(html_content):
+            attrs = tag.group(1)
+
+            class_match = _CLASS_ATTR_RE.search(attrs)
+            if not class_match or 'product-card' not in _first_group(class_match):
+                continue
+
+            nm_id_match = _NM_ID_ATTR_RE.search(attrs)
+            nm_ids.append(_first_group(nm_id_match) if nm_id_match else None)
+
+        return nm_ids
+
+    @staticmethod
+    def from_html_bs4(html_content: str) -> List[str]:
+        """
+        Извлекает артикулы через BeautifulSoup (исходная реализация, для сравнения).
+
+        Args:
+            html_content: HTML страницы с результатами поиска
+
+        Returns:
+            Список артикулов в порядке выдачи
+        """
+        # BeautifulSoup нужен только для сравнения в бенчмарке и не загружается при запуске
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html_content, 'html.parser')
+        return [card.get('data-nm-id') for card in soup.select(PRODUCT_CARD_SELECTOR)]
+
+
+def _first_group(match: re.Match) -> str:
+    """Возвращает значение атрибута из той группы, что совпала (двойные, одинарные кавычки или без них)."""
+    return next(group for group in match.groups() if group is not None)
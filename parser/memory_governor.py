@@ -0,0 +1,230 @@
+import ctypes
+import ctypes.util
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import psutil
+
+from utils import log, Metrics, AsyncRunner
+from config import settings
+from .browser_pool import BrowserPool
+
+# Число снимков tracemalloc в отчете о росте выделений
+TRACEMALLOC_TOP = 5
+# Число последних отчетов об очистке, которые хранит монитор
+REPORTS_KEEP = 20
+# Число очисток подряд, по которым оценивается рост памяти процесса
+LEAK_WINDOW = 3
+
+
+class MemoryGovernor:
+    """
+    Контроль памяти воркера и дочерних процессов браузера между задачами.
+
+    После каждой задачи измеряется RSS процесса воркера и его дочерних
+    процессов (драйвер Playwright и браузер). При превышении
+    settings.MEMORY_SOFT_LIMIT_MB браузер пула плавно перезапускается, когда
+    освободятся его контексты; при превышении settings.MEMORY_HARD_LIMIT_MB
+    браузер и драйвер Playwright останавливаются сразу, если контексты не
+    используются. В обоих случаях собирается мусор Python и свободная память
+    возвращается системе. Каждая очистка сопровождается отчетом об освобожденной
+    памяти. Если память процесса после очисток растет раз за разом, в лог
+    пишется предупреждение о возможной утечке (с отчетом tracemalloc при
+    settings.MEMORY_TRACEMALLOC).
+    """
+
+    _instance: Optional["MemoryGovernor"] = None
+    _instance_pid: Optional[int] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, soft_limit_mb: Optional[int] = None, hard_limit_mb: Optional[int] = None):
+        """
+        Инициализация монитора.
+
+        Args:
+            soft_limit_mb: Мягкий предел памяти в МБ (по умолчанию settings.MEMORY_SOFT_LIMIT_MB)
+            hard_limit_mb: Жесткий предел памяти в МБ (по умолчанию settings.MEMORY_HARD_LIMIT_MB)
+        """
+        self.soft_limit_mb = soft_limit_mb or settings.MEMORY_SOFT_LIMIT_MB
+        self.hard_limit_mb = hard_limit_mb or settings.MEMORY_HARD_LIMIT_MB
+        self.reports: Deque[Dict] = deque(maxlen=REPORTS_KEEP)
+        self._floors: Deque[float] = deque(maxlen=LEAK_WINDOW)
+        self._last_recycle_at = 0.0
+        self._lock = threading.Lock()
+
+        # Базовый снимок выделений для сравнения при подозрении на утечку
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        if settings.MEMORY_TRACEMALLOC:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._snapshot = tracemalloc.take_snapshot()
+
+    @classmethod
+    def instance(cls) -> "MemoryGovernor":
+        """
+        Возвращает монитор текущего процесса.
+
+        Returns:
+            Экземпляр MemoryGovernor
+        """
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance_pid != os.getpid():
+                cls._instance = cls()
+                cls._instance_pid = os.getpid()
+            return cls._instance
+
+    @staticmethod
+    def sample() -> Dict[str, float]:
+        """
+        Измеряет память воркера и браузера.
+
+        Returns:
+            Словарь worker_mb (RSS процесса), browser_mb (RSS дочерних процессов),
+            total_mb и python_blocks (число выделенных блоков памяти Python)
+        """
+        worker_mb = psutil.Process().memory_info().rss / (1024 * 1024)
+        browser_mb = BrowserPool.memory_usage_mb()
+        return {
+            'worker_mb': worker_mb,
+            'browser_mb': browser_mb,
+            'total_mb': worker_mb + browser_mb,
+            'python_blocks': sys.getallocatedblocks(),
+        }
+
+    def check(self) -> Optional[Dict]:
+        """
+        Проверяет память после задачи и при превышении пределов выполняет очистку.
+
+        Повторная очистка выполняется не чаще, чем раз в settings.MEMORY_RECYCLE_COOLDOWN секунд.
+
+        Returns:
+            Отчет об очистке или None, если очистка не понадобилась
+        """
+        with self._lock:
+            usage = self.sample()
+            Metrics.set_gauge('wb_worker_memory_bytes', usage['worker_mb'] * 1024 * 1024)
+            Metrics.set_gauge('wb_browser_memory_bytes', usage['browser_mb'] * 1024 * 1024)
+
+            if usage['total_mb'] >= self.hard_limit_mb:
+                level = 'hard'
+            elif usage['total_mb'] >= self.soft_limit_mb:
+                level = 'soft'
+            else:
+                return None
+
+            if time.monotonic() - self._last_recycle_at < settings.MEMORY_RECYCLE_COOLDOWN:
+                log.debug(f"Память {usage['total_mb']:.0f} МБ выше предела ({level}), "
+                          f"но очистка недавно выполнялась")
+                return None
+
+            return self._recycle(level, usage)
+
+    def _recycle(self, level: str, before: Dict[str, float]) -> Dict:
+        """
+        Освобождает память и формирует отчет.
+
+        Args:
+            level: "soft" или "hard"
+            before: Измерение памяти до очистки
+
+        Returns:
+            Отчет: уровень, память до и после, освобождено по воркеру и браузеру
+        """
+        limit = self.hard_limit_mb if level == 'hard' else self.soft_limit_mb
+        log.warning(f"Память воркера и браузера {before['total_mb']:.0f} МБ превышает "
+                    f"{'жесткий' if level == 'hard' else 'мягкий'} предел {limit} МБ, выполняем очистку")
+
+        browser_action = 'none'
+        browser_pool = BrowserPool.current()
+        if browser_pool is not None:
+            try:
+                if level == 'hard':
+                    done = AsyncRunner.run(browser_pool.shutdown(f"memory_{level}"), timeout=60)
+                    browser_action = 'stopped' if done else 'scheduled'
+                else:
+                    done = AsyncRunner.run(browser_pool.request_recycle(f"memory_{level}"), timeout=60)
+                    browser_action = 'restarted' if done else 'scheduled'
+            except Exception as e:
+                log.warning(f"Не удалось перезапустить браузер пула: {e}")
+                browser_action = 'failed'
+
+        collected = gc.collect()
+        _malloc_trim()
+
+        after = self.sample()
+        report = {
+            'ts': time.time(),
+            'level': level,
+            'browser': browser_action,
+            'gc_collected': collected,
+            'before': before,
+            'after': after,
+            'reclaimed_worker_mb': max(before['worker_mb'] - after['worker_mb'], 0.0),
+            'reclaimed_browser_mb': max(before['browser_mb'] - after['browser_mb'], 0.0),
+        }
+        self.reports.append(report)
+        self._last_recycle_at = time.monotonic()
+
+        log.info(f"Очистка памяти ({level}): воркер {before['worker_mb']:.0f} -> {after['worker_mb']:.0f} МБ, "
+                 f"браузер {before['browser_mb']:.0f} -> {after['browser_mb']:.0f} МБ ({browser_action}), "
+                 f"блоков Python {before['python_blocks']} -> {after['python_blocks']}, "
+                 f"собрано объектов {collected}")
+        Metrics.inc('wb_memory_recycles_total', level=level)
+        Metrics.inc('wb_memory_reclaimed_bytes_total', report['reclaimed_worker_mb'] * 1024 * 1024, source='worker')
+
+        if level == 'hard' and after['total_mb'] >= self.hard_limit_mb:
+            log.error(f"После очистки память {after['total_mb']:.0f} МБ все еще выше жесткого предела "
+                      f"{self.hard_limit_mb} МБ")
+
+        self._check_leak(after['worker_mb'])
+        return report
+
+    def _check_leak(self, floor_mb: float) -> None:
+        """
+        Предупреждает о возможной утечке, если память процесса после очисток растет.
+
+        Args:
+            floor_mb: Память процесса воркера сразу после очистки в МБ
+        """
+        self._floors.append(floor_mb)
+        floors = list(self._floors)
+        if len(floors) < LEAK_WINDOW:
+            return
+
+        growing = all(later > earlier for earlier, later in zip(floors, floors[1:]))
+        growth = floors[-1] - floors[0]
+        if growing and growth >= settings.MEMORY_LEAK_GROWTH_MB:
+            log.warning(f"Возможная утечка памяти: после {LEAK_WINDOW} очисток подряд память воркера "
+                        f"выросла на {growth:.0f} МБ ({', '.join(f'{floor:.0f}' for floor in floors)} МБ)")
+            Metrics.inc('wb_memory_leak_warnings_total')
+            self._log_allocations()
+
+    def _log_allocations(self) -> None:
+        """Логирует места программы с наибольшим ростом выделений с прошлого отчета (tracemalloc)."""
+        if not tracemalloc.is_tracing():
+            return
+
+        snapshot = tracemalloc.take_snapshot()
+        if self._snapshot is not None:
+            stats: List[tracemalloc.StatisticDiff] = snapshot.compare_to(self._snapshot, 'lineno')
+            for stat in stats[:TRACEMALLOC_TOP]:
+                log.warning(f"Рост выделений: {stat}")
+        self._snapshot = snapshot
+
+
+def _malloc_trim() -> None:
+    """Возвращает системе свободную память кучи (glibc malloc_trim); на других платформах ничего не делает."""
+    if not sys.platform.startswith("linux"):
+        return
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        libc.malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
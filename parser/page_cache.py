@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils import log
+from utils.metrics import Metrics
+from utils.redis_client import get_redis
+from config import settings
+
+# Префикс ключей кэша страниц в Redis
+REDIS_PREFIX = "wb_parser:page:"
+
+
+def normalize_query(search_query: str) -> str:
+    """
+    Нормализует поисковый запрос для ключа кэша.
+
+    Args:
+        search_query: Поисковый запрос
+
+    Returns:
+        Запрос в нижнем регистре с одиночными пробелами
+    """
+    return " ".join(search_query.lower().split())
+
+
+class PageCache:
+    """
+    Кратковременный кэш упорядоченных артикулов страницы выдачи.
+
+    Ключ - нормализованный запрос и номер страницы, поэтому все артикулы,
+    отслеживаемые по одному запросу, используют одни и те же загрузки.
+    Одновременные запросы одной страницы объединяются в одну загрузку.
+    При PAGE_CACHE_BACKEND="redis" страницы дополнительно хранятся в Redis
+    и доступны всем воркерам.
+    """
+
+    _instance: Optional["PageCache"] = None
+    _instance_pid: Optional[int] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, ttl: Optional[int] = None, backend: Optional[str] = None,
+                 max_entries: Optional[int] = None):
+        """
+        Инициализация кэша.
+
+        Args:
+            ttl: Время жизни страницы в кэше в секундах
+            backend: "memory" или "redis"
+            max_entries: Максимальное число страниц в памяти процесса
+        """
+        self.ttl = ttl or settings.PAGE_CACHE_TTL
+        self.backend = backend or settings.PAGE_CACHE_BACKEND
+        self.max_entries = max_entries or settings.PAGE_CACHE_MAX_ENTRIES
+        self._entries: Dict[str, Tuple[float, List[str]]] = {}
+        # Загрузки в процессе: ключ -> [задача загрузки, число ожидающих]
+        self._inflight: Dict[str, list] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @classmethod
+    def instance(cls) -> "PageCache":
+        """
+        Возвращает кэш текущего процесса.
+
+        Returns:
+            Экземпляр PageCache
+        """
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance_pid != os.getpid():
+                cls._instance = cls()
+                cls._instance_pid = os.getpid()
+            return cls._instance
+
+    @staticmethod
+    def make_key(search_query: str, page_num: int) -> str:
+        """
+        Формирует ключ страницы.
+
+        Args:
+            search_query: Поисковый запрос
+            page_num: Номер страницы
+
+        Returns:
+            Ключ кэша
+        """
+        return f"{normalize_query(search_query)}|{page_num}"
+
+    async def get_or_fetch(self, search_query: str, page_num: int,
+                           fetch: Callable[[], Awaitable[List[str]]]) -> List[str]:
+        """
+        Возвращает артикулы страницы из кэша или загружает их.
+
+        Если та же страница уже загружается, вызов дожидается этой загрузки.
+        Ошибки загрузки и пустые страницы не кэшируются; ошибка передается всем ожидающим.
+
+        Args:
+            search_query: Поисковый запрос
+            page_num: Номер страницы
+            fetch: Функция загрузки страницы
+
+        Returns:
+            Список артикулов в порядке выдачи
+        """
+        key = self.make_key(search_query, page_num)
+
+        cached = self._get_memory(key)
+        if cached is None and self.backend == "redis":
+            cached = await self._get_redis(key)
+        if cached is not None:
+            self.hits += 1
+            Metrics.inc('wb_page_cache_total', result='hit')
+            return list(cached)
+
+        entry = self._inflight.get(key)
+        if entry is None:
+            self.misses += 1
+            Metrics.inc('wb_page_cache_total', result='miss')
+            task = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+            entry = self._inflight[key] = [task, 0]
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            Metrics.inc('wb_page_cache_total', result='coalesced')
+            log.debug(f"Загрузка страницы {page_num} по запросу '{search_query}' объединена с уже идущей")
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return list(await asyncio.shield(task))
+        except asyncio.CancelledError:
+            # Отменяем загрузку, только если ее больше никто не ждет
+            if entry[1] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    def stats(self) -> dict:
+        """
+        Возвращает счетчики обращений к кэшу.
+
+        Returns:
+            dict: Попадания, промахи и объединенные загрузки
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced}
+
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[List[str]]]) -> List[str]:
+        """
+        Загружает страницу и сохраняет результат в кэш.
+
+        Пустая страница не кэшируется: это может быть мягкая блокировка или временно
+        пустой ответ, и на все время TTL она превратилась бы в "нет результатов".
+        """
+        nm_ids = await fetch()
+        if not nm_ids:
+            return nm_ids
+        self._put_memory(key, nm_ids)
+        if self.backend == "redis":
+            await self._put_redis(key, nm_ids)
+        return nm_ids
+
+    def _get_memory(self, key: str) -> Optional[List[str]]:
+        """Возвращает страницу из памяти процесса, если срок ее жизни не истек."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return entry[1]
+
+    def _put_memory(self, key: str, nm_ids: List[str]) -> None:
+        """Сохраняет страницу в памяти процесса, вытесняя устаревшие и самые старые записи."""
+        now = time.monotonic()
+        if len(self._entries) >= self.max_entries:
+            for expired_key in [k for k, (expires_at, _) in self._entries.items() if expires_at < now]:
+                del self._entries[expired_key]
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+        self._entries.pop(key, None)
+        self._entries[key] = (now + self.ttl, list(nm_ids))
+
+    async def _get_redis(self, key: str) -> Optional[List[str]]:
+        """Читает страницу из Redis; ошибки Redis не мешают загрузке."""
+        try:
+            payload = await asyncio.to_thread(get_redis().get, REDIS_PREFIX + key)
+        except Exception as e:
+            log.warning(f"Не удалось прочитать страницу из Redis: {e}")
+            return None
+
+        if payload is None:
+            return None
+
+        nm_ids = json.loads(payload)
+        self._put_memory(key, nm_ids)
+        return nm_ids
+
+    async def _put_redis(self, key: str, nm_ids: List[str]) -> None:
+        """Сохраняет страницу в Redis на время TTL."""
+        try:
+            await asyncio.to_thread(get_redis().setex, REDIS_PREFIX + key, self.ttl, json.dumps(nm_ids))
+        except Exception as e:
+            log.warning(f"Не удалось сохранить страницу в Redis: {e}")
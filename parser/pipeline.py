@@ -0,0 +1,134 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils import log, Metrics
+from utils.position_store import utc_now
+from config import settings
+
+Target = Tuple[str, str]
+# Результаты группы по регионам: регион (None - по умолчанию) -> (артикул, запрос) -> позиция или None
+RegionalPositions = Dict[Optional[str], Dict[Target, Optional[int]]]
+
+
+class CheckPipeline:
+    """
+    Конвейер проверки позиций: обход выдачи и сохранение результатов идут одновременно.
+
+    Цели группируются по поисковому запросу. settings.PIPELINE_WORKERS обработчиков
+    обходят группы параллельно и передают результаты в очередь размером
+    settings.PIPELINE_QUEUE_SIZE. Этап сохранения забирает результаты из очереди
+    и записывает их в отдельном потоке, не блокируя цикл событий. Если сохранение
+    отстает и очередь заполнена, обработчики ждут, а не накапливают результаты в памяти.
+    """
+
+    def __init__(self, search: Callable[[List[Target]], Awaitable[Tuple[RegionalPositions, str]]],
+                 sink: Callable[[List[Target], RegionalPositions, str], bool],
+                 workers: Optional[int] = None, queue_size: Optional[int] = None):
+        """
+        Инициализация конвейера.
+
+        Args:
+            search: Асинхронный поиск позиций группы целей одного запроса:
+                возвращает (результаты по регионам, временная метка)
+            sink: Синхронное сохранение результатов группы; вызывается в отдельном потоке
+                и возвращает False при ошибке сохранения
+            workers: Число запросов, обходимых параллельно (по умолчанию settings.PIPELINE_WORKERS)
+            queue_size: Размер очереди между обходом и сохранением (по умолчанию settings.PIPELINE_QUEUE_SIZE)
+        """
+        self.search = search
+        self.sink = sink
+        self.workers = max(workers or settings.PIPELINE_WORKERS, 1)
+        self.queue_size = max(queue_size or settings.PIPELINE_QUEUE_SIZE, 1)
+        # True, если все группы сохранены без ошибок
+        self.saved = True
+
+    async def run(self, targets: Iterable[Target]) -> Tuple[RegionalPositions, str]:
+        """
+        Проверяет все цели и сохраняет результаты по мере готовности групп.
+
+        Args:
+            targets: Пары (артикул, поисковый запрос)
+
+        Returns:
+            Кортеж (результаты по регионам для всех целей, временная метка начала проверки);
+            цели с неизвестным из-за ошибки результатом в словари не входят
+        """
+        timestamp = utc_now()
+        groups: Dict[str, List[Target]] = {}
+        for article, search_query in targets:
+            groups.setdefault(search_query, []).append((article, search_query))
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for group in groups.values():
+            pending.put_nowait(group)
+        ready: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        results: RegionalPositions = {}
+        self.saved = True
+        log.info(f"Конвейер проверки: запросов {len(groups)}, обработчиков {min(self.workers, len(groups))}")
+
+        persister = asyncio.create_task(self._persist(ready, results))
+        crawlers = [asyncio.create_task(self._crawl(pending, ready)) for _ in range(min(self.workers, len(groups)))]
+        try:
+            await asyncio.gather(*crawlers)
+        finally:
+            for crawler in crawlers:
+                crawler.cancel()
+            await ready.put(None)
+            await persister
+
+        return results, timestamp
+
+    async def _crawl(self, pending: asyncio.Queue, ready: asyncio.Queue) -> None:
+        """
+        Обработчик этапа обхода: берет группы из pending и кладет результаты в ready.
+
+        Ошибка обхода группы не останавливает конвейер: результаты группы
+        передаются пустыми, то есть неизвестными.
+
+        Args:
+            pending: Очередь групп целей
+            ready: Очередь результатов для сохранения
+        """
+        while True:
+            try:
+                group = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            try:
+                regional, timestamp = await self.search(group)
+            except Exception as e:
+                log.error(f"Ошибка при проверке запроса '{group[0][1]}': {e}")
+                regional = {region: {} for region in (settings.WB_REGIONS or [None])}
+                timestamp = utc_now()
+
+            # Ждет места в очереди, если этап сохранения отстает
+            await ready.put((group, regional, timestamp))
+            Metrics.set_gauge('wb_pipeline_queue_depth', ready.qsize())
+
+    async def _persist(self, ready: asyncio.Queue, results: RegionalPositions) -> None:
+        """
+        Этап сохранения: записывает результаты групп в отдельном потоке.
+
+        Args:
+            ready: Очередь результатов; None - конец работы
+            results: Общий словарь результатов, который дополняется результатами групп
+        """
+        while True:
+            item = await ready.get()
+            if item is None:
+                return
+            Metrics.set_gauge('wb_pipeline_queue_depth', ready.qsize())
+
+            group, regional, timestamp = item
+            for region, positions in regional.items():
+                results.setdefault(region, {}).update(positions)
+
+            try:
+                with Metrics.timer('persist'):
+                    saved = await asyncio.to_thread(self.sink, group, regional, timestamp)
+            except Exception as e:
+                log.error(f"Ошибка при сохранении результатов запроса '{group[0][1]}': {e}")
+                saved = False
+            self.saved = saved and self.saved
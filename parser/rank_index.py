@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from utils import log
+from config import settings
+
+
+class RankIndex:
+    """
+    Сохраненная история позиций по парам (поисковый запрос, артикул).
+
+    Для каждой пары хранится страница и позиция последнего нахождения, самая
+    глубокая страница, на которой товар встречался, размер страницы и число
+    проверок подряд, когда товар не был найден. По этим данным парсер начинает
+    поиск со страницы последнего нахождения и ограничивает глубину обхода.
+
+    Индекс держит одно соединение SQLite, общее для потоков процесса; парсеры
+    процесса используют один индекс (instance()) и обращаются к нему из потоков,
+    не блокируя цикл событий.
+    """
+
+    _instance: Optional["RankIndex"] = None
+    _instance_pid: Optional[int] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Инициализация индекса.
+
+        Args:
+            path: Путь к файлу SQLite (по умолчанию settings.RANK_INDEX_PATH)
+        """
+        self.path = path or settings.RANK_INDEX_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS rank_index (
+                    search_query TEXT NOT NULL,
+                    article TEXT NOT NULL,
+                    last_page INTEGER,
+                    last_position INTEGER,
+                    max_page INTEGER,
+                    page_size INTEGER,
+                    misses INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (search_query, article)
+                )
+            """)
+
+    @classmethod
+    def instance(cls) -> "RankIndex":
+        """
+        Возвращает индекс текущего процесса.
+
+        Returns:
+            Экземпляр RankIndex
+        """
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance_pid != os.getpid():
+                cls._instance = cls()
+                cls._instance_pid = os.getpid()
+            return cls._instance
+
+    def get(self, search_query: str, article: str) -> Optional[Dict]:
+        """
+        Возвращает запись индекса для пары.
+
+        Args:
+            search_query: Поисковый запрос
+            article: Артикул товара
+
+        Returns:
+            Словарь с полями записи или None, если пара еще не проверялась
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM rank_index WHERE search_query = ? AND article = ?",
+                (search_query, article)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def depth_limit(self, search_query: str, articles: Iterable[str]) -> Optional[int]:
+        """
+        Вычисляет предел глубины обхода для группы артикулов одного запроса.
+
+        Предел равен самой глубокой странице, где встречался товар, плюс запас
+        settings.RANK_INDEX_DEPTH_MARGIN, который растет с каждой проверкой подряд
+        без нахождения, но не больше settings.RANK_INDEX_MAX_DEPTH.
+
+        Args:
+            search_query: Поисковый запрос
+            articles: Артикулы товаров
+
+        Returns:
+            Номер последней страницы для обхода или None, если хотя бы один артикул
+            ни разу не был найден и предел неизвестен
+        """
+        limit = 0
+        for article in articles:
+            entry = self.get(search_query, article)
+            if not entry or not entry['max_page']:
+                return None
+
+            margin = settings.RANK_INDEX_DEPTH_MARGIN * (1 + entry['misses'])
+            limit = max(limit, entry['max_page'] + margin)
+
+        return min(limit, settings.RANK_INDEX_MAX_DEPTH) if limit else None
+
+    def record_found(self, search_query: str, article: str, position: int, page: int,
+                     page_size: Optional[int]) -> None:
+        """
+        Сохраняет найденную позицию.
+
+        Args:
+            search_query: Поисковый запрос
+            article: Артикул товара
+            position: Позиция в выдаче
+            page: Страница, на которой найден товар
+            page_size: Число товаров на полной странице выдачи
+        """
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO rank_index (search_query, article, last_page, last_position, max_page,
+                                        page_size, misses, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+                ON CONFLICT (search_query, article) DO UPDATE SET
+                    last_page = excluded.last_page,
+                    last_position = excluded.last_position,
+                    max_page = MAX(COALESCE(rank_index.max_page, 0), excluded.max_page),
+                    page_size = COALESCE(excluded.page_size, rank_index.page_size),
+                    misses = 0,
+                    updated_at = excluded.updated_at
+            """, (search_query, article, page, position, page, page_size, time.time()))
+
+    def record_miss(self, search_query: str, article: str) -> None:
+        """
+        Отмечает завершенную проверку, в которой товар не найден.
+
+        Args:
+            search_query: Поисковый запрос
+            article: Артикул товара
+        """
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO rank_index (search_query, article, misses, updated_at)
+                VALUES (?, ?, 1, ?)
+                ON CONFLICT (search_query, article) DO UPDATE SET
+                    misses = rank_index.misses + 1,
+                    updated_at = excluded.updated_at
+            """, (search_query, article, time.time()))
+        log.debug(f"Индекс позиций: артикул {article} не найден по запросу '{search_query}'")
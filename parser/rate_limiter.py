@@ -0,0 +1,140 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+from utils import log
+from utils.redis_client import get_redis
+from config import settings
+
+# Префикс ключей корзин токенов в Redis
+REDIS_PREFIX = "wb_parser:rate:"
+# Через сколько секунд после ошибки Redis снова пробовать общую корзину
+REDIS_RETRY_DELAY = 30
+
+# Атомарно пополняет корзину по прошедшему времени и списывает токены.
+# Возвращает время ожидания в секундах (0 - токены выданы) строкой, чтобы не потерять дробную часть
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты загрузок страниц выдачи по алгоритму корзины токенов.
+
+    Корзина хранится в Redis и общая для всех воркеров: в среднем выдается
+    settings.RATE_LIMIT_PER_SECOND токенов в секунду, с запасом до
+    settings.RATE_LIMIT_BURST. Если Redis недоступен, используется корзина
+    в памяти процесса, а общая корзина снова проверяется через REDIS_RETRY_DELAY
+    секунд. Парсеры процесса используют один ограничитель (instance()), поэтому
+    локальная корзина тоже одна на процесс.
+    """
+
+    _instance: Optional["RateLimiter"] = None
+    _instance_pid: Optional[int] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, name: str = "search", rate: Optional[float] = None, burst: Optional[int] = None):
+        """
+        Инициализация ограничителя.
+
+        Args:
+            name: Имя корзины (ограничители с одним именем делят токены)
+            rate: Токенов в секунду (по умолчанию settings.RATE_LIMIT_PER_SECOND)
+            burst: Емкость корзины (по умолчанию settings.RATE_LIMIT_BURST)
+        """
+        self.key = REDIS_PREFIX + name
+        self.rate = rate or settings.RATE_LIMIT_PER_SECOND
+        self.burst = burst or settings.RATE_LIMIT_BURST
+
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        # Время (monotonic), до которого Redis не используется после ошибки
+        self._redis_retry_at = 0.0
+
+    @classmethod
+    def instance(cls) -> "RateLimiter":
+        """
+        Возвращает ограничитель текущего процесса.
+
+        Returns:
+            Экземпляр RateLimiter
+        """
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance_pid != os.getpid():
+                cls._instance = cls()
+                cls._instance_pid = os.getpid()
+            return cls._instance
+
+    async def acquire(self, tokens: int = 1) -> float:
+        """
+        Дожидается выдачи токенов.
+
+        Args:
+            tokens: Количество токенов (загрузок)
+
+        Returns:
+            Суммарное время ожидания в секундах
+        """
+        waited = 0.0
+        while True:
+            wait = await self._take(tokens)
+            if wait <= 0:
+                if waited:
+                    log.debug(f"Ограничитель частоты: ожидание {waited:.2f} с")
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    async def _take(self, tokens: int) -> float:
+        """Пытается списать токены; возвращает время до появления нужного числа токенов."""
+        if time.monotonic() >= self._redis_retry_at:
+            try:
+                wait = await asyncio.to_thread(
+                    get_redis().eval, _TOKEN_BUCKET_SCRIPT, 1, self.key, self.rate, self.burst, tokens
+                )
+                if self._redis_retry_at:
+                    log.info("Ограничитель частоты в Redis снова доступен")
+                    self._redis_retry_at = 0.0
+                return float(wait)
+            except Exception as e:
+                log.warning(f"Ограничитель частоты в Redis недоступен, используем локальный "
+                            f"(повтор через {REDIS_RETRY_DELAY} с): {e}")
+                self._redis_retry_at = time.monotonic() + REDIS_RETRY_DELAY
+
+        return self._take_local(tokens)
+
+    def _take_local(self, tokens: int) -> float:
+        """Корзина токенов в памяти процесса."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
@@ -0,0 +1,117 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils import log, SnapshotStore
+from utils.position_store import utc_now
+from config import settings
+from .wildberries import WildberriesParser
+from .browser_pool import BrowserPool
+from .rank_index import RankIndex
+from .page_cache import PageCache
+from .identity_pool import IdentityPool
+
+# Результаты одного региона: (артикул, запрос) -> позиция или None
+RegionPositions = Dict[Tuple[str, str], Optional[int]]
+
+
+class RegionSweep:
+    """
+    Проверка позиций сразу в нескольких регионах доставки.
+
+    Для каждого региона создается свой парсер с отдельным контекстом браузера
+    (регион передается витрине через cookie) или своим параметром dest поискового
+    API. Регионы обходятся параллельно, а браузер пула, индекс позиций, кэш
+    страниц и пул профилей клиента общие для всех регионов.
+    """
+
+    def __init__(self, regions: Optional[Iterable[str]] = None, browser_pool: Optional[BrowserPool] = None,
+                 rank_index: Optional[RankIndex] = None, page_cache: Optional[PageCache] = None,
+                 identity_pool: Optional[IdentityPool] = None, backend: Optional[str] = None,
+                 snapshot_store: Optional[SnapshotStore] = None):
+        """
+        Инициализация обхода.
+
+        Args:
+            regions: Имена регионов из settings.WB_REGIONS (по умолчанию все)
+            browser_pool: Пул браузера процесса; без него на время обхода
+                запускается общий для регионов браузер
+            rank_index: Индекс позиций
+            page_cache: Кэш страниц выдачи
+            identity_pool: Пул профилей клиента
+            backend: Бэкенд получения выдачи (по умолчанию settings.WB_SEARCH_BACKEND)
+            snapshot_store: Хранилище снимков топа выдачи
+        """
+        self.regions: List[str] = list(regions) if regions is not None else list(settings.WB_REGIONS)
+        self.browser_pool = browser_pool
+        self.rank_index = rank_index
+        self.page_cache = page_cache
+        self.identity_pool = identity_pool
+        self.backend = backend or settings.WB_SEARCH_BACKEND
+        self.snapshot_store = snapshot_store
+
+    async def search_batch(self, targets: Iterable[Tuple[str, str]]
+                           ) -> Tuple[Dict[str, RegionPositions], str]:
+        """
+        Ищет позиции пар (артикул, запрос) во всех регионах.
+
+        Ошибка одного региона не прерывает остальные: его результаты
+        возвращаются пустыми, то есть неизвестными для всех пар.
+
+        Args:
+            targets: Пары (артикул, поисковый запрос)
+
+        Returns:
+            Кортеж (регион -> словарь (артикул, запрос) -> позиция или None, временная метка);
+            пары с неизвестным из-за ошибки результатом в словари не входят
+        """
+        timestamp = utc_now()
+        targets = list(targets)
+
+        # Без пула процесса запускаем один браузер на все регионы вместо браузера на регион
+        browser_pool = self.browser_pool
+        own_pool = browser_pool is None and self.backend != "api"
+        if own_pool:
+            browser_pool = BrowserPool()
+
+        log.info(f"Проверка {len(targets)} целей в регионах: {', '.join(self.regions)}")
+        try:
+            results = await asyncio.gather(
+                *(self._search_region(region, targets, browser_pool) for region in self.regions),
+                return_exceptions=True
+            )
+        finally:
+            if own_pool:
+                await browser_pool.close()
+
+        positions: Dict[str, RegionPositions] = {}
+        for region, result in zip(self.regions, results):
+            if isinstance(result, BaseException):
+                log.error(f"Ошибка при проверке позиций в регионе {region}: {result}")
+                positions[region] = {}
+            else:
+                positions[region] = result
+
+        return positions, timestamp
+
+    async def _search_region(self, region: str, targets: List[Tuple[str, str]],
+                             browser_pool: Optional[BrowserPool]) -> RegionPositions:
+        """
+        Ищет позиции пар в одном регионе.
+
+        Args:
+            region: Имя региона
+            targets: Пары (артикул, поисковый запрос)
+            browser_pool: Общий пул браузера
+
+        Returns:
+            Словарь (артикул, запрос) -> позиция или None
+        """
+        parser = WildberriesParser(backend=self.backend, browser_pool=browser_pool, rank_index=self.rank_index,
+                                   page_cache=self.page_cache, identity_pool=self.identity_pool, region=region,
+                                   snapshot_store=self.snapshot_store)
+        try:
+            await parser.initialize()
+            positions, _ = await parser.search_batch(targets)
+            return positions
+        finally:
+            await parser.close()
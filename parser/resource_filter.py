@@ -0,0 +1,148 @@
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import BrowserContext, Page, Request, Route
+
+from utils import log
+from config import settings
+
+
+def _match_domain(host: str, domains: Iterable[str]) -> bool:
+    """Проверяет, совпадает ли хост с одним из доменов или является его поддоменом."""
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class ResourceFilter:
+    """
+    Политика блокировки запросов контекста браузера.
+
+    Запросы блокируются по типу ресурса (картинки, шрифты, медиа) и по домену
+    (счетчики и трекеры). Домены из списка разрешенных не блокируются никогда.
+    Для каждой вкладки считается число выполненных и заблокированных запросов
+    и объем полученных данных.
+    """
+
+    def __init__(self, blocked_types: Optional[Iterable[str]] = None,
+                 blocked_domains: Optional[Iterable[str]] = None,
+                 allowed_domains: Optional[Iterable[str]] = None):
+        """
+        Инициализация политики.
+
+        Args:
+            blocked_types: Типы ресурсов Playwright для блокировки (по умолчанию settings.BLOCKED_RESOURCE_TYPES)
+            blocked_domains: Домены для блокировки (по умолчанию settings.BLOCKED_DOMAINS)
+            allowed_domains: Домены, которые не блокируются (по умолчанию settings.ALLOWED_DOMAINS)
+        """
+        self.blocked_types = set(blocked_types if blocked_types is not None else settings.BLOCKED_RESOURCE_TYPES)
+        self.blocked_domains = tuple(blocked_domains if blocked_domains is not None else settings.BLOCKED_DOMAINS)
+        self.allowed_domains = tuple(allowed_domains if allowed_domains is not None else settings.ALLOWED_DOMAINS)
+        self._traffic: Dict[Page, Dict[str, int]] = {}
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """
+        Решает, нужно ли заблокировать запрос.
+
+        Args:
+            resource_type: Тип ресурса Playwright (document, script, image, ...)
+            url: Адрес запроса
+
+        Returns:
+            bool: True, если запрос нужно заблокировать
+        """
+        host = urlparse(url).hostname or ""
+        if self.allowed_domains and _match_domain(host, self.allowed_domains):
+            return False
+        if resource_type in self.blocked_types:
+            return True
+        return _match_domain(host, self.blocked_domains)
+
+    async def attach(self, context: BrowserContext) -> None:
+        """
+        Подключает политику и учет трафика к контексту браузера.
+
+        Args:
+            context: Контекст браузера
+        """
+        await context.route("**/*", self._handle_route)
+        context.on("requestfinished", self._on_request_finished)
+        context.on("requestfailed", self._on_request_failed)
+
+    def reset(self, page: Page) -> None:
+        """
+        Обнуляет счетчики вкладки перед загрузкой новой страницы.
+
+        Args:
+            page: Вкладка браузера
+        """
+        self._traffic[page] = self._empty_report()
+
+    def report(self, page: Page) -> Dict[str, int]:
+        """
+        Возвращает счетчики вкладки с момента последнего reset.
+
+        Args:
+            page: Вкладка браузера
+
+        Returns:
+            dict: requests - выполнено запросов, failed - завершились ошибкой,
+            blocked - заблокировано, bytes - получено байт (заголовки и тело ответов)
+        """
+        return dict(self._traffic.get(page) or self._empty_report())
+
+    def log_report(self, page: Page, page_num: Optional[int] = None) -> Dict[str, int]:
+        """
+        Пишет в лог и возвращает счетчики вкладки.
+
+        Args:
+            page: Вкладка браузера
+            page_num: Номер страницы выдачи
+
+        Returns:
+            dict: Счетчики вкладки
+        """
+        report = self.report(page)
+        log.debug(f"Страница {page_num}: запросов {report['requests']}, заблокировано {report['blocked']}, "
+                  f"получено {report['bytes'] / 1024:.0f} КБ")
+        return report
+
+    async def _handle_route(self, route: Route) -> None:
+        """Блокирует или пропускает перехваченный запрос."""
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self._count(request, "blocked")
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _on_request_finished(self, request: Request) -> None:
+        """Учитывает выполненный запрос и объем ответа."""
+        self._count(request, "requests")
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        self._count(request, "bytes", sizes["responseHeadersSize"] + max(sizes["responseBodySize"], 0))
+
+    def _on_request_failed(self, request: Request) -> None:
+        """Учитывает запрос, завершившийся ошибкой (кроме заблокированных)."""
+        if self.should_block(request.resource_type, request.url):
+            return
+        self._count(request, "failed")
+
+    def _count(self, request: Request, field: str, value: int = 1) -> None:
+        """Увеличивает счетчик вкладки, с которой отправлен запрос."""
+        try:
+            page = request.frame.page
+        except Exception:
+            # Запросы service worker'ов не привязаны к вкладке
+            return
+
+        report = self._traffic.get(page)
+        if report is None:
+            report = self._traffic[page] = self._empty_report()
+        report[field] += value
+
+    @staticmethod
+    def _empty_report() -> Dict[str, int]:
+        """Возвращает пустые счетчики."""
+        return {"requests": 0, "failed": 0, "blocked": 0, "bytes": 0}
@@ -0,0 +1,116 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from utils import log, Metrics
+from config import settings
+
+T = TypeVar("T")
+
+
+class RetryPolicy:
+    """
+    Повторные попытки загрузки страницы выдачи с экспоненциальной задержкой.
+
+    Ошибки делятся на временные (таймауты, сетевые ошибки, ответы 429 и 5xx,
+    сбои вкладки браузера), после которых загрузка повторяется, и постоянные
+    (ответы 4xx, ошибки разбора), которые передаются вызывающему сразу.
+    """
+
+    def __init__(self, attempts: Optional[int] = None, base_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None):
+        """
+        Инициализация политики.
+
+        Args:
+            attempts: Число попыток, включая первую (по умолчанию settings.PAGE_RETRY_ATTEMPTS)
+            base_delay: Задержка перед первым повтором в секундах (по умолчанию settings.PAGE_RETRY_BASE_DELAY)
+            max_delay: Предельная задержка в секундах (по умолчанию settings.PAGE_RETRY_MAX_DELAY)
+        """
+        self.attempts = max(attempts or settings.PAGE_RETRY_ATTEMPTS, 1)
+        self.base_delay = base_delay if base_delay is not None else settings.PAGE_RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else settings.PAGE_RETRY_MAX_DELAY
+
+    @staticmethod
+    def classify(error: BaseException) -> Optional[str]:
+        """
+        Определяет, временная ли ошибка.
+
+        Args:
+            error: Исключение загрузки
+
+        Returns:
+            Причина повтора (timeout, rate_limited, server_error, network, browser)
+            или None, если ошибка постоянная
+        """
+        if isinstance(error, (PlaywrightTimeoutError, asyncio.TimeoutError)):
+            return "timeout"
+        if isinstance(error, aiohttp.ClientResponseError):
+            if error.status == 429:
+                return "rate_limited"
+            return "server_error" if error.status >= 500 else None
+        if isinstance(error, (aiohttp.ClientError, ConnectionError)):
+            return "network"
+        if isinstance(error, PlaywrightError):
+            return "browser"
+        return None
+
+    @staticmethod
+    def block_reason(error: BaseException) -> Optional[str]:
+        """
+        Определяет, похожа ли постоянная ошибка на блокировку клиента.
+
+        Такие ошибки не повторяются, но учитываются в оценке профиля клиента.
+
+        Args:
+            error: Исключение загрузки
+
+        Returns:
+            "forbidden" для ответов 401 и 403, иначе None
+        """
+        if isinstance(error, aiohttp.ClientResponseError) and error.status in (401, 403):
+            return "forbidden"
+        return None
+
+    def delay(self, attempt: int) -> float:
+        """
+        Вычисляет задержку перед повтором.
+
+        Args:
+            attempt: Номер неудачной попытки (начиная с 1)
+
+        Returns:
+            Задержка в секундах: base_delay * 2^(attempt-1), не больше max_delay,
+            со случайным разбросом до 50% вниз
+        """
+        delay = min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def run(self, fetch: Callable[[], Awaitable[T]], description: str) -> T:
+        """
+        Выполняет загрузку с повторами временных ошибок.
+
+        Args:
+            fetch: Функция загрузки
+            description: Описание загрузки для лога
+
+        Returns:
+            Результат загрузки; после исчерпания попыток или при постоянной
+            ошибке пробрасывается последнее исключение
+        """
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return await fetch()
+            except Exception as e:
+                reason = self.classify(e)
+                if reason is None or attempt == self.attempts:
+                    raise
+
+                delay = self.delay(attempt)
+                Metrics.inc('wb_retries_total', reason=reason)
+                log.warning(f"{description}: {reason} ({e}), попытка {attempt + 1} из {self.attempts} "
+                            f"через {delay:.1f} с")
+                await asyncio.sleep(delay)
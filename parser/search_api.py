@@ -0,0 +1,120 @@
+import json
+from typing import List, Optional
+import aiohttp
+
+from utils import log
+from config import settings
+from .identity_pool import Identity
+from .extractors import ArticleExtractor
+
+
+class WildberriesSearchAPI:
+    """Клиент JSON-поиска, который использует сама витрина Wildberries."""
+
+    def __init__(self, base_url: Optional[str] = None, dest: Optional[int] = None,
+                 identity: Optional[Identity] = None):
+        """
+        Инициализация клиента.
+
+        Args:
+            base_url: Адрес поискового API (по умолчанию settings.WB_SEARCH_API_URL)
+            dest: Идентификатор региона доставки (по умолчанию settings.WB_SEARCH_API_DEST)
+            identity: Профиль клиента: прокси и User-Agent запросов
+        """
+        self.base_url = base_url or settings.WB_SEARCH_API_URL
+        self.dest = dest if dest is not None else settings.WB_SEARCH_API_DEST
+        self.identity = identity
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        """Создает пул HTTP-соединений."""
+        if self.session and not self.session.closed:
+            return
+
+        headers = {"Accept": "application/json"}
+        if self.identity:
+            headers["User-Agent"] = self.identity.user_agent
+
+        connector = aiohttp.TCPConnector(
+            limit=settings.WB_SEARCH_API_POOL_SIZE,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.WB_SEARCH_API_TIMEOUT),
+            headers=headers
+        )
+
+    async def close(self) -> None:
+        """Закрывает пул HTTP-соединений."""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def fetch_nm_ids(self, search_query: str, page_num: int) -> List[str]:
+        """
+        Получает артикулы товаров страницы выдачи в порядке ранжирования.
+
+        Args:
+            search_query: Поисковый запрос
+            page_num: Номер страницы (начиная с 1)
+
+        Returns:
+            Список артикулов; пустой список, если на странице нет товаров
+        """
+        if not self.session or self.session.closed:
+            await self.start()
+
+        params = {
+            "appType": 1,
+            "curr": "rub",
+            "dest": self.dest,
+            "query": search_query,
+            "page": page_num,
+            "resultset": "catalog",
+            "sort": "popular",
+            "spp": 30,
+        }
+
+        log.debug(f"Запрос к поисковому API: '{search_query}', страница {page_num}")
+        proxy = self.identity.proxy if self.identity else None
+        async with self.session.get(self.base_url, params=params, proxy=proxy) as response:
+            response.raise_for_status()
+            body = await response.read()
+
+        # Разбор ответа в пуле потоков, пока цикл событий загружает другие страницы
+        return await ArticleExtractor.offload(self.parse_body, body)
+
+    @classmethod
+    def parse_body(cls, body: bytes) -> List[str]:
+        """
+        Разбирает тело ответа поискового API (JSON с типом text/plain).
+
+        Args:
+            body: Тело ответа
+
+        Returns:
+            Список артикулов в порядке выдачи
+        """
+        return cls.parse_nm_ids(json.loads(body) if body.strip() else None)
+
+    @staticmethod
+    def parse_nm_ids(payload: dict) -> List[str]:
+        """
+        Извлекает артикулы из ответа поискового API.
+
+        Поддерживает оба формата ответа: с товарами в "data.products" и в "products".
+
+        Args:
+            payload: Разобранный JSON-ответ
+
+        Returns:
+            Список артикулов в порядке выдачи
+        """
+        if not payload:
+            return []
+
+        data = payload.get('data') or payload
+        products = data.get('products') or []
+
+        return [str(product['id']) for product in products if 'id' in product]
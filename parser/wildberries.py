@@ -1,45 +1,275 @@
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 import asyncio
-from datetime import datetime
+import math
+import time
 from urllib.parse import quote
 from playwright.async_api import async_playwright, Page, TimeoutError as PlaywrightTimeoutError
-from bs4 import BeautifulSoup
 
-from utils import log
+from utils import log, Metrics, SnapshotStore
+from utils.position_store import utc_now
 from config import settings
+from .search_api import WildberriesSearchAPI
+from .browser_pool import BrowserPool
+from .extractors import ArticleExtractor, PRODUCT_CARD_SELECTOR
+from .rank_index import RankIndex
+from .page_cache import PageCache
+from .resource_filter import ResourceFilter
+from .retry import RetryPolicy
+from .rate_limiter import RateLimiter
+from .identity_pool import IdentityPool
+
+# Параметры контекста браузера
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1920, "height": 1080},
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+COUNT_CARDS_JS = "selector => document.querySelectorAll(selector).length"
+
+# Ждет роста числа карточек: после первого прироста дожидается паузы в изменениях DOM
+# длиной settleTimeout, без прироста за idleTimeout возвращает текущее число карточек
+WAIT_FOR_CARDS_JS = """
+({selector, previous, idleTimeout, settleTimeout}) => new Promise(resolve => {
+    const count = () => document.querySelectorAll(selector).length;
+    let settleTimer = null;
+    const finish = () => {
+        observer.disconnect();
+        clearTimeout(idleTimer);
+        clearTimeout(settleTimer);
+        resolve(count());
+    };
+    const observer = new MutationObserver(() => {
+        if (count() > previous) {
+            clearTimeout(settleTimer);
+            settleTimer = setTimeout(finish, settleTimeout);
+        }
+    });
+    const idleTimer = setTimeout(finish, idleTimeout);
+    observer.observe(document.body, {childList: true, subtree: true});
+    if (count() > previous) {
+        settleTimer = setTimeout(finish, settleTimeout);
+    }
+})
+"""
+
+
+class CrawlResult:
+    """Результат обхода выдачи по одному поисковому запросу."""
+
+    def __init__(self, articles: Iterable[str]):
+        """
+        Args:
+            articles: Искомые артикулы
+        """
+        self.positions: Dict[str, Optional[int]] = {article: None for article in articles}
+        # Страница, на которой найден каждый артикул
+        self.pages: Dict[str, int] = {}
+        # Наибольшее число товаров на странице, встреченное при обходе
+        self.page_size: Optional[int] = None
+        # False, если обход прерван ошибкой и отсутствие товаров не подтверждено
+        self.complete = True
+        # Страница, загрузка которой не удалась после всех повторов
+        self.failed_page: Optional[int] = None
+        # True, если обход остановлен пределом страниц, а не концом выдачи
+        self.limited = False
+        # Страница, с которой продолжается обход после предела, и число товаров на страницах до нее
+        self.next_page = 1
+        self.items_before = 0
+        # Артикулы, позиция которых посчитана с допущением, что незагруженные страницы перед ними полные
+        self.approximate: Set[str] = set()
+        # Топ выдачи для снимка: артикулы в порядке выдачи и их число на каждой странице
+        self.top_nm_ids: List[str] = []
+        self.top_page_sizes: List[int] = []
+
+    def found(self, article: str, position: int, page: int) -> None:
+        """Фиксирует найденную позицию артикула."""
+        self.positions[article] = position
+        self.pages[article] = page
+
+    def fail(self, page: int) -> None:
+        """Фиксирует обход, прерванный ошибкой загрузки страницы."""
+        self.complete = False
+        self.failed_page = page
+
+    def definite_positions(self) -> Dict[str, Optional[int]]:
+        """
+        Возвращает результаты, в которых обход уверен.
+
+        Returns:
+            Словарь артикул -> позиция для найденных товаров и артикул -> None для
+            товаров, отсутствие которых подтверждено завершенным обходом. Артикулы
+            с неизвестным из-за ошибки результатом в словарь не входят.
+        """
+        if self.complete:
+            return dict(self.positions)
+        return {article: position for article, position in self.positions.items() if position is not None}
 
 
 class WildberriesParser:
     """Парсер для поиска позиции товара в выдаче Wildberries."""
 
-    def __init__(self):
-        """Инициализация парсера."""
+    def __init__(self, backend: Optional[str] = None, browser_pool: Optional[BrowserPool] = None,
+                 rank_index: Optional[RankIndex] = None, page_cache: Optional[PageCache] = None,
+                 retry_policy: Optional[RetryPolicy] = None, identity_pool: Optional[IdentityPool] = None,
+                 region: Optional[str] = None, snapshot_store: Optional[SnapshotStore] = None):
+        """
+        Инициализация парсера.
+
+        Args:
+            backend: Бэкенд получения выдачи ("playwright" или "api"),
+                по умолчанию settings.WB_SEARCH_BACKEND
+            browser_pool: Пул браузера процесса; если задан, парсер берет из него
+                контекст вместо запуска собственного браузера
+            rank_index: Индекс позиций для поиска от последней известной страницы
+            page_cache: Кэш страниц выдачи, общий для артикулов одного запроса
+            retry_policy: Политика повторов загрузки страниц (по умолчанию из настроек)
+            identity_pool: Пул профилей клиента; если задан, контекст браузера и
+                клиент API используют выбранный из него прокси и user agent
+            region: Регион доставки из settings.WB_REGIONS; по умолчанию регион
+                settings.WB_SEARCH_API_DEST
+            snapshot_store: Хранилище снимков; если задано, при каждом обходе
+                сохраняется топ settings.SNAPSHOT_TOP_K товаров выдачи
+        """
+        if region is not None and region not in settings.WB_REGIONS:
+            raise ValueError(f"Неизвестный регион доставки: {region}")
+
+        self.backend = backend or settings.WB_SEARCH_BACKEND
+        self.region = region
+        self.dest = settings.WB_REGIONS[region] if region is not None else None
+        self.identity_pool = identity_pool
+        self.identity = identity_pool.acquire() if identity_pool else None
+        self.api = WildberriesSearchAPI(dest=self.dest, identity=self.identity) if self.backend == "api" else None
+        self.browser_pool = browser_pool
+        self.rank_index = rank_index
+        self.page_cache = page_cache
+        self.snapshot_store = snapshot_store
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = RateLimiter.instance() if settings.RATE_LIMIT_ENABLED else None
+        self.resource_filter = ResourceFilter() if settings.RESOURCE_FILTER_ENABLED else None
+        # Драйвер Playwright собственного браузера (без пула)
+        self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        # Свободные вкладки для параллельной загрузки страниц выдачи
+        self._idle_pages: List[Page] = []
+        # Загрузки страниц на вкладках парсера, которые еще выполняются
+        self._shared_loads: Set[asyncio.Task] = set()
+        self._launch_lock = asyncio.Lock()
+        # Статистика прокрутки по страницам: номер страницы, число прокруток, карточек и время
+        self.scroll_stats: List[Dict] = []
+        # Трафик по страницам: номер страницы, запросы, заблокированные запросы и байты
+        self.traffic_stats: List[Dict] = []
 
     async def initialize(self) -> None:
+        """
+        Инициализирует выбранный бэкенд.
+
+        Для бэкенда "api" создается только пул HTTP-соединений, браузер запускается
+        лениво, если понадобится запасной путь.
+        """
+        if self.api:
+            await self.api.start()
+            log.info("Клиент поискового API инициализирован")
+            return
+
+        await self._launch_browser()
+
+    async def _launch_browser(self) -> None:
         """Инициализирует браузер и контекст Playwright."""
+        context_options = self.identity.context_options() if self.identity else CONTEXT_OPTIONS
+        if self.browser_pool:
+            self.context = await self.browser_pool.acquire_context(**context_options)
+            await self._apply_region()
+            if self.resource_filter:
+                await self.resource_filter.attach(self.context)
+            self.page = await self.context.new_page()
+            self._idle_pages.append(self.page)
+            log.debug("Получен контекст из пула браузера")
+            return
+
         try:
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(headless=True)
-            self.context = await self.browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            )
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=True)
+            self.context = await self.browser.new_context(**context_options)
+            await self._apply_region()
+            if self.resource_filter:
+                await self.resource_filter.attach(self.context)
             self.page = await self.context.new_page()
+            self._idle_pages.append(self.page)
             log.info("Playwright успешно инициализирован")
         except Exception as e:
             log.error(f"Ошибка при инициализации Playwright: {e}")
-            if self.browser:
-                await self.browser.close()
+            await self._close_own_browser()
             raise
 
+    async def _apply_region(self) -> None:
+        """Передает витрине регион доставки через cookie контекста браузера."""
+        if self.dest is None:
+            return
+
+        await self.context.add_cookies([{
+            "name": settings.WB_REGION_COOKIE,
+            "value": str(self.dest),
+            "url": settings.WB_BASE_URL,
+        }])
+        log.debug(f"Контекст браузера настроен на регион {self.region} (dest={self.dest})")
+
+    def _scoped_query(self, search_query: str) -> str:
+        """
+        Возвращает ключ запроса для кэша страниц и индекса позиций.
+
+        Выдача разных регионов различается, поэтому для региона из settings.WB_REGIONS
+        к запросу добавляется имя региона.
+
+        Args:
+            search_query: Поисковый запрос
+
+        Returns:
+            Запрос или "запрос@регион"
+        """
+        return f"{search_query}@{self.region}" if self.region is not None else search_query
+
     async def close(self) -> None:
-        """Закрывает все ресурсы браузера."""
+        """
+        Закрывает все ресурсы браузера и HTTP-клиента.
+
+        Загрузки страниц, начатые парсером и объединенные кэшем страниц с загрузками
+        других парсеров, сначала завершаются: иначе остальные ожидающие получили бы
+        ошибку закрытой вкладки.
+        """
+        loads = [task for task in self._shared_loads if task is not asyncio.current_task()]
+        if loads:
+            log.debug(f"Ожидание загрузок страниц, которые ждут другие парсеры: {len(loads)}")
+            # asyncio.wait не отменяет задачи при отмене close()
+            await asyncio.wait(loads)
+
+        if self.api:
+            await self.api.close()
+        self._idle_pages = []
+        if self.browser_pool and self.context:
+            await self.browser_pool.release_context(self.context)
+            self.context = None
+            self.page = None
+        await self._close_own_browser()
+
+    async def _close_own_browser(self) -> None:
+        """Закрывает собственный браузер и останавливает драйвер Playwright, запущенный парсером."""
         if self.browser:
-            await self.browser.close()
-            log.info("Браузер закрыт")
+            try:
+                await self.browser.close()
+                log.info("Браузер закрыт")
+            except Exception as e:
+                log.warning(f"Ошибка при закрытии браузера: {e}")
+            self.browser = None
+            self.context = None
+            self.page = None
+        if self.playwright:
+            try:
+                await self.playwright.stop()
+            except Exception as e:
+                log.warning(f"Ошибка при остановке Playwright: {e}")
+            self.playwright = None
 
     async def search_article_position(self, search_query: str, article: str) -> Tuple[Optional[int], str]:
         """
@@ -52,69 +282,644 @@ class WildberriesParser:
         Returns:
             Кортеж (позиция товара в выдаче, временная метка)
         """
-        if not self.page:
+        positions, timestamp = await self.search_articles_positions(search_query, [article])
+        return positions.get(article), timestamp
+
+    async def search_articles_positions(self, search_query: str, articles: Iterable[str],
+                                        concurrency: Optional[int] = None
+                                        ) -> Tuple[Dict[str, Optional[int]], str]:
+        """
+        Ищет позиции нескольких товаров по одному поисковому запросу.
+
+        Страницы выдачи обходятся один раз: каждая загруженная страница проверяется
+        сразу на все ещё не найденные артикулы. Если задан индекс позиций, одиночный
+        артикул ищется начиная со страницы последнего нахождения, а глубина обхода
+        ограничивается пределом, вычисленным по истории; если в его пределах товар
+        не найден, обход продолжается со следующей за пределом страницы. Если задано хранилище
+        снимков, обход всегда начинается с первой страницы и продолжается, пока не
+        собран топ settings.SNAPSHOT_TOP_K товаров.
+
+        Args:
+            search_query: Поисковый запрос
+            articles: Артикулы товаров
+            concurrency: Число страниц, загружаемых параллельно
+                (по умолчанию settings.WB_PAGE_CONCURRENCY)
+
+        Returns:
+            Кортеж (словарь артикул -> позиция или None, временная метка). None означает,
+            что товар не найден при завершенном обходе; артикулы, результат которых
+            неизвестен из-за ошибки загрузки, в словарь не входят
+        """
+        if not self.page and not self.api:
             await self.initialize()
 
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        encoded_query = quote(search_query)
-        page_num = 1
-        total_items_processed = 0
+        timestamp = utc_now()
+        articles = list(dict.fromkeys(articles))
+        concurrency = max(concurrency or settings.WB_PAGE_CONCURRENCY, 1)
+        # Для безопасности ограничиваем количество проверяемых страниц
+        max_page = settings.MAX_SAFE_SEARCH if settings.SAFE_SEARCH else None
+
+        top_k = settings.SNAPSHOT_TOP_K if self.snapshot_store else 0
+
+        # Предел обхода без учета истории: до него отсутствие товара считается подтвержденным
+        full_max_page = max_page
+        entry = None
+        if self.rank_index:
+            # Запросы к SQLite выполняются в потоке, чтобы не блокировать цикл событий
+            depth_limit = await asyncio.to_thread(self.rank_index.depth_limit,
+                                                  self._scoped_query(search_query), articles)
+            if depth_limit is not None:
+                # Предел по истории не должен обрезать снимок топа
+                depth_limit = max(depth_limit, math.ceil(top_k / settings.WB_PAGE_SIZE))
+                max_page = min(max_page, depth_limit) if max_page else depth_limit
+            if len(articles) == 1 and not top_k:
+                entry = await asyncio.to_thread(self.rank_index.get, self._scoped_query(search_query), articles[0])
+
+        if entry and entry['last_page'] and entry['page_size'] and max_page:
+            result = await self._crawl_around(search_query, articles[0], entry['last_page'],
+                                              entry['page_size'], max_page)
+        else:
+            result = await self._crawl_pages(search_query, articles, max_page, concurrency, top_k)
+
+        if result.limited and max_page != full_max_page:
+            await self._crawl_beyond_limit(search_query, result, full_max_page, concurrency)
+
+        if self.rank_index:
+            await asyncio.to_thread(self._update_rank_index, search_query, result)
+
+        if top_k:
+            self._save_snapshot(search_query, timestamp, result, top_k)
+
+        if not result.complete:
+            unknown = [article for article, position in result.positions.items() if position is None]
+            region = f" (регион {self.region})" if self.region is not None else ""
+            log.error(f"Обход по запросу '{search_query}'{region} прерван на странице {result.failed_page}, "
+                      f"результат неизвестен для артикулов: {', '.join(unknown)}")
+
+        return result.definite_positions(), timestamp
+
+    async def _crawl_pages(self, search_query: str, articles: List[str], max_page: Optional[int],
+                           concurrency: int, top_k: int = 0, start_page: int = 1,
+                           items_before: int = 0) -> "CrawlResult":
+        """
+        Обходит страницы выдачи по порядку, по умолчанию с первой.
+
+        Одновременно загружается окно из concurrency страниц, но обрабатываются они
+        строго по порядку, поэтому позиция считается точно по фактическому числу
+        товаров на каждой странице. Как только найдены все артикулы и собран топ
+        для снимка, незавершенные загрузки отменяются.
 
-        while True:
-            url = f"{settings.WB_SEARCH_URL}{encoded_query}&page={page_num}"
+        Args:
+            search_query: Поисковый запрос
+            articles: Артикулы товаров
+            max_page: Последняя страница для обхода или None без ограничения
+            concurrency: Число страниц, загружаемых параллельно
+            top_k: Число первых товаров выдачи, которые нужно собрать для снимка
+            start_page: Страница, с которой начинается обход
+            items_before: Число товаров на страницах до start_page
 
-            try:
-                log.info(f"Открываем страницу поиска: {url}")
-                await self.page.goto(url, wait_until="networkidle")
+        Returns:
+            Результат обхода
+        """
+        result = CrawlResult(articles)
+        pending = set(articles)
 
-                # Прокручиваем страницу, чтобы загрузить больше результатов
-                await self._scroll_page()
+        fetches: Dict[int, asyncio.Task] = {}
+        next_page_to_fetch = start_page
+        page_num = start_page
+        total_items_processed = items_before
 
-                # Проверяем, есть ли результаты поиска
-                if await self._check_no_results():
-                    log.warning(f"Нет результатов поиска для запроса: {search_query}")
-                    return None, timestamp
+        try:
+            while pending or len(result.top_nm_ids) < top_k:
+                # Дозаполняем окно параллельных загрузок
+                while len(fetches) < concurrency and (max_page is None or next_page_to_fetch <= max_page):
+                    fetches[next_page_to_fetch] = asyncio.create_task(
+                        self._fetch_page(search_query, next_page_to_fetch)
+                    )
+                    next_page_to_fetch += 1
+
+                if page_num not in fetches:
+                    log.warning(f"Достигнут предел страниц поиска ({max_page})")
+                    result.limited = True
+                    result.next_page = page_num
+                    result.items_before = total_items_processed
+                    break
 
-                # Получаем HTML страницы и ищем артикул
-                html_content = await self.page.content()
-                position, items_on_page = self._find_article_position(html_content, article)
+                try:
+                    nm_ids = await fetches.pop(page_num)
+                except PlaywrightTimeoutError:
+                    log.error(f"Таймаут при загрузке страницы {page_num} по запросу '{search_query}'")
+                    result.fail(page_num)
+                    break
+                except Exception as e:
+                    log.error(f"Ошибка при поиске позиции товара: {e}")
+                    result.fail(page_num)
+                    break
 
-                if position:
-                    position += total_items_processed
-                    log.info(f"Товар с артикулом {article} найден на позиции {position}")
-                    return position, timestamp
-                else:
-                    log.warning(f"Товар с артикулом {article} не найден на странице {page_num}. Перелистываем...")
-                    total_items_processed += items_on_page
-                    page_num += 1
+                if not nm_ids:
+                    if page_num == 1:
+                        log.warning(f"Нет результатов поиска для запроса: {search_query}")
+                    else:
+                        log.warning(f"Страница {page_num} не содержит товаров, завершаем обход")
+                    break
+
+                Metrics.inc('wb_items_scanned_total', len(nm_ids))
+                result.page_size = max(result.page_size or 0, len(nm_ids))
+                for position, nm_id in enumerate(nm_ids, total_items_processed + 1):
+                    if nm_id in pending:
+                        result.found(nm_id, position, page_num)
+                        pending.discard(nm_id)
+                        log.info(f"Товар с артикулом {nm_id} найден на позиции {position}")
+
+                if len(result.top_nm_ids) < top_k:
+                    top = nm_ids[:top_k - len(result.top_nm_ids)]
+                    result.top_nm_ids.extend(top)
+                    result.top_page_sizes.append(len(top))
 
-                # Для безопасности ограничиваем количество проверяемых страниц
-                if settings.SAFE_SEARCH and page_num > settings.MAX_SAFE_SEARCH:
-                    log.warning(f"Достигнут предел страниц поиска ({settings.MAX_SAFE_SEARCH})")
+                if not pending and len(result.top_nm_ids) >= top_k:
                     break
 
+                if pending:
+                    log.warning(f"Не найдено на странице {page_num} товаров: {len(pending)}. Перелистываем...")
+                else:
+                    log.debug(f"Собрано товаров для снимка: {len(result.top_nm_ids)} из {top_k}")
+                total_items_processed += len(nm_ids)
+                page_num += 1
+        finally:
+            # Отменяем загрузки страниц, которые уже не понадобятся
+            for task in fetches.values():
+                task.cancel()
+            if fetches:
+                await asyncio.gather(*fetches.values(), return_exceptions=True)
+
+        return result
+
+    async def _crawl_around(self, search_query: str, article: str, start_page: int, page_size: int,
+                            max_page: int) -> "CrawlResult":
+        """
+        Ищет артикул, начиная со страницы последнего нахождения и расходясь в обе стороны.
+
+        Порядок страниц: start_page, start_page + 1, start_page - 1, start_page + 2, ...
+        в пределах 1..max_page. Позиция считается по фактическому числу товаров на
+        загруженных страницах перед найденной; незагруженные страницы считаются
+        полными (page_size товаров), и такая позиция помечается как приблизительная.
+        Страница без товаров означает конец выдачи: страницы после нее не загружаются.
+
+        Args:
+            search_query: Поисковый запрос
+            article: Артикул товара
+            start_page: Страница последнего нахождения
+            page_size: Число товаров на полной странице
+            max_page: Последняя страница для обхода
+
+        Returns:
+            Результат обхода
+        """
+        result = CrawlResult([article])
+        start_page = min(start_page, max_page)
+        log.info(f"Поиск артикула {article} от страницы {start_page} (предел {max_page})")
+
+        # Число товаров на загруженных страницах
+        page_items: Dict[int, int] = {}
+        last_page = max_page
+        for page_num in self._outward_pages(start_page, max_page):
+            if page_num > last_page:
+                continue
+
+            try:
+                nm_ids = await self._fetch_page(search_query, page_num)
             except PlaywrightTimeoutError:
-                log.error(f"Таймаут при загрузке страницы: {url}")
-                return None, timestamp
+                log.error(f"Таймаут при загрузке страницы {page_num} по запросу '{search_query}'")
+                result.fail(page_num)
+                break
             except Exception as e:
                 log.error(f"Ошибка при поиске позиции товара: {e}")
-                return None, timestamp
+                result.fail(page_num)
+                break
+
+            Metrics.inc('wb_items_scanned_total', len(nm_ids))
+            page_items[page_num] = len(nm_ids)
+            if not nm_ids:
+                log.warning(f"Страница {page_num} не содержит товаров, выдача заканчивается раньше")
+                last_page = page_num - 1
+                continue
+
+            result.page_size = max(result.page_size or 0, len(nm_ids))
+            if article in nm_ids:
+                earlier = range(1, page_num)
+                position = sum(page_items.get(page, page_size) for page in earlier) + nm_ids.index(article) + 1
+                result.found(article, position, page_num)
+                if all(page in page_items for page in earlier):
+                    log.info(f"Товар с артикулом {article} найден на позиции {position}")
+                else:
+                    result.approximate.add(article)
+                    log.info(f"Товар с артикулом {article} найден на позиции {position} (приблизительно: "
+                             f"незагруженные страницы до {page_num} считаются полными)")
+                break
+
+            log.warning(f"Товар с артикулом {article} не найден на странице {page_num}")
+        else:
+            # Все страницы до предела загружены и не пусты: товар может быть глубже
+            if last_page == max_page:
+                result.limited = True
+                result.next_page = max_page + 1
+                result.items_before = sum(page_items.values())
+
+        return result
+
+    async def _crawl_beyond_limit(self, search_query: str, result: "CrawlResult", max_page: Optional[int],
+                                  concurrency: int) -> None:
+        """
+        Дообходит выдачу, если обход остановлен пределом глубины по истории.
+
+        Предел из индекса позиций - эвристика: товар мог опуститься глубже. Поэтому
+        перед тем как считать товар не найденным, обход продолжается со страницы
+        после предела до конца выдачи (до settings.MAX_SAFE_SEARCH при безопасном
+        поиске). Уже загруженные страницы повторно не загружаются, позиции считаются
+        от числа товаров на них. Найденные позиции и ошибка загрузки переносятся в result.
 
-    async def _scroll_page(self, max_scrolls: int = 20) -> None:
+        Args:
+            search_query: Поисковый запрос
+            result: Результат обхода, остановленного пределом по истории
+            max_page: Предел страниц без учета истории или None
+            concurrency: Число страниц, загружаемых параллельно
+        """
+        missing = [article for article, position in result.positions.items() if position is None]
+        if not missing or not result.complete:
+            return
+
+        log.info(f"Предел глубины по истории достигнут, артикулы не найдены: {', '.join(missing)}. "
+                 f"Продолжаем обход со страницы {result.next_page}")
+        rest = await self._crawl_pages(search_query, missing, max_page, concurrency,
+                                       start_page=result.next_page, items_before=result.items_before)
+        for article in missing:
+            if rest.positions[article] is not None:
+                result.found(article, rest.positions[article], rest.pages[article])
+        result.page_size = max(result.page_size or 0, rest.page_size or 0) or None
+        result.limited = rest.limited
+        result.next_page, result.items_before = rest.next_page, rest.items_before
+        if not rest.complete:
+            result.fail(rest.failed_page)
+
+    @staticmethod
+    def _outward_pages(start_page: int, max_page: int) -> Iterator[int]:
         """
-        Прокручивает страницу для загрузки дополнительных результатов.
+        Перечисляет страницы от start_page попеременно вперед и назад.
 
         Args:
-            max_scrolls: Максимальное количество прокруток
+            start_page: Начальная страница
+            max_page: Последняя допустимая страница
+
+        Returns:
+            Итератор номеров страниц в пределах 1..max_page
+        """
+        yield start_page
+        for offset in range(1, max_page):
+            if start_page + offset <= max_page:
+                yield start_page + offset
+            if start_page - offset >= 1:
+                yield start_page - offset
+            if start_page + offset > max_page and start_page - offset < 1:
+                return
+
+    def _update_rank_index(self, search_query: str, result: "CrawlResult") -> None:
+        """
+        Сохраняет результаты обхода в индекс позиций.
+
+        Промах фиксируется только для завершенного обхода: если обход прервался
+        из-за ошибки, отсутствие товара не подтверждено.
+
+        Args:
+            search_query: Поисковый запрос
+            result: Результат обхода
         """
-        for i in range(max_scrolls):
-            await self.page.evaluate("window.scrollBy(0, window.innerHeight)")
-            await asyncio.sleep(1)  # Ждем загрузки данных
+        search_query = self._scoped_query(search_query)
+        try:
+            for article, position in result.positions.items():
+                if position is not None:
+                    self.rank_index.record_found(search_query, article, position,
+                                                 result.pages[article], result.page_size)
+                elif result.complete:
+                    self.rank_index.record_miss(search_query, article)
+        except Exception as e:
+            log.warning(f"Не удалось обновить индекс позиций: {e}")
 
-    async def _check_no_results(self) -> bool:
+    def _save_snapshot(self, search_query: str, timestamp: str, result: "CrawlResult", top_k: int) -> None:
+        """
+        Сохраняет топ выдачи из результата обхода и логирует изменения относительно прошлого снимка.
+
+        Снимок сохраняется, если собран весь топ или выдача закончилась раньше;
+        обход, прерванный ошибкой до сбора топа, не создает снимок. Пустой снимок и
+        снимок короче первой страницы после снимка с полной страницей тоже не сохраняются.
+
+        Args:
+            search_query: Поисковый запрос
+            timestamp: Время проверки
+            result: Результат обхода
+            top_k: Размер топа
+        """
+        if not result.complete and len(result.top_nm_ids) < top_k:
+            log.warning(f"Снимок выдачи по запросу '{search_query}' не сохранен: обход прерван "
+                        f"после {len(result.top_nm_ids)} из {top_k} товаров")
+            return
+
+        if not result.top_nm_ids:
+            log.warning(f"Снимок выдачи по запросу '{search_query}' не сохранен: товаров не собрано")
+            return
+
+        try:
+            previous = self.snapshot_store.latest(search_query, self.region)
+            # Снимок короче первой страницы после полного - скорее мягкая блокировка, чем
+            # выдача: он показал бы выбывшим весь прежний топ и занял бы место в истории
+            first_page = min(top_k, settings.WB_PAGE_SIZE)
+            if previous and len(result.top_nm_ids) < first_page <= len(previous[0]):
+                log.warning(f"Снимок выдачи по запросу '{search_query}' не сохранен: собрано "
+                            f"{len(result.top_nm_ids)} товаров, меньше первой страницы ({first_page})")
+                return
+            snapshot = self.snapshot_store.save(timestamp, search_query, result.top_nm_ids,
+                                                result.top_page_sizes, self.region)
+        except Exception as e:
+            log.warning(f"Не удалось сохранить снимок выдачи: {e}")
+            return
+
+        if previous:
+            changes = previous[0].diff(snapshot)
+            log.info(f"Снимок выдачи по запросу '{search_query}' ({len(snapshot)} товаров): "
+                     f"новых {len(changes['entered'])}, выбыло {len(changes['exited'])}, "
+                     f"сменили позицию {len(changes['moved'])}")
+        else:
+            log.info(f"Сохранен первый снимок выдачи по запросу '{search_query}' ({len(snapshot)} товаров)")
+
+    async def search_batch(self, targets: Iterable[Tuple[str, str]]
+                           ) -> Tuple[Dict[Tuple[str, str], Optional[int]], str]:
+        """
+        Ищет позиции для набора пар (артикул, поисковый запрос).
+
+        Пары группируются по поисковому запросу, и выдача каждого запроса
+        обходится один раз для всех артикулов группы.
+
+        Args:
+            targets: Пары (артикул, поисковый запрос)
+
+        Returns:
+            Кортеж (словарь (артикул, запрос) -> позиция или None, временная метка);
+            пары с неизвестным из-за ошибки результатом в словарь не входят
+        """
+        timestamp = utc_now()
+        groups: Dict[str, List[str]] = {}
+        for article, search_query in targets:
+            groups.setdefault(search_query, []).append(article)
+
+        results: Dict[Tuple[str, str], Optional[int]] = {}
+        for search_query, articles in groups.items():
+            log.info(f"Поиск {len(articles)} артикулов по запросу '{search_query}'")
+            positions, _ = await self.search_articles_positions(search_query, articles)
+            for article in articles:
+                if article in positions:
+                    results[(article, search_query)] = positions[article]
+
+        return results, timestamp
+
+    async def _fetch_page(self, search_query: str, page_num: int) -> List[str]:
+        """
+        Получает артикулы страницы выдачи из кэша страниц или загружает их.
+
+        Временные ошибки загрузки повторяются по политике self.retry_policy, поэтому
+        обход продолжается с той же страницы с уже накопленным числом товаров.
+
+        Args:
+            search_query: Поисковый запрос
+            page_num: Номер страницы
+
+        Returns:
+            Список артикулов в порядке выдачи; пустой, если товаров нет
+        """
+        async def load() -> List[str]:
+            # С кэшем страниц загрузка идет в общей задаче, которую могут ждать и другие
+            # парсеры; close() дожидается ее, прежде чем вернуть вкладки и контекст
+            task = asyncio.current_task()
+            self._shared_loads.add(task)
+            try:
+                return await self.retry_policy.run(
+                    lambda: self._load_page(search_query, page_num),
+                    f"Загрузка страницы {page_num} по запросу '{search_query}'"
+                )
+            finally:
+                self._shared_loads.discard(task)
+
+        if self.page_cache:
+            return await self.page_cache.get_or_fetch(self._scoped_query(search_query), page_num, load)
+        return await load()
+
+    async def _load_page(self, search_query: str, page_num: int) -> List[str]:
+        """
+        Загружает артикулы страницы выдачи через выбранный бэкенд.
+
+        Пустая первая страница часто означает мягкую блокировку (капча или пустой
+        ответ с кодом 200), поэтому она загружается повторно. Если повторная загрузка
+        вернула товары, пустой ответ учитывается в оценке профиля клиента как блокировка.
+
+        Args:
+            search_query: Поисковый запрос
+            page_num: Номер страницы
+
+        Returns:
+            Список артикулов в порядке выдачи; пустой, если товаров нет
+        """
+        nm_ids = await self._load_page_once(search_query, page_num)
+        if nm_ids or page_num != 1:
+            self._report_identity(None)
+            return nm_ids
+
+        await asyncio.sleep(self.retry_policy.delay(1))
+        nm_ids = await self._load_page_once(search_query, page_num)
+        if nm_ids:
+            log.warning(f"Первая страница по запросу '{search_query}' пришла пустой, повторная загрузка "
+                        f"вернула товаров: {len(nm_ids)}")
+            Metrics.inc('wb_retries_total', reason='empty_page')
+            self._report_identity(None, 'empty_page')
+        return nm_ids
+
+    async def _load_page_once(self, search_query: str, page_num: int) -> List[str]:
+        """
+        Выполняет одну загрузку страницы выдачи.
+
+        При ошибке поискового API страница загружается через браузер. Перед загрузкой
+        запрашивается токен общего ограничителя частоты, а ошибки учитываются
+        в оценке здоровья профиля клиента.
+
+        Args:
+            search_query: Поисковый запрос
+            page_num: Номер страницы
+
+        Returns:
+            Список артикулов в порядке выдачи; пустой, если товаров нет
+        """
+        if self.rate_limiter:
+            with Metrics.timer('rate_limit_wait'):
+                await self.rate_limiter.acquire()
+
+        if self.api:
+            try:
+                with Metrics.timer('api_fetch'):
+                    nm_ids = await self.api.fetch_nm_ids(search_query, page_num)
+                Metrics.inc('wb_pages_crawled_total', backend='api')
+                return nm_ids
+            except Exception as e:
+                log.warning(f"Ошибка поискового API ({e}), загружаем страницу {page_num} через браузер")
+                Metrics.inc('wb_retries_total', reason='api_fallback')
+                self._report_identity(e)
+
+        try:
+            return await self._fetch_page_browser(search_query, page_num)
+        except Exception as e:
+            self._report_identity(e)
+            raise
+
+    def _report_identity(self, error: Optional[BaseException], reason: Optional[str] = None) -> None:
+        """
+        Учитывает результат загрузки в оценке профиля клиента.
+
+        Учитываются временные ошибки и признаки блокировки (ответы 401 и 403, пустая
+        страница); постоянные ошибки, не связанные с профилем (например, ошибки
+        разбора), не учитываются.
+
+        Args:
+            error: Исключение загрузки или None
+            reason: Причина неудачи без исключения (например, "empty_page");
+                без error и reason загрузка считается успешной
+        """
+        if not self.identity_pool:
+            return
+
+        if error is None and reason is None:
+            self.identity_pool.report(self.identity, True)
+            return
+
+        reason = reason or RetryPolicy.classify(error) or RetryPolicy.block_reason(error)
+        if reason is not None:
+            self.identity_pool.report(self.identity, False, reason)
+
+    async def _fetch_page_browser(self, search_query: str, page_num: int) -> List[str]:
+        """
+        Загружает страницу выдачи в браузере и извлекает артикулы.
+
+        Args:
+            search_query: Поисковый запрос
+            page_num: Номер страницы
+
+        Returns:
+            Список артикулов в порядке выдачи; пустой, если товаров нет
+        """
+        page = await self._acquire_page()
+        try:
+            url = f"{settings.WB_SEARCH_URL}{quote(search_query)}&page={page_num}"
+            log.info(f"Открываем страницу поиска: {url}")
+            if self.resource_filter:
+                self.resource_filter.reset(page)
+            with Metrics.timer('goto'):
+                await page.goto(url, wait_until="networkidle")
+
+            # Прокручиваем страницу, чтобы загрузить больше результатов
+            with Metrics.timer('scroll'):
+                await self._scroll_page(page, page_num=page_num)
+
+            # Проверяем, есть ли результаты поиска
+            with Metrics.timer('no_results_check'):
+                no_results = await self._check_no_results(page)
+            Metrics.inc('wb_pages_crawled_total', backend='playwright')
+            if no_results:
+                return []
+
+            # Собираем артикулы в порядке выдачи прямо в браузере
+            with Metrics.timer('extract'):
+                nm_ids = await ArticleExtractor.from_page(page)
+
+            if self.resource_filter:
+                self.traffic_stats.append({"page": page_num, **self.resource_filter.log_report(page, page_num)})
+
+            return nm_ids
+        finally:
+            # Закрытую после сбоя вкладку не используем повторно
+            if not page.is_closed():
+                self._idle_pages.append(page)
+
+    async def _acquire_page(self) -> Page:
+        """
+        Выдает свободную вкладку браузера для загрузки страницы выдачи.
+
+        Первая вкладка создается при запуске браузера, дополнительные открываются
+        в том же контексте, только когда все имеющиеся заняты.
+
+        Returns:
+            Вкладка браузера; после использования возвращается в self._idle_pages
+        """
+        async with self._launch_lock:
+            if not self.page:
+                await self._launch_browser()
+
+        if self._idle_pages:
+            return self._idle_pages.pop()
+        return await self.context.new_page()
+
+    async def _scroll_page(self, page: Page, max_scrolls: int = 20, expected_items: Optional[int] = None,
+                           page_num: Optional[int] = None) -> int:
+        """
+        Прокручивает страницу, пока подгружаются новые карточки товаров.
+
+        После каждой прокрутки ожидает в браузере изменения DOM (MutationObserver)
+        вместо фиксированной паузы. Прокрутка прекращается, когда число карточек
+        достигло ожидаемого размера страницы или перестало расти в течение
+        settings.SCROLL_IDLE_TIMEOUT секунд.
+
+        Args:
+            page: Вкладка браузера со страницей выдачи
+            max_scrolls: Максимальное количество прокруток
+            expected_items: Ожидаемое число карточек на странице (по умолчанию settings.WB_PAGE_SIZE)
+            page_num: Номер страницы (для статистики)
+
+        Returns:
+            Количество карточек на странице после прокрутки
+        """
+        expected_items = expected_items or settings.WB_PAGE_SIZE
+        started = time.monotonic()
+        items_count = await page.evaluate(COUNT_CARDS_JS, PRODUCT_CARD_SELECTOR)
+        scrolls = 0
+
+        while scrolls < max_scrolls and items_count < expected_items:
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            scrolls += 1
+
+            new_count = await page.evaluate(WAIT_FOR_CARDS_JS, {
+                "selector": PRODUCT_CARD_SELECTOR,
+                "previous": items_count,
+                "idleTimeout": int(settings.SCROLL_IDLE_TIMEOUT * 1000),
+                "settleTimeout": int(settings.SCROLL_SETTLE_TIMEOUT * 1000),
+            })
+
+            if new_count <= items_count:
+                # Карточки перестали подгружаться
+                break
+            items_count = new_count
+
+        elapsed = time.monotonic() - started
+        self.scroll_stats.append({
+            "page": page_num,
+            "scrolls": scrolls,
+            "items": items_count,
+            "elapsed": round(elapsed, 3),
+        })
+        log.debug(f"Страница {page_num}: прокруток {scrolls}, карточек {items_count}, за {elapsed:.2f} с")
+
+        return items_count
+
+    async def _check_no_results(self, page: Page) -> bool:
         """
         Проверяет, есть ли результаты поиска на странице.
 
+        Args:
+            page: Вкладка браузера со страницей выдачи
+
         Returns:
             bool: True, если результатов нет
         """
@@ -125,35 +930,40 @@ class WildberriesParser:
         ]
 
         for selector in no_results_selectors:
-            no_results = await self.page.query_selector(selector)
+            no_results = await page.query_selector(selector)
             if no_results:
                 return True
 
         return False
 
-    def _find_article_position(self, html_content: str, article: str) -> Optional[int]:
+    def _extract_nm_ids(self, html_content: str) -> List[str]:
         """
-        Ищет позицию товара с заданным артикулом в HTML контенте.
+        Извлекает артикулы карточек товаров в порядке выдачи.
 
         Args:
             html_content: HTML страницы с результатами поиска
-            article: Артикул товара для поиска
 
         Returns:
-            Позиция товара или None, если товар не найден
+            Список артикулов (data-nm-id) карточек на странице
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        return ArticleExtractor.from_html(html_content)
 
-        # Находим все карточки товаров
-        product_cards = soup.select('article[class*="product-card"]')
+    def _find_article_position(self, html_content: str, article: str) -> Tuple[Optional[int], int]:
+        """
+        Ищет позицию товара с заданным артикулом в HTML контенте.
 
-        items_count = len(product_cards)
+        Args:
+            html_content: HTML страницы с результатами поиска
+            article: Артикул товара для поиска
 
-        for position, card in enumerate(product_cards, 1):
-            card_nm_id = card.get('data-nm-id')
+        Returns:
+            Кортеж (позиция товара или None, если товар не найден; количество товаров на странице)
+        """
+        nm_ids = self._extract_nm_ids(html_content)
 
+        for position, card_nm_id in enumerate(nm_ids, 1):
             if card_nm_id == article:
-                return position, items_count
+                return position, len(nm_ids)
 
         # Если товар не найден - возвращаем None
-        return None, items_count
\ No newline at end of file
+        return None, len(nm_ids)
@@ -1,11 +1,37 @@
-from .worker import WorkerService
-from .beat import BeatService
-from .start import CeleryProcessManager
-from .check import CheckService
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .worker import WorkerService
+    from .beat import BeatService
+    from .start import CeleryProcessManager
+    from .check import CheckService
+
+# Имя -> модуль пакета. Сервис импортируется при первом обращении к имени,
+# поэтому одиночная проверка и справка по запуску не загружают Celery
+_LAZY = {
+    'WorkerService': '.worker',
+    'BeatService': '.beat',
+    'CeleryProcessManager': '.start',
+    'CheckService': '.check',
+}
 
 __all__ = [
     'WorkerService',
     'BeatService',
     'CeleryProcessManager',
     'CheckService'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    """Импортирует модуль сервиса при первом обращении к его имени."""
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,7 +2,7 @@ import asyncio
 
 from utils import log
 from utils import GoogleSheetsClient
-from tasks.celery_tasks import search_article_position
+from tasks.checks import run_check_pipeline
 
 
 class CheckService:
@@ -11,33 +11,40 @@ class CheckService:
     @staticmethod
     async def run_single_check():
         """
-        Выполняет одиночную проверку позиции товара.
+        Выполняет одиночную проверку позиций всех отслеживаемых товаров.
 
         Returns:
             None
         """
         try:
-            # Получаем данные конфигурации
+            # Получаем пары (артикул, запрос) из таблицы
             sheets_client = GoogleSheetsClient()
-            article, search_query = sheets_client.get_config_data()
+            targets = await asyncio.to_thread(sheets_client.get_tracking_targets)
 
-            if not article or not search_query:
-                log.error("Не удалось получить артикул или поисковый запрос из Google Sheets")
+            if not targets:
+                log.error("Не удалось получить артикулы и поисковые запросы из Google Sheets")
                 return
 
-            log.info(f"Проверка позиции для артикула {article} по запросу '{search_query}'")
-
-            # Запускаем поиск
-            position, timestamp = await search_article_position(search_query, article)
-
-            if position is not None:
-                log.info(f"Товар с артикулом {article} найден на позиции {position}")
-                # Записываем результат в таблицу
-                sheets_client.add_position_data(timestamp, article, position)
-            else:
-                log.warning(f"Товар с артикулом {article} не найден в результатах поиска")
-                # Записываем информацию о том, что товар не найден
-                sheets_client.add_position_data(timestamp, article, "Не найден")
+            log.info(f"Проверка позиций для {len(targets)} пар (артикул, запрос)")
+
+            # Обход выдачи и сохранение результатов идут одновременно: результаты каждого
+            # запроса записываются в хранилище позиций и таблицу, пока обходятся следующие
+            regional, _, saved = await run_check_pipeline(targets, sheets_client)
+            if not saved:
+                log.error("Часть результатов проверки не удалось сохранить")
+
+            for region, positions in regional.items():
+                where = f" в регионе {region}" if region is not None else ""
+                for article, search_query in targets:
+                    position = positions.get((article, search_query))
+                    if (article, search_query) not in positions:
+                        log.error(f"Позиция товара с артикулом {article} по запросу '{search_query}'{where} "
+                                  f"неизвестна из-за ошибки загрузки")
+                    elif position is not None:
+                        log.info(f"Товар с артикулом {article} найден на позиции {position} "
+                                 f"по запросу '{search_query}'{where}")
+                    else:
+                        log.warning(f"Товар с артикулом {article} не найден по запросу '{search_query}'{where}")
 
         except Exception as e:
             log.error(f"Ошибка при выполнении проверки: {e}")
@@ -12,30 +12,34 @@ class CeleryProcessManager:
 
     def __init__(self):
         """Инициализирует менеджер процессов."""
-        self.worker_process = None
+        self.worker_processes = []
         self.beat_process = None
 
     def start_celery_processes(self):
         """
         Запускает Celery worker и beat в отдельных процессах.
 
+        Количество процессов воркера задается settings.WORKER_PROCESSES.
+
         Returns:
-            tuple: Кортеж из двух процессов (worker, beat)
+            tuple: Кортеж (список процессов worker, процесс beat)
         """
         # Закрываем пул для избежания проблем с fork на Unix-системах
         asynpool.PROC_ALIVE_TIMEOUT = 60.0
 
         log.info(f"Запуск парсера {settings.APP_NAME} (v{settings.APP_VERSION})")
 
-        # Запускаем worker в отдельном процессе
-        self.worker_process = Process(target=WorkerService.start_worker)
-        self.worker_process.start()
+        # Запускаем worker'ы в отдельных процессах
+        for index in range(max(settings.WORKER_PROCESSES, 1)):
+            worker_process = Process(target=WorkerService.start_worker, args=(index,))
+            worker_process.start()
+            self.worker_processes.append(worker_process)
 
         # Запускаем beat в отдельном процессе
         self.beat_process = Process(target=BeatService.start_beat)
         self.beat_process.start()
 
-        return self.worker_process, self.beat_process
+        return self.worker_processes, self.beat_process
 
     def stop_celery_processes(self):
         """
@@ -46,10 +50,11 @@ class CeleryProcessManager:
         """
         log.info("Остановка Celery процессов")
 
-        if self.worker_process and self.worker_process.is_alive():
-            self.worker_process.terminate()
-            self.worker_process.join()
-            log.info("Celery worker остановлен")
+        for index, worker_process in enumerate(self.worker_processes):
+            if worker_process.is_alive():
+                worker_process.terminate()
+                worker_process.join()
+                log.info(f"Celery worker #{index} остановлен")
 
         if self.beat_process and self.beat_process.is_alive():
             self.beat_process.terminate()
@@ -1,5 +1,8 @@
-from utils import log
+import psutil
+
+from utils import log, Metrics
 from tasks import app
+from parser import BrowserPool
 from config import settings
 
 
@@ -7,20 +10,48 @@ class WorkerService:
     """Класс для управления Celery worker."""
 
     @staticmethod
-    def start_worker():
+    def start_worker(index: int = 0):
         """
         Запускает Celery worker.
 
+        В режиме WORKER_POOL="async" задачи выполняются в пуле потоков, а сами
+        проверки идут параллельно в общем цикле событий процесса с общим браузером.
+        Число одновременно выполняемых проверок ограничено WORKER_MAX_IN_FLIGHT.
+
+        Args:
+            index: Номер процесса воркера, используется в имени узла
+
         Returns:
             None
         """
-        log.info("Запуск Celery worker")
+        if settings.WORKER_POOL == 'async':
+            pool, concurrency = 'threads', settings.WORKER_MAX_IN_FLIGHT
+        else:
+            pool, concurrency = 'solo', 1
+
+        log.info(f"Запуск Celery worker #{index} (пул {pool}, параллельных задач: {concurrency})")
+
+        if settings.METRICS_ENABLED:
+            Metrics.register_callback(WorkerService.update_memory_gauges)
+            Metrics.start_server(settings.METRICS_PORT + index)
 
         # Используем метод Worker непосредственно из экземпляра приложения
         worker = app.Worker(
+            hostname=f"worker{index}@%h",
             loglevel=settings.LOG_LEVEL.lower(),
             traceback=True,
-            concurrency=1,
-            pool='solo'
+            concurrency=concurrency,
+            pool=pool
         )
-        worker.start()
\ No newline at end of file
+        worker.start()
+
+    @staticmethod
+    def update_memory_gauges():
+        """
+        Обновляет датчики памяти воркера и браузера перед выгрузкой метрик.
+
+        Returns:
+            None
+        """
+        Metrics.set_gauge('wb_worker_memory_bytes', psutil.Process().memory_info().rss)
+        Metrics.set_gauge('wb_browser_memory_bytes', BrowserPool.memory_usage_mb() * 1024 * 1024)
\ No newline at end of file
@@ -1,5 +1,18 @@
-from .celery_tasks import app
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .celery_tasks import app
 
 __all__ = [
     'app'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    """Импортирует приложение Celery при первом обращении, чтобы tasks.checks можно было использовать без Celery."""
+    if name != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = import_module('.celery_tasks', __name__).app
+    globals()[name] = value
+    return value
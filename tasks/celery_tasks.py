@@ -1,10 +1,42 @@
-import asyncio
-from celery import Celery
+import random
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from celery import Celery, chord
+from celery.signals import task_postrun, worker_process_shutdown, worker_shutdown
 
 from utils import log
 from config import settings
-from utils import GoogleSheetsClient
-from parser import WildberriesParser
+from utils import ConfigCache, CheckSchedule, AsyncRunner
+from utils.redis_client import get_redis
+from utils.position_store import utc_now
+from parser import BrowserPool, MemoryGovernor
+# Поиск и сохранение результатов не зависят от Celery и вынесены в tasks.checks,
+# чтобы одиночная проверка не загружала Celery; имена реэкспортируются для совместимости
+from .checks import (NOT_FOUND_LABEL, ERROR_LABEL, search_article_position, search_positions_batch,
+                     search_regions_batch, run_check_pipeline, save_results, check_status)
+
+# Ключ блокировки запуска проверок в Redis
+SCHEDULE_LOCK_KEY = "wb_parser:schedule_lock"
+# Наименьшее время жизни блокировки запуска (в секундах)
+SCHEDULE_LOCK_MIN_TTL = 300
+
+# Снимает блокировку, только если она принадлежит этому запуску
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Продлевает блокировку, только если она принадлежит этому запуску
+_REFRESH_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
 
 # Создаем экземпляр Celery
 app = Celery('wb_parser')
@@ -16,83 +48,353 @@ app.conf.task_serializer = 'json'
 app.conf.result_serializer = 'json'
 app.conf.accept_content = ['json']
 app.conf.task_track_started = True
-app.conf.worker_max_tasks_per_child = 50
+app.conf.worker_max_tasks_per_child = settings.WORKER_MAX_TASKS_PER_CHILD or None
 
 
 @app.task(name='check_position')
 def check_position() -> dict:
     """
-    Задача Celery для проверки позиции товара в поисковой выдаче.
+    Задача Celery для проверки позиций товаров в поисковой выдаче.
 
     Returns:
         dict: Результат выполнения задачи
     """
-    log.info("Запуск задачи проверки позиции товара")
+    log.info("Запуск задачи проверки позиций товаров")
+
+    lock_token = _acquire_schedule_lock()
+    if lock_token is False:
+        return {'status': 'skipped', 'message': 'Предыдущая проверка еще выполняется'}
 
     try:
-        # Получаем данные конфигурации из Google Sheets
-        sheets_client = GoogleSheetsClient()
-        article, search_query = sheets_client.get_config_data()
+        # Получаем пары (артикул, запрос) из кэша конфигурации или из Google Sheets
+        targets = ConfigCache.get_targets()
 
-        if not article or not search_query:
-            log.error("Не удалось получить артикул или поисковый запрос из Google Sheets")
+        if not targets:
+            log.error("Не удалось получить артикулы и поисковые запросы из Google Sheets")
             return {
                 'status': 'error',
                 'message': 'Отсутствуют данные артикула или поискового запроса в таблице'
             }
 
-        log.info(f"Полученные данные: артикул={article}, запрос='{search_query}'")
+        log.info(f"Получено целей для проверки: {len(targets)}")
 
-        # Запускаем асинхронную функцию поиска
-        position, timestamp = asyncio.run(search_article_position(search_query, article))
+        targets = _select_due(targets)
+        if not targets:
+            return {'status': 'idle', 'message': 'Нет целей, срок проверки которых наступил'}
 
-        # Если позиция найдена, записываем результат в таблицу
-        if position is not None:
-            result = sheets_client.add_position_data(timestamp, article, position)
-            if result:
-                return {
-                    'status': 'success',
+        # Запускаем конвейер проверки в постоянном цикле событий воркера,
+        # чтобы переиспользовать браузер между задачами
+        browser_pool = BrowserPool.instance() if settings.BROWSER_POOL_ENABLED else None
+        with _hold_schedule_lock(lock_token):
+            regional, timestamp, saved = AsyncRunner.run(run_check_pipeline(targets, browser_pool=browser_pool))
+
+        results = []
+        for region, positions in regional.items():
+            for article, search_query in targets:
+                position = positions.get((article, search_query))
+                status = check_status(positions, (article, search_query))
+                results.append({
+                    'status': 'success' if status == 'found' else status,
                     'article': article,
                     'search_query': search_query,
+                    'region': region,
                     'position': position,
-                    'timestamp': timestamp
-                }
-            else:
-                return {
-                    'status': 'error',
-                    'message': 'Ошибка при записи данных в Google Sheets'
-                }
-        else:
-            # Записываем информацию о том, что товар не найден
-            sheets_client.add_position_data(timestamp, article, "Не найден")
+                })
+
+        if not saved:
             return {
-                'status': 'not_found',
-                'article': article,
-                'search_query': search_query,
+                'status': 'error',
+                'message': 'Ошибка при сохранении результатов',
+                'results': results,
                 'timestamp': timestamp
             }
+
+        return {
+            'status': 'success',
+            'results': results,
+            'timestamp': timestamp
+        }
     except Exception as e:
         log.error(f"Ошибка при выполнении задачи: {e}")
         return {
             'status': 'error',
             'message': str(e)
         }
+    finally:
+        _release_schedule_lock(lock_token)
 
 
-async def search_article_position(search_query: str, article: str) -> tuple:
+@app.task(name='schedule_checks')
+def schedule_checks() -> dict:
     """
-    Асинхронная функция для поиска позиции товара.
+    Задача Celery, распределяющая проверку позиций между воркерами.
+
+    Цели группируются по поисковому запросу: каждый запрос проверяется
+    отдельной подзадачей check_query со случайной задержкой старта до
+    settings.FANOUT_JITTER секунд. Результаты всех подзадач собираются
+    задачей save_checks и записываются одним пакетом. Пока запуск не завершен,
+    следующие запуски пропускаются.
+
+    Returns:
+        dict: Результат планирования
+    """
+    log.info("Планирование проверки позиций товаров")
+
+    lock_token = _acquire_schedule_lock()
+    if lock_token is False:
+        return {'status': 'skipped', 'message': 'Предыдущая проверка еще выполняется'}
+
+    try:
+        targets = ConfigCache.get_targets()
+        if not targets:
+            log.error("Не удалось получить артикулы и поисковые запросы из Google Sheets")
+            _release_schedule_lock(lock_token)
+            return {
+                'status': 'error',
+                'message': 'Отсутствуют данные артикула или поисковых запросов в таблице'
+            }
+
+        targets = _select_due(targets)
+        if not targets:
+            _release_schedule_lock(lock_token)
+            return {'status': 'idle', 'message': 'Нет целей, срок проверки которых наступил'}
+
+        groups: Dict[str, List[list]] = {}
+        for article, search_query in targets:
+            groups.setdefault(search_query, []).append([article, search_query])
+
+        header = [
+            check_query.s(query_targets, lock_token).set(countdown=random.uniform(0, settings.FANOUT_JITTER))
+            for query_targets in groups.values()
+        ]
+        chord(header)(save_checks.s(lock_token))
+
+        log.info(f"Запланировано подзадач: {len(header)}, целей: {len(targets)}")
+        return {'status': 'scheduled', 'subtasks': len(header), 'targets': len(targets)}
+    except Exception as e:
+        log.error(f"Ошибка при планировании проверки: {e}")
+        _release_schedule_lock(lock_token)
+        return {
+            'status': 'error',
+            'message': str(e)
+        }
+
+
+@app.task(name='check_query', acks_late=True, reject_on_worker_lost=True)
+def check_query(targets: List[list], lock_token: Optional[str] = None) -> dict:
+    """
+    Подзадача Celery: проверяет позиции артикулов по одному поисковому запросу.
+
+    Ошибка проверки не прерывает остальные подзадачи: цели возвращаются
+    без позиций со статусом error, а результат подзадачи помечается статусом error.
+    Сообщение подтверждается после выполнения, поэтому подзадача, воркер которой
+    погиб, выполняется повторно, и chord не зависает. Пока подзадача выполняется,
+    она продлевает блокировку запуска.
+
+    Args:
+        targets: Пары [артикул, поисковый запрос] одного запроса
+        lock_token: Токен блокировки запуска, которую нужно продлевать
+
+    Returns:
+        dict: Статус, время проверки и список [артикул, запрос, позиция, статус, регион]
+    """
+    targets = [tuple(target) for target in targets]
+    try:
+        browser_pool = BrowserPool.instance() if settings.BROWSER_POOL_ENABLED else None
+        with _hold_schedule_lock(lock_token):
+            regional, timestamp = AsyncRunner.run(search_regions_batch(targets, browser_pool))
+        status = 'success'
+    except Exception as e:
+        log.error(f"Ошибка при проверке запроса '{targets[0][1]}': {e}")
+        regional = {region: {} for region in (settings.WB_REGIONS or [None])}
+        timestamp, status = None, 'error'
+
+    return {
+        'status': status,
+        'timestamp': timestamp,
+        'results': [[article, search_query, positions.get((article, search_query)),
+                     check_status(positions, (article, search_query)), region]
+                    for region, positions in regional.items()
+                    for article, search_query in targets],
+    }
+
+
+@app.task(name='save_checks')
+def save_checks(query_results: List[dict], lock_token: Optional[str] = None) -> dict:
+    """
+    Задача Celery, сохраняющая результаты всех подзадач одним пакетом.
 
     Args:
-        search_query: Поисковый запрос
-        article: Артикул товара
+        query_results: Результаты подзадач check_query
+        lock_token: Токен блокировки запуска, которую нужно снять
 
     Returns:
-        tuple: (позиция товара, временная метка)
+        dict: Результат сохранения
     """
-    parser = WildberriesParser()
     try:
-        await parser.initialize()
-        return await parser.search_article_position(search_query, article)
+        now = utc_now()
+        # Регион -> цели, позиции и время проверки целей
+        regional: Dict[Optional[str], dict] = {}
+        for query_result in query_results:
+            for article, search_query, position, status, region in query_result['results']:
+                checks = regional.setdefault(region, {'targets': [], 'positions': {}, 'timestamps': {}})
+                target = (article, search_query)
+                checks['targets'].append(target)
+                checks['timestamps'][target] = query_result['timestamp'] or now
+                # Цели с ошибкой проверки не попадают в positions и сохраняются со статусом error
+                if status != 'error':
+                    checks['positions'][target] = position
+
+        failed = sum(1 for query_result in query_results if query_result['status'] != 'success')
+        if not regional:
+            log.error("Подзадачи проверки не вернули результатов")
+            return {'status': 'error', 'message': 'Нет результатов проверки'}
+
+        timestamp = max(max(checks['timestamps'].values()) for checks in regional.values())
+        success, saved = True, 0
+        for region, checks in regional.items():
+            success = save_results(checks['targets'], checks['positions'], timestamp,
+                                   timestamps=checks['timestamps'], region=region) and success
+            saved += len(checks['targets'])
+
+        log.info(f"Сохранено результатов: {saved}, подзадач с ошибкой: {failed}")
+        return {
+            'status': 'success' if success else 'error',
+            'saved': saved,
+            'failed_subtasks': failed,
+            'timestamp': timestamp
+        }
     finally:
-        await parser.close()
\ No newline at end of file
+        _release_schedule_lock(lock_token)
+
+
+def _acquire_schedule_lock():
+    """
+    Захватывает блокировку запуска проверок в Redis.
+
+    Блокировка живет _schedule_lock_ttl() секунд и продлевается, пока выполняются
+    задачи запуска (_hold_schedule_lock). Если запуск завис или сообщение
+    подзадачи потеряно, следующий запуск начнется вскоре после истечения TTL.
+
+    Returns:
+        Токен блокировки; False, если блокировка занята другим запуском;
+        None, если Redis недоступен (запуск выполняется без блокировки)
+    """
+    token = uuid.uuid4().hex
+    try:
+        if get_redis().set(SCHEDULE_LOCK_KEY, token, nx=True, ex=_schedule_lock_ttl()):
+            return token
+    except Exception as e:
+        log.warning(f"Не удалось захватить блокировку запуска проверок: {e}")
+        return None
+
+    log.warning("Предыдущая проверка еще выполняется, запуск пропущен")
+    return False
+
+
+def _release_schedule_lock(token: Optional[str]) -> None:
+    """
+    Снимает блокировку запуска проверок, если она принадлежит этому запуску.
+
+    Args:
+        token: Токен, полученный от _acquire_schedule_lock
+    """
+    if not token:
+        return
+
+    try:
+        get_redis().eval(_RELEASE_LOCK_SCRIPT, 1, SCHEDULE_LOCK_KEY, token)
+    except Exception as e:
+        log.warning(f"Не удалось снять блокировку запуска проверок: {e}")
+
+
+def _schedule_lock_ttl() -> int:
+    """
+    Вычисляет время жизни блокировки запуска по ожидаемой длительности запуска.
+
+    Returns:
+        int: Удвоенный интервал запуска beat, но не меньше SCHEDULE_LOCK_MIN_TTL
+            и не больше settings.SCHEDULE_LOCK_TTL секунд
+    """
+    interval = settings.ADAPTIVE_TICK if settings.ADAPTIVE_SCHEDULE_ENABLED else settings.UPDATE_INTERVAL
+    return min(settings.SCHEDULE_LOCK_TTL, max(2 * interval, SCHEDULE_LOCK_MIN_TTL))
+
+
+@contextmanager
+def _hold_schedule_lock(token: Optional[str]) -> Iterator[None]:
+    """
+    Продлевает блокировку запуска, пока выполняется тело блока.
+
+    Блокировка продлевается сразу и затем каждую треть TTL в фоновом потоке.
+    Если процесс воркера погибнет, продление прекратится и блокировка истечет.
+
+    Args:
+        token: Токен блокировки; без токена блок выполняется как есть
+    """
+    if not token:
+        yield
+        return
+
+    ttl = _schedule_lock_ttl()
+    stop = threading.Event()
+
+    def refresh() -> None:
+        while True:
+            try:
+                get_redis().eval(_REFRESH_LOCK_SCRIPT, 1, SCHEDULE_LOCK_KEY, token, ttl)
+            except Exception as e:
+                log.warning(f"Не удалось продлить блокировку запуска проверок: {e}")
+            if stop.wait(ttl / 3):
+                return
+
+    thread = threading.Thread(target=refresh, name="schedule-lock", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+
+
+def _select_due(targets: list) -> list:
+    """
+    Оставляет цели, срок проверки которых наступил по адаптивному расписанию.
+
+    Args:
+        targets: Список пар (артикул, поисковый запрос)
+
+    Returns:
+        list: Пары для проверки; все пары, если расписание выключено или недоступно
+    """
+    if not settings.ADAPTIVE_SCHEDULE_ENABLED:
+        return targets
+
+    try:
+        return CheckSchedule().select_due(targets)
+    except Exception as e:
+        log.warning(f"Адаптивное расписание недоступно, проверяем все цели: {e}")
+        return targets
+
+
+@task_postrun.connect
+def govern_memory(**kwargs) -> None:
+    """Проверяет память воркера и браузера после задачи и при превышении пределов освобождает ее."""
+    if not settings.MEMORY_GOVERNOR_ENABLED:
+        return
+
+    try:
+        MemoryGovernor.instance().check()
+    except Exception as e:
+        log.warning(f"Ошибка контроля памяти воркера: {e}")
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def shutdown_browser_pool(**kwargs) -> None:
+    """Закрывает пул браузера и цикл событий при остановке процесса воркера."""
+    browser_pool = BrowserPool.current()
+    if browser_pool is not None:
+        try:
+            AsyncRunner.run(browser_pool.close(), timeout=30)
+        except Exception as e:
+            log.warning(f"Ошибка при закрытии пула браузера: {e}")
+    AsyncRunner.stop()
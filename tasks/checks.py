@@ -0,0 +1,263 @@
+import asyncio
+from typing import Optional
+
+from utils import log
+from config import settings
+from utils import GoogleSheetsClient, BufferedSheetsWriter, PositionStore, CheckSchedule, Metrics, SnapshotStore
+from parser import WildberriesParser, BrowserPool, RankIndex, PageCache, IdentityPool, RegionSweep, CheckPipeline
+
+# Значение ячейки таблицы для товара, не найденного в выдаче, и для проверки с ошибкой
+NOT_FOUND_LABEL = "Не найден"
+ERROR_LABEL = "Ошибка проверки"
+
+
+async def search_article_position(search_query: str, article: str) -> tuple:
+    """
+    Асинхронная функция для поиска позиции товара.
+
+    Args:
+        search_query: Поисковый запрос
+        article: Артикул товара
+
+    Returns:
+        tuple: (позиция товара, временная метка)
+    """
+    parser = WildberriesParser(rank_index=_get_rank_index(), page_cache=_get_page_cache(),
+                               identity_pool=_get_identity_pool(), snapshot_store=_get_snapshot_store())
+    try:
+        await parser.initialize()
+        return await parser.search_article_position(search_query, article)
+    finally:
+        await parser.close()
+
+
+async def search_positions_batch(targets: list, browser_pool: Optional[BrowserPool] = None) -> tuple:
+    """
+    Асинхронная функция для пакетного поиска позиций товаров.
+
+    Args:
+        targets: Список пар (артикул, поисковый запрос)
+        browser_pool: Пул браузера процесса; без него запускается отдельный браузер
+
+    Returns:
+        tuple: (словарь (артикул, запрос) -> позиция или None, временная метка);
+            пары с неизвестным из-за ошибки результатом в словарь не входят
+    """
+    parser = WildberriesParser(browser_pool=browser_pool, rank_index=_get_rank_index(),
+                               page_cache=_get_page_cache(), identity_pool=_get_identity_pool(),
+                               snapshot_store=_get_snapshot_store())
+    try:
+        await parser.initialize()
+        return await parser.search_batch(targets)
+    finally:
+        await parser.close()
+
+
+async def search_regions_batch(targets: list, browser_pool: Optional[BrowserPool] = None) -> tuple:
+    """
+    Асинхронная функция для пакетного поиска позиций во всех регионах доставки.
+
+    Регионы из settings.WB_REGIONS проверяются параллельно через RegionSweep;
+    без настроенных регионов выполняется обычный пакетный поиск.
+
+    Args:
+        targets: Список пар (артикул, поисковый запрос)
+        browser_pool: Пул браузера процесса
+
+    Returns:
+        tuple: (словарь регион -> словарь (артикул, запрос) -> позиция или None, временная метка);
+            без настроенных регионов единственный ключ - None
+    """
+    if not settings.WB_REGIONS:
+        positions, timestamp = await search_positions_batch(targets, browser_pool)
+        return {None: positions}, timestamp
+
+    sweep = RegionSweep(browser_pool=browser_pool, rank_index=_get_rank_index(),
+                        page_cache=_get_page_cache(), identity_pool=_get_identity_pool(),
+                        snapshot_store=_get_snapshot_store())
+    return await sweep.search_batch(targets)
+
+
+async def run_check_pipeline(targets: list, sheets_client: Optional[GoogleSheetsClient] = None,
+                             browser_pool: Optional[BrowserPool] = None) -> tuple:
+    """
+    Проверяет цели конвейером CheckPipeline.
+
+    Запросы обходятся параллельно, а результаты каждого запроса сохраняются в
+    отдельном потоке, пока обходятся следующие. Строки для Google Sheets копятся
+    в общем буфере и записываются по его правилам, остаток - в конце проверки;
+    каждая запись идет через сервис Google Sheets того потока, в котором выполняется.
+
+    Args:
+        targets: Список пар (артикул, поисковый запрос)
+        sheets_client: Клиент Google Sheets для выгрузки
+        browser_pool: Пул браузера процесса; без него на время проверки запускается
+            общий для всех запросов браузер
+
+    Returns:
+        tuple: (словарь регион -> словарь (артикул, запрос) -> позиция или None,
+            временная метка, успешно ли сохранены все результаты)
+    """
+    own_pool = browser_pool is None and settings.WB_SEARCH_BACKEND != "api"
+    if own_pool:
+        browser_pool = BrowserPool()
+    writer = BufferedSheetsWriter(sheets_client) if settings.SHEETS_EXPORT_ENABLED else None
+
+    def sink(group: list, regional: dict, timestamp: str) -> bool:
+        saved = [save_results(group, positions, timestamp, sheets_client, region=region, writer=writer)
+                 for region, positions in regional.items()]
+        return all(saved)
+
+    pipeline = CheckPipeline(lambda group: search_regions_batch(group, browser_pool), sink)
+    try:
+        regional, timestamp = await pipeline.run(targets)
+    finally:
+        if own_pool:
+            await browser_pool.close()
+
+    saved = pipeline.saved
+    if writer:
+        saved = await asyncio.to_thread(writer.flush) and saved
+    return regional, timestamp, saved
+
+
+def save_results(targets: list, positions: dict, timestamp: str,
+                 sheets_client: Optional[GoogleSheetsClient] = None,
+                 timestamps: Optional[dict] = None, region: Optional[str] = None,
+                 writer: Optional[BufferedSheetsWriter] = None) -> bool:
+    """
+    Сохраняет результаты проверки в локальное хранилище и экспортирует в Google Sheets.
+
+    Хранилище позиций - основной источник истории; выгрузка в таблицу выполняется
+    одним обращением и отключается настройкой SHEETS_EXPORT_ENABLED. Пары,
+    отсутствующие в positions, сохраняются со статусом error, а не "не найден".
+
+    Args:
+        targets: Список пар (артикул, поисковый запрос)
+        positions: Словарь (артикул, запрос) -> позиция или None (товар не найден)
+        timestamp: Время проверки
+        sheets_client: Клиент Google Sheets для выгрузки
+        timestamps: Время проверки отдельных целей (артикул, запрос), если оно
+            отличается от timestamp
+        region: Регион доставки результатов (None - регион по умолчанию). Адаптивное
+            расписание обновляется только по первому региону settings.WB_REGIONS
+        writer: Общий буфер записи в Google Sheets; строки добавляются в него, а
+            остаток записывает владелец буфера. Без него строки записываются сразу
+
+    Returns:
+        bool: Успешно ли сохранены результаты
+    """
+    success = True
+    timestamps = timestamps or {}
+
+    statuses = {target: check_status(positions, target) for target in targets}
+    for status in statuses.values():
+        Metrics.inc('wb_checks_total', status=status)
+
+    if settings.POSITION_STORE_ENABLED:
+        try:
+            PositionStore.instance().append_many(
+                (timestamps.get((article, search_query), timestamp), article, search_query,
+                 positions.get((article, search_query)), statuses[(article, search_query)], region)
+                for article, search_query in targets
+            )
+        except Exception as e:
+            log.error(f"Ошибка при сохранении результатов в хранилище позиций: {e}")
+            success = False
+
+    primary_region = next(iter(settings.WB_REGIONS), None)
+    if settings.ADAPTIVE_SCHEDULE_ENABLED and region == primary_region:
+        try:
+            schedule = CheckSchedule()
+            schedule.record(
+                (article, search_query, positions[(article, search_query)])
+                for article, search_query in targets if (article, search_query) in positions
+            )
+            schedule.record_errors([target for target in targets if statuses[target] == 'error'])
+        except Exception as e:
+            log.warning(f"Не удалось обновить адаптивное расписание: {e}")
+
+    if settings.SHEETS_EXPORT_ENABLED:
+        own_writer = writer is None
+        if own_writer:
+            writer = BufferedSheetsWriter(sheets_client, max_rows=len(targets))
+        labels = {'not_found': NOT_FOUND_LABEL, 'error': ERROR_LABEL}
+        for article, search_query in targets:
+            position = positions.get((article, search_query))
+            # Строки, которые не удалось записать, остаются в буфере до следующей записи
+            writer.add(timestamps.get((article, search_query), timestamp), article,
+                       labels.get(statuses[(article, search_query)], position), search_query, region)
+        if own_writer:
+            success = writer.flush() and success
+
+    return success
+
+
+def check_status(positions: dict, target: tuple) -> str:
+    """
+    Определяет статус проверки пары.
+
+    Args:
+        positions: Словарь (артикул, запрос) -> позиция или None
+        target: Пара (артикул, поисковый запрос)
+
+    Returns:
+        str: "found", "not_found" (отсутствие подтверждено) или "error" (результат неизвестен)
+    """
+    if target not in positions:
+        return 'error'
+    return 'found' if positions[target] is not None else 'not_found'
+
+
+def _get_rank_index() -> Optional[RankIndex]:
+    """
+    Возвращает индекс позиций процесса, если он включен в настройках.
+
+    Returns:
+        RankIndex или None
+    """
+    if not settings.RANK_INDEX_ENABLED:
+        return None
+
+    try:
+        return RankIndex.instance()
+    except Exception as e:
+        log.warning(f"Индекс позиций недоступен: {e}")
+        return None
+
+
+def _get_page_cache() -> Optional[PageCache]:
+    """
+    Возвращает кэш страниц процесса, если он включен в настройках.
+
+    Returns:
+        PageCache или None
+    """
+    return PageCache.instance() if settings.PAGE_CACHE_ENABLED else None
+
+
+def _get_snapshot_store() -> Optional[SnapshotStore]:
+    """
+    Возвращает хранилище снимков топа выдачи, если снимки включены в настройках.
+
+    Returns:
+        SnapshotStore или None
+    """
+    if not settings.SNAPSHOT_ENABLED:
+        return None
+
+    try:
+        return SnapshotStore()
+    except Exception as e:
+        log.warning(f"Хранилище снимков выдачи недоступно: {e}")
+        return None
+
+
+def _get_identity_pool() -> Optional[IdentityPool]:
+    """
+    Возвращает пул профилей клиента процесса, если ротация включена в настройках.
+
+    Returns:
+        IdentityPool или None
+    """
+    return IdentityPool.instance() if settings.IDENTITY_ROTATION_ENABLED else None
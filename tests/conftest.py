@@ -0,0 +1,35 @@
+import uuid
+
+import pytest
+
+from config import settings
+from benchmarks.storefront import StubStorefront
+from benchmarks.fake_sheets import FakeSheetsClient
+
+
+@pytest.fixture
+def storefront(monkeypatch):
+    """Локальная заглушка витрины, на которую направлены адреса выдачи и поискового API."""
+    with StubStorefront(pages_per_query=3, page_size=100) as stub:
+        monkeypatch.setattr(settings, "WB_SEARCH_URL", stub.search_url)
+        monkeypatch.setattr(settings, "WB_SEARCH_API_URL", stub.api_url)
+        monkeypatch.setattr(settings, "WB_PAGE_SIZE", 100)
+        # Обход заканчивается на странице "ничего не найдено", а не на пределе безопасного поиска
+        monkeypatch.setattr(settings, "SAFE_SEARCH", False)
+        # Каждый тест обходит выдачу заново и не пишет в data/ проекта
+        monkeypatch.setattr(settings, "PAGE_CACHE_ENABLED", False)
+        monkeypatch.setattr(settings, "RANK_INDEX_ENABLED", False)
+        monkeypatch.setattr(settings, "SNAPSHOT_ENABLED", False)
+        # Тесты не зависят от Redis
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+        monkeypatch.setattr(settings, "PAGE_RETRY_BASE_DELAY", 0.01)
+        monkeypatch.setattr(settings, "WB_REGIONS", {})
+        yield stub
+
+
+
+@pytest.fixture
+def sheets_client(monkeypatch):
+    """Клиент заглушки Google Sheets; у каждого теста своя таблица, чтобы заголовок проверялся заново."""
+    monkeypatch.setattr(settings, "WB_REGIONS", {})
+    return FakeSheetsClient(spreadsheet_id=f"test-{uuid.uuid4().hex}")
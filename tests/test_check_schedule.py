@@ -0,0 +1,93 @@
+import pytest
+
+from config import settings
+from utils.check_schedule import CheckSchedule
+
+START = 1_000_000.0
+
+
+@pytest.fixture
+def schedule(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPDATE_INTERVAL", 600)
+    monkeypatch.setattr(settings, "ADAPTIVE_TICK", 60)
+    monkeypatch.setattr(settings, "ADAPTIVE_MIN_INTERVAL", 300)
+    monkeypatch.setattr(settings, "ADAPTIVE_MAX_INTERVAL", 1200)
+    monkeypatch.setattr(settings, "ADAPTIVE_STABLE_DELTA", 3)
+    # 10 страниц на запуск
+    monkeypatch.setattr(settings, "CRAWL_BUDGET_PAGES_PER_HOUR", 600)
+    monkeypatch.setattr(settings, "WB_PAGE_SIZE", 100)
+    monkeypatch.setattr(settings, "WB_REGIONS", {})
+    monkeypatch.setattr(settings, "SAFE_SEARCH", False)
+    monkeypatch.setattr(settings, "RANK_INDEX_MAX_DEPTH", 50)
+    return CheckSchedule(str(tmp_path / "check_schedule.sqlite3"))
+
+
+def _interval(schedule: CheckSchedule, article: str, search_query: str) -> float:
+    return schedule._load()[(search_query, article)]['interval']
+
+
+def test_new_pairs_are_due_once(schedule):
+    targets = [("1", "чай"), ("2", "чай")]
+    schedule.record([("1", "чай", 150), ("2", "чай", 250)], now=START - 3600)
+
+    assert schedule.select_due(targets, now=START) == targets
+    # Выбранные пары сдвинуты на интервал и не выбираются повторно
+    assert schedule.select_due(targets, now=START + 60) == []
+    assert schedule.select_due(targets, now=START + 660) == targets
+
+
+def test_interval_grows_while_stable_and_shrinks_on_change(schedule):
+    schedule.record([("1", "чай", 150)], now=START)
+    assert _interval(schedule, "1", "чай") == 600
+
+    schedule.record([("1", "чай", 152)], now=START + 600)
+    assert _interval(schedule, "1", "чай") == 900
+
+    schedule.record([("1", "чай", 153)], now=START + 1500)
+    assert _interval(schedule, "1", "чай") == 1200
+
+    schedule.record([("1", "чай", None)], now=START + 2700)
+    assert _interval(schedule, "1", "чай") == 600
+
+    schedule.record([("1", "чай", 40)], now=START + 3300)
+    assert _interval(schedule, "1", "чай") == 300
+
+
+def test_error_retries_after_min_interval(schedule):
+    schedule.record([("1", "чай", 150)], now=START)
+    schedule.record([("1", "чай", 152)], now=START + 600)
+    schedule.record_errors([("1", "чай")], now=START + 1500)
+
+    entry = schedule._load()[("чай", "1")]
+    assert entry['interval'] == 900
+    assert entry['next_due'] == START + 1500 + 300
+
+
+def test_queries_are_limited_by_budget(schedule):
+    targets = [("1", "чай"), ("2", "кофе"), ("3", "сахар")]
+    # Каждый запрос стоит 5 страниц, на запуск - 10
+    schedule.record([(article, query, 450) for article, query in targets], now=START - 3600)
+
+    first = schedule.select_due(targets, now=START)
+    assert len(first) == 2
+    assert schedule.select_due(targets, now=START + 60) == [target for target in targets if target not in first]
+
+
+def test_overspend_is_carried_as_debt(schedule):
+    # Новый запрос без истории стоит RANK_INDEX_MAX_DEPTH = 50 страниц при доле запуска 10
+    assert schedule.select_due([("1", "чай")], now=START) == [("1", "чай")]
+
+    waiting = [("2", "кофе")]
+    # Долг 40 страниц гасится 4 запусками по 10 страниц
+    for tick in range(1, 5):
+        assert schedule.select_due(waiting, now=START + 60 * tick) == []
+    assert schedule.select_due(waiting, now=START + 300) == waiting
+
+
+def test_idle_time_refills_no_more_than_one_tick(schedule):
+    targets = [("1", "чай"), ("2", "кофе"), ("3", "сахар")]
+    schedule.record([(article, query, 450) for article, query in targets], now=START - 3600)
+    schedule._save_budget(0.0, START - 3600)
+
+    # После часа простоя остаток не больше доли одного запуска
+    assert len(schedule.select_due(targets, now=START)) == 2
@@ -0,0 +1,52 @@
+import pytest
+
+from config import settings
+from utils import config_cache
+from utils.config_cache import ConfigCache
+
+
+class CountingClient:
+    """Клиент таблицы, считающий созданные экземпляры и чтения конфигурации."""
+
+    created = 0
+    reads = 0
+
+    def __init__(self):
+        CountingClient.created += 1
+
+    def get_tracking_targets(self):
+        CountingClient.reads += 1
+        return [("1", "чай")]
+
+
+@pytest.fixture(autouse=True)
+def counting_client(monkeypatch):
+    CountingClient.created = CountingClient.reads = 0
+    monkeypatch.setattr(config_cache, "GoogleSheetsClient", CountingClient)
+    monkeypatch.setattr(settings, "CONFIG_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "CONFIG_CACHE_TTL", 60)
+    ConfigCache.invalidate()
+    yield
+    ConfigCache.invalidate()
+
+
+def test_default_ttl_not_longer_than_update_interval():
+    defaults = type(settings).model_fields
+    assert defaults["CONFIG_CACHE_TTL"].default <= defaults["UPDATE_INTERVAL"].default
+
+
+def test_hit_does_not_build_client():
+    assert ConfigCache.get_targets() == [("1", "чай")]
+    assert ConfigCache.get_targets() == [("1", "чай")]
+
+    assert CountingClient.created == 1
+    assert CountingClient.reads == 1
+
+
+def test_disabled_cache_reads_every_time(monkeypatch):
+    monkeypatch.setattr(settings, "CONFIG_CACHE_TTL", 0)
+
+    ConfigCache.get_targets()
+    ConfigCache.get_targets()
+
+    assert CountingClient.reads == 2
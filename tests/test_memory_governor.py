@@ -0,0 +1,101 @@
+import pytest
+
+from config import settings
+from parser import memory_governor
+from parser.browser_pool import BrowserPool
+from parser.memory_governor import MemoryGovernor
+from utils import AsyncRunner
+
+
+class FakePool:
+    """Пул браузера, запоминающий запрошенные перезапуски."""
+
+    def __init__(self, busy: bool = False):
+        self.busy = busy
+        self.calls = []
+
+    async def request_recycle(self, reason):
+        self.calls.append(("recycle", reason))
+        return not self.busy
+
+    async def shutdown(self, reason):
+        self.calls.append(("shutdown", reason))
+        return not self.busy
+
+
+class Memory:
+    """Измерения памяти, которые тест задает сам: (воркер, браузер) в МБ по очереди."""
+
+    def __init__(self, *samples):
+        self.samples = list(samples)
+
+    def __call__(self):
+        worker_mb, browser_mb = self.samples.pop(0) if len(self.samples) > 1 else self.samples[0]
+        return {'worker_mb': worker_mb, 'browser_mb': browser_mb,
+                'total_mb': worker_mb + browser_mb, 'python_blocks': 0}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    fake = FakePool()
+    monkeypatch.setattr(BrowserPool, "current", classmethod(lambda cls: fake))
+    monkeypatch.setattr(settings, "MEMORY_RECYCLE_COOLDOWN", 300)
+    monkeypatch.setattr(settings, "MEMORY_LEAK_GROWTH_MB", 100)
+    monkeypatch.setattr(settings, "MEMORY_TRACEMALLOC", False)
+    yield fake
+    AsyncRunner.stop()
+
+
+def _governor(monkeypatch, *samples):
+    monkeypatch.setattr(MemoryGovernor, "sample", staticmethod(Memory(*samples)))
+    return MemoryGovernor(soft_limit_mb=1000, hard_limit_mb=2000)
+
+
+def test_below_soft_limit_does_nothing(pool, monkeypatch):
+    governor = _governor(monkeypatch, (300, 699))
+
+    assert governor.check() is None
+    assert pool.calls == []
+
+
+def test_soft_limit_recycles_browser_gracefully(pool, monkeypatch):
+    governor = _governor(monkeypatch, (400, 700), (350, 150))
+
+    report = governor.check()
+
+    assert report['level'] == 'soft'
+    assert report['browser'] == 'restarted'
+    assert (report['reclaimed_worker_mb'], report['reclaimed_browser_mb']) == (50, 550)
+    assert pool.calls == [("recycle", "memory_soft")]
+
+
+def test_hard_limit_stops_browser(pool, monkeypatch):
+    pool.busy = True
+    governor = _governor(monkeypatch, (500, 1600), (500, 1500))
+
+    report = governor.check()
+
+    assert report['level'] == 'hard'
+    # Контексты заняты: остановка откладывается до их освобождения
+    assert report['browser'] == 'scheduled'
+    assert pool.calls == [("shutdown", "memory_hard")]
+
+
+def test_recycles_respect_cooldown(pool, monkeypatch):
+    governor = _governor(monkeypatch, (500, 1600))
+
+    assert governor.check() is not None
+    assert governor.check() is None
+    assert len(pool.calls) == 1
+
+
+def test_growing_floor_is_reported_as_leak(pool, monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_RECYCLE_COOLDOWN", 0)
+    governor = _governor(monkeypatch, (1200, 0), (1000, 0), (1200, 0), (1060, 0), (1200, 0), (1110, 0))
+    warnings = []
+    monkeypatch.setattr(memory_governor.log, "warning", warnings.append)
+
+    for _ in range(3):
+        governor.check()
+
+    assert any("утечка" in message for message in warnings)
@@ -0,0 +1,54 @@
+import pytest
+
+from config import settings
+from utils.metrics import DEFINITIONS, Metrics
+
+
+@pytest.fixture(autouse=True)
+def empty_metrics(monkeypatch):
+    monkeypatch.setattr(Metrics, "_counters", {})
+    monkeypatch.setattr(Metrics, "_gauges", {})
+    monkeypatch.setattr(Metrics, "_histograms", {})
+    monkeypatch.setattr(Metrics, "_callbacks", [])
+
+
+def test_disabled_metrics_are_not_recorded(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+
+    Metrics.inc('wb_pages_crawled_total', backend='api')
+    with Metrics.timer('goto'):
+        pass
+
+    assert Metrics.render() == "\n"
+
+
+def test_metrics_enabled_after_import(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+
+    Metrics.inc('wb_pages_crawled_total', backend='api')
+    Metrics.inc('wb_pages_crawled_total', 2, backend='api')
+    Metrics.observe('wb_stage_duration_seconds', 0.2, stage='goto')
+
+    text = Metrics.render()
+    assert 'wb_pages_crawled_total{backend="api"} 3' in text
+    assert 'wb_stage_duration_seconds_bucket{stage="goto",le="0.1"} 0' in text
+    assert 'wb_stage_duration_seconds_bucket{stage="goto",le="0.25"} 1' in text
+    assert 'wb_stage_duration_seconds_count{stage="goto"} 1' in text
+
+
+def test_pipeline_queue_depth_has_help_and_type(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+
+    Metrics.set_gauge('wb_pipeline_queue_depth', 2)
+
+    lines = Metrics.render().splitlines()
+    assert "# TYPE wb_pipeline_queue_depth gauge" in lines
+    assert any(line.startswith("# HELP wb_pipeline_queue_depth ") and not line.endswith(" wb_pipeline_queue_depth")
+               for line in lines)
+    assert "wb_pipeline_queue_depth 2" in lines
+
+
+def test_memory_metrics_are_registered():
+    for name in ('wb_browser_recycles_total', 'wb_memory_recycles_total',
+                 'wb_memory_reclaimed_bytes_total', 'wb_memory_leak_warnings_total'):
+        assert DEFINITIONS[name][0] == 'counter'
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from parser import WildberriesParser
+from parser.page_cache import PageCache
+
+
+class Loader:
+    """Функция загрузки страницы, считающая вызовы."""
+
+    def __init__(self, result, delay: float = 0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return list(self.result)
+
+
+def test_concurrent_loads_are_coalesced():
+    cache = PageCache(ttl=60, backend="memory")
+    load = Loader(["1", "2"], delay=0.05)
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_fetch("чай", 1, load) for _ in range(3)))
+
+    assert asyncio.run(run()) == [["1", "2"]] * 3
+    assert load.calls == 1
+    assert cache.stats() == {"hits": 0, "misses": 1, "coalesced": 2}
+
+
+def test_cached_page_is_shared_by_normalized_query():
+    cache = PageCache(ttl=60, backend="memory")
+    load = Loader(["1", "2"])
+
+    async def run():
+        await cache.get_or_fetch("Зеленый  чай", 1, load)
+        return await cache.get_or_fetch("зеленый чай", 1, load)
+
+    assert asyncio.run(run()) == ["1", "2"]
+    assert load.calls == 1
+    assert cache.hits == 1
+
+
+def test_empty_page_is_not_cached():
+    cache = PageCache(ttl=60, backend="memory")
+    load = Loader([])
+
+    async def run():
+        await cache.get_or_fetch("чай", 1, load)
+        return await cache.get_or_fetch("чай", 1, load)
+
+    assert asyncio.run(run()) == []
+    assert load.calls == 2
+
+
+def test_error_reaches_all_waiters_and_is_not_cached():
+    cache = PageCache(ttl=60, backend="memory")
+    load = Loader(RuntimeError("timeout"), delay=0.05)
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_fetch("чай", 1, load) for _ in range(2)),
+                                    return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+    load.result = ["1"]
+    assert asyncio.run(cache.get_or_fetch("чай", 1, load)) == ["1"]
+    assert load.calls == 2
+
+
+def test_cancelled_waiter_does_not_cancel_shared_load():
+    cache = PageCache(ttl=60, backend="memory")
+    load = Loader(["1"], delay=0.05)
+
+    async def run():
+        first = asyncio.create_task(cache.get_or_fetch("чай", 1, load))
+        second = asyncio.create_task(cache.get_or_fetch("чай", 1, load))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == ["1"]
+    assert load.calls == 1
+
+
+def test_parsers_share_pages_of_one_query(storefront):
+    storefront.latency = 0.05
+    cache = PageCache(ttl=60, backend="memory")
+    first, second = storefront.article_at("чай", 150), storefront.article_at("чай", 120)
+
+    async def search(article):
+        parser = WildberriesParser(backend="api", page_cache=cache)
+        await parser.initialize()
+        try:
+            positions, _ = await parser.search_articles_positions("чай", [article])
+            return positions
+        finally:
+            await parser.close()
+
+    async def run():
+        return await asyncio.gather(search(first), search(second))
+
+    assert asyncio.run(run()) == [{first: 150}, {second: 120}]
+    assert storefront.requests["api"] == 2
+
+
+def test_close_waits_for_load_shared_with_another_parser(storefront):
+    storefront.latency = 0.1
+    cache = PageCache(ttl=60, backend="memory")
+    expected, _ = storefront.page("чай", 1)
+
+    async def run():
+        owner = WildberriesParser(backend="api", page_cache=cache)
+        other = WildberriesParser(backend="api", page_cache=cache)
+        await owner.initialize()
+        await other.initialize()
+        try:
+            own_load = asyncio.create_task(owner._fetch_page("чай", 1))
+            await asyncio.sleep(0.02)
+            shared_load = asyncio.create_task(other._fetch_page("чай", 1))
+            await asyncio.sleep(0.02)
+            # Первый парсер закрывается, пока его загрузку ждет второй
+            own_load.cancel()
+            await owner.close()
+            return await shared_load
+        finally:
+            await other.close()
+
+    assert asyncio.run(run()) == expected
+    assert storefront.requests["api"] == 1
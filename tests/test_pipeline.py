@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from config import settings
+from parser import CheckPipeline
+from tasks.checks import run_check_pipeline
+from utils import google_sheets
+from utils.google_sheets import GoogleSheetsClient
+
+QUERIES = ["чай", "кофе", "сахар", "мед", "соль", "перец", "рис", "мука"]
+
+
+def _targets(queries):
+    return [(f"{index}{suffix}", query) for index, query in enumerate(queries) for suffix in ("1", "2")]
+
+
+async def _search(group):
+    await asyncio.sleep(0.001)
+    return {None: {target: 1 for target in group}}, "2025-04-01 10:00:00"
+
+
+def test_groups_are_saved_in_order_and_results_merged():
+    saved_queries = []
+
+    def sink(group, regional, timestamp):
+        saved_queries.append(group[0][1])
+        return True
+
+    pipeline = CheckPipeline(_search, sink, workers=1)
+    results, _ = asyncio.run(pipeline.run(_targets(QUERIES)))
+
+    assert saved_queries == QUERIES
+    assert results == {None: {target: 1 for target in _targets(QUERIES)}}
+    assert pipeline.saved
+
+
+def test_full_queue_holds_back_crawling():
+    lock = threading.Lock()
+    counts = {"searched": 0, "saved": 0}
+    backlog = []
+
+    async def search(group):
+        result = await _search(group)
+        with lock:
+            counts["searched"] += 1
+            backlog.append(counts["searched"] - counts["saved"])
+        return result
+
+    def sink(group, regional, timestamp):
+        time.sleep(0.02)
+        with lock:
+            counts["saved"] += 1
+        return True
+
+    asyncio.run(CheckPipeline(search, sink, workers=1, queue_size=1).run(_targets(QUERIES)))
+
+    # Группа в сохранении, группа в очереди и группа, ждущая места в очереди
+    assert max(backlog) <= 3
+    assert counts["saved"] == len(QUERIES)
+
+
+def test_failed_group_does_not_stop_others(monkeypatch):
+    monkeypatch.setattr(settings, "WB_REGIONS", {})
+    sunk = {}
+
+    async def search(group):
+        if group[0][1] == "кофе":
+            raise RuntimeError("timeout")
+        return await _search(group)
+
+    def sink(group, regional, timestamp):
+        if group[0][1] == "сахар":
+            raise OSError("disk full")
+        sunk[group[0][1]] = regional
+        return True
+
+    pipeline = CheckPipeline(search, sink, workers=2)
+    results, _ = asyncio.run(pipeline.run(_targets(QUERIES[:4])))
+
+    # Результат запроса с ошибкой обхода неизвестен, а не "не найден"
+    assert sunk["кофе"] == {None: {}}
+    assert set(sunk) == {"чай", "кофе", "мед"}
+    assert not any(query == "кофе" for _, query in results[None])
+    assert not pipeline.saved
+
+
+def test_check_pipeline_writes_all_rows(storefront, sheets_client, monkeypatch):
+    monkeypatch.setattr(settings, "WB_SEARCH_BACKEND", "api")
+    monkeypatch.setattr(settings, "SHEETS_EXPORT_ENABLED", True)
+    monkeypatch.setattr(settings, "POSITION_STORE_ENABLED", False)
+    monkeypatch.setattr(settings, "ADAPTIVE_SCHEDULE_ENABLED", False)
+    targets = [(storefront.article_at(query, 42), query) for query in QUERIES[:3]]
+
+    regional, _, saved = asyncio.run(run_check_pipeline(targets, sheets_client))
+
+    assert saved
+    assert regional == {None: {target: 42 for target in targets}}
+    assert sorted(row[1] for row in sheets_client.service.rows[2:]) == sorted(article for article, _ in targets)
+
+
+def test_sheets_client_uses_service_of_current_thread(monkeypatch):
+    monkeypatch.setattr(GoogleSheetsClient, "_get_credentials", staticmethod(lambda: object()))
+    monkeypatch.setattr(google_sheets, "AuthorizedHttp", lambda creds, http: object())
+    monkeypatch.setattr(google_sheets, "build", lambda *args, **kwargs: object())
+    monkeypatch.setattr(settings, "CREDENTIALS_FILE", f"test-{threading.get_ident()}.json")
+
+    client = GoogleSheetsClient("test")
+    other = {}
+    thread = threading.Thread(target=lambda: other.update(first=client.service, second=client.service))
+    thread.start()
+    thread.join()
+
+    assert client.service is client.service
+    assert other["first"] is other["second"]
+    assert other["first"] is not client.service
@@ -0,0 +1,72 @@
+import calendar
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from config import settings
+from utils.position_store import PositionStore, to_unix, utc_now, TIMESTAMP_FORMAT
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PositionStore(str(tmp_path / "positions.sqlite3"))
+
+
+@pytest.fixture
+def moscow_time(monkeypatch):
+    """Часовой пояс процесса UTC+3 на время теста."""
+    monkeypatch.setenv("TZ", "Europe/Moscow")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_append_and_query(store):
+    store.append_many([
+        ("2025-04-01 10:00:00", "1", "чай", 5),
+        ("2025-04-01 11:00:00", "1", "чай", None),
+        ("2025-04-01 12:00:00", "1", "чай", None, "error"),
+        ("2025-04-01 12:00:00", "1", "чай", 7, None, "spb"),
+        ("2025-04-01 12:00:00", "2", "кофе", 1),
+    ])
+
+    rows = store.query(article="1", search_query="чай", region="")
+    assert [(row["position"], row["status"]) for row in rows] == [(5, "found"), (None, "not_found"), (None, "error")]
+    assert [row["position"] for row in store.query(article="1", region="spb")] == [7]
+    assert len(store.query(since="2025-04-01 11:00:00", until="2025-04-01 12:00:00")) == 1
+    assert [row["status"] for row in store.query(article="1", region="", limit=1)] == ["error"]
+
+
+def test_aggregate_by_utc_day(store):
+    store.append_many([
+        ("2025-04-01 22:00:00", "1", "чай", 10),
+        ("2025-04-01 23:30:00", "1", "чай", 20),
+        ("2025-04-01 23:45:00", "1", "чай", None, "error"),
+        ("2025-04-02 00:30:00", "1", "чай", 30),
+    ])
+
+    days = store.aggregate(article="1", bucket="day")
+
+    assert [day["bucket"] for day in days] == [to_unix("2025-04-01 00:00:00"), to_unix("2025-04-02 00:00:00")]
+    assert (days[0]["min"], days[0]["avg"], days[0]["max"]) == (10, 15, 20)
+    assert (days[0]["checks"], days[0]["found"]) == (2, 2)
+    assert days[1]["max"] == 30
+    with pytest.raises(ValueError):
+        store.aggregate(bucket="week")
+
+
+def test_timestamps_do_not_depend_on_server_timezone(moscow_time):
+    assert to_unix("2025-04-01 00:00:00") == calendar.timegm((2025, 4, 1, 0, 0, 0))
+    assert to_unix(datetime(2025, 4, 1)) == to_unix("2025-04-01 00:00:00")
+
+    now = datetime.strptime(utc_now(), TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+    assert abs(now.timestamp() - time.time()) < 5
+
+
+def test_instance_is_shared_per_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "POSITION_STORE_PATH", str(tmp_path / "positions.sqlite3"))
+    monkeypatch.setattr(PositionStore, "_instance", None)
+
+    assert PositionStore.instance() is PositionStore.instance()
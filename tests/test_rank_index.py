@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from config import settings
+from parser import WildberriesParser
+from parser.rank_index import RankIndex
+
+
+@pytest.fixture
+def rank_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RANK_INDEX_DEPTH_MARGIN", 2)
+    monkeypatch.setattr(settings, "RANK_INDEX_MAX_DEPTH", 50)
+    return RankIndex(str(tmp_path / "rank_index.sqlite3"))
+
+
+def _search(rank_index: RankIndex, article: str):
+    """Ищет позицию артикула парсером с бэкендом "api" и индексом позиций."""
+    async def run():
+        parser = WildberriesParser(backend="api", rank_index=rank_index)
+        await parser.initialize()
+        try:
+            positions, _ = await parser.search_articles_positions("чай", [article])
+            return positions
+        finally:
+            await parser.close()
+
+    return asyncio.run(run())
+
+
+def test_depth_limit_grows_with_misses(rank_index, monkeypatch):
+    rank_index.record_found("чай", "1", 250, 3, 100)
+    assert rank_index.depth_limit("чай", ["1"]) == 5
+
+    rank_index.record_miss("чай", "1")
+    assert rank_index.depth_limit("чай", ["1"]) == 7
+
+    monkeypatch.setattr(settings, "RANK_INDEX_MAX_DEPTH", 6)
+    assert rank_index.depth_limit("чай", ["1"]) == 6
+    # Предел неизвестен, пока хотя бы один артикул группы не был найден
+    assert rank_index.depth_limit("чай", ["1", "2"]) is None
+
+
+def test_found_on_last_known_page(storefront, rank_index):
+    storefront.pages_per_query = 8
+    article = storefront.article_at("чай", 250)
+    rank_index.record_found("чай", article, 250, 3, 100)
+
+    assert _search(rank_index, article) == {article: 250}
+    assert storefront.requests["api"] == 1
+
+
+def test_position_counts_short_loaded_page(storefront, rank_index):
+    storefront.pages_per_query = 8
+    storefront.page_sizes = {3: 60}
+    # Товар опустился со страницы 3 на страницу 4, страница 3 пришла неполной
+    article = storefront.article_at("чай", 270)
+    rank_index.record_found("чай", article, 250, 3, 100)
+
+    assert _search(rank_index, article) == {article: 270}
+    assert rank_index.get("чай", article)["last_position"] == 270
+
+
+def test_crawl_resumes_after_depth_limit(storefront, rank_index):
+    storefront.pages_per_query = 8
+    article = storefront.article_at("чай", 450)
+    # Предел по истории - страница 3, товар опустился на страницу 5
+    rank_index.record_found("чай", article, 50, 1, 100)
+
+    assert _search(rank_index, article) == {article: 450}
+    # Страницы 1-3 до предела и 4-5 после него загружены по одному разу
+    assert storefront.requests["api"] == 5
+    assert rank_index.get("чай", article)["max_page"] == 5
+
+
+def test_absence_confirmed_by_crawl_beyond_limit(storefront, rank_index):
+    storefront.pages_per_query = 4
+    rank_index.record_found("чай", "1", 50, 1, 100)
+
+    assert _search(rank_index, "1") == {"1": None}
+    # Страницы 1-3 до предела, 4 и пустая 5 после него
+    assert storefront.requests["api"] == 5
+    assert rank_index.get("чай", "1")["misses"] == 1
+
+
+def test_results_ending_within_limit_need_no_further_crawl(storefront, rank_index):
+    storefront.pages_per_query = 2
+    rank_index.record_found("чай", "1", 50, 1, 100)
+
+    assert _search(rank_index, "1") == {"1": None}
+    assert storefront.requests["api"] == 3
+
+
+def test_instance_is_shared_per_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RANK_INDEX_PATH", str(tmp_path / "rank_index.sqlite3"))
+    monkeypatch.setattr(RankIndex, "_instance", None)
+
+    assert RankIndex.instance() is RankIndex.instance()
+
+    monkeypatch.setattr(RankIndex, "_instance_pid", -1)
+    assert RankIndex.instance() is not None
+    assert RankIndex._instance_pid != -1
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from config import settings
+from parser import RegionSweep
+from tasks.checks import search_regions_batch
+
+REGIONS = {"msk": -1257786, "spb": -1198055}
+
+
+@pytest.fixture
+def regions(storefront, monkeypatch):
+    monkeypatch.setattr(settings, "WB_REGIONS", dict(REGIONS))
+    monkeypatch.setattr(settings, "WB_SEARCH_BACKEND", "api")
+    return storefront
+
+
+def test_each_region_is_searched_with_its_dest(regions):
+    targets = [(regions.article_at("чай", 150), "чай"), (regions.article_at("кофе", 20), "кофе")]
+
+    positions, timestamp = asyncio.run(RegionSweep().search_batch(targets))
+
+    assert positions == {region: {targets[0]: 150, targets[1]: 20} for region in REGIONS}
+    assert timestamp
+    assert set(regions.dests) == {str(dest) for dest in REGIONS.values()}
+
+
+def test_failed_region_does_not_stop_others(regions, monkeypatch):
+    monkeypatch.setattr(settings, "WB_REGIONS", {"msk": REGIONS["msk"]})
+    target = (regions.article_at("чай", 150), "чай")
+
+    positions, _ = asyncio.run(RegionSweep(regions=["msk", "spb"]).search_batch([target]))
+
+    # Регион spb не настроен: его результат неизвестен, а не "не найден"
+    assert positions == {"msk": {target: 150}, "spb": {}}
+
+
+def test_check_without_regions_uses_default_dest(storefront, monkeypatch):
+    monkeypatch.setattr(settings, "WB_SEARCH_BACKEND", "api")
+    monkeypatch.setattr(settings, "WB_SEARCH_API_DEST", -1257786)
+    target = (storefront.article_at("чай", 150), "чай")
+
+    regional, _ = asyncio.run(search_regions_batch([target]))
+
+    assert regional == {None: {target: 150}}
+    assert set(storefront.dests) == {"-1257786"}
@@ -0,0 +1,109 @@
+import asyncio
+
+import aiohttp
+import pytest
+from yarl import URL
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from parser import WildberriesParser
+from parser.retry import RetryPolicy
+from tasks.checks import check_status
+
+
+def _response_error(status: int) -> aiohttp.ClientResponseError:
+    url = URL("https://search.wb.ru/exactmatch/ru/common/v9/search")
+    request_info = aiohttp.RequestInfo(url=url, method="GET", headers={}, real_url=url)
+    return aiohttp.ClientResponseError(request_info=request_info, history=(), status=status)
+
+
+@pytest.mark.parametrize("error, reason", [
+    (PlaywrightTimeoutError("navigation timeout"), "timeout"),
+    (asyncio.TimeoutError(), "timeout"),
+    (_response_error(429), "rate_limited"),
+    (_response_error(503), "server_error"),
+    (aiohttp.ClientConnectionError("connection refused"), "network"),
+    (ConnectionResetError(), "network"),
+    (PlaywrightError("target closed"), "browser"),
+    (_response_error(404), None),
+    (_response_error(403), None),
+    (ValueError("bad json"), None),
+])
+def test_classify(error, reason):
+    assert RetryPolicy.classify(error) == reason
+
+
+def test_block_reason():
+    assert RetryPolicy.block_reason(_response_error(401)) == "forbidden"
+    assert RetryPolicy.block_reason(_response_error(403)) == "forbidden"
+    assert RetryPolicy.block_reason(_response_error(404)) is None
+    assert RetryPolicy.block_reason(ValueError()) is None
+
+
+def test_delay_grows_exponentially_up_to_max():
+    policy = RetryPolicy(attempts=5, base_delay=1.0, max_delay=5.0)
+
+    assert 0.5 <= policy.delay(1) <= 1.0
+    assert 1.0 <= policy.delay(2) <= 2.0
+    assert 2.5 <= policy.delay(4) <= 5.0
+
+
+class Flaky:
+    """Загрузка, которая падает заданными ошибками, а затем возвращает результат."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return ["1"]
+
+
+def test_transient_errors_are_retried():
+    fetch = Flaky(PlaywrightTimeoutError("timeout"), _response_error(502))
+
+    assert asyncio.run(RetryPolicy(attempts=3, base_delay=0).run(fetch, "страница 1")) == ["1"]
+    assert fetch.calls == 3
+
+
+def test_permanent_error_is_not_retried():
+    fetch = Flaky(_response_error(404))
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(RetryPolicy(attempts=3, base_delay=0).run(fetch, "страница 1"))
+    assert fetch.calls == 1
+
+
+def test_last_error_is_raised_when_attempts_run_out():
+    fetch = Flaky(*(PlaywrightTimeoutError("timeout") for _ in range(3)))
+
+    with pytest.raises(PlaywrightTimeoutError):
+        asyncio.run(RetryPolicy(attempts=3, base_delay=0).run(fetch, "страница 1"))
+    assert fetch.calls == 3
+
+
+def test_failed_crawl_leaves_result_unknown(storefront):
+    storefront.api_status = 503
+    article = storefront.article_at("чай", 150)
+
+    async def run():
+        parser = WildberriesParser(backend="api", retry_policy=RetryPolicy(attempts=2, base_delay=0))
+
+        async def browser_timeout(search_query, page_num):
+            raise PlaywrightTimeoutError("timeout")
+        parser._fetch_page_browser = browser_timeout
+
+        await parser.initialize()
+        try:
+            positions, _ = await parser.search_articles_positions("чай", [article])
+            return positions
+        finally:
+            await parser.close()
+
+    positions = asyncio.run(run())
+
+    assert positions == {}
+    assert check_status({(a, "чай"): p for a, p in positions.items()}, (article, "чай")) == "error"
+    assert storefront.requests["api"] == 2
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from config import settings
+from tasks import celery_tasks
+
+
+class FakeRedis:
+    """Redis в памяти с операциями блокировки запуска: SET NX EX и скрипты продления и снятия."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+        self.refreshes = 0
+        self._lock = threading.Lock()
+
+    def set(self, key, value, nx=False, ex=None):
+        with self._lock:
+            if nx and key in self.values:
+                return None
+            self.values[key] = value
+            self.ttls[key] = ex
+            return True
+
+    def eval(self, script, numkeys, key, token, *args):
+        with self._lock:
+            if self.values.get(key) != token:
+                return 0
+            if script == celery_tasks._RELEASE_LOCK_SCRIPT:
+                del self.values[key]
+                return 1
+            self.refreshes += 1
+            self.ttls[key] = args[0]
+            return 1
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(celery_tasks, "get_redis", lambda: fake)
+    return fake
+
+
+@pytest.mark.parametrize("adaptive, interval, expected", [
+    (True, 600, 300),
+    (False, 600, 1200),
+    (False, 3600, 3600),
+])
+def test_lock_ttl_follows_beat_interval(monkeypatch, adaptive, interval, expected):
+    monkeypatch.setattr(settings, "ADAPTIVE_SCHEDULE_ENABLED", adaptive)
+    monkeypatch.setattr(settings, "ADAPTIVE_TICK", 60)
+    monkeypatch.setattr(settings, "UPDATE_INTERVAL", interval)
+    monkeypatch.setattr(settings, "SCHEDULE_LOCK_TTL", 3600)
+
+    assert celery_tasks._schedule_lock_ttl() == expected
+
+
+def test_lock_is_exclusive_and_released_only_by_owner(redis):
+    token = celery_tasks._acquire_schedule_lock()
+
+    assert token
+    assert redis.ttls[celery_tasks.SCHEDULE_LOCK_KEY] == celery_tasks._schedule_lock_ttl()
+    assert celery_tasks._acquire_schedule_lock() is False
+
+    celery_tasks._release_schedule_lock("чужой")
+    assert celery_tasks.SCHEDULE_LOCK_KEY in redis.values
+
+    celery_tasks._release_schedule_lock(token)
+    assert celery_tasks.SCHEDULE_LOCK_KEY not in redis.values
+    assert celery_tasks._acquire_schedule_lock()
+
+
+def test_unavailable_redis_runs_without_lock(monkeypatch):
+    def unavailable():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(celery_tasks, "get_redis", unavailable)
+
+    assert celery_tasks._acquire_schedule_lock() is None
+
+
+def test_lock_is_refreshed_while_held_and_not_after(redis, monkeypatch):
+    monkeypatch.setattr(celery_tasks, "_schedule_lock_ttl", lambda: 0.03)
+    token = celery_tasks._acquire_schedule_lock()
+
+    with celery_tasks._hold_schedule_lock(token):
+        time.sleep(0.1)
+    refreshes = redis.refreshes
+    time.sleep(0.05)
+
+    assert refreshes >= 3
+    assert redis.refreshes == refreshes
+
+
+def test_refresh_does_not_extend_lock_of_another_run(redis, monkeypatch):
+    monkeypatch.setattr(celery_tasks, "_schedule_lock_ttl", lambda: 0.03)
+    redis.set(celery_tasks.SCHEDULE_LOCK_KEY, "другой запуск")
+
+    with celery_tasks._hold_schedule_lock("истекший токен"):
+        time.sleep(0.05)
+
+    assert redis.refreshes == 0
+    assert redis.values[celery_tasks.SCHEDULE_LOCK_KEY] == "другой запуск"
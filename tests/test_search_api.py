@@ -0,0 +1,75 @@
+import asyncio
+
+from parser import WildberriesParser
+from parser.search_api import WildberriesSearchAPI
+
+
+def _fetch(search_query: str, page_num: int):
+    """Загружает страницу через поисковое API и закрывает клиент."""
+    async def run():
+        api = WildberriesSearchAPI()
+        try:
+            return await api.fetch_nm_ids(search_query, page_num)
+        finally:
+            await api.close()
+
+    return asyncio.run(run())
+
+
+def _search(storefront, articles, browser_pages=None):
+    """
+    Ищет позиции артикулов парсером с бэкендом "api".
+
+    Args:
+        storefront: Заглушка витрины
+        articles: Артикулы товаров
+        browser_pages: Список, в который записываются страницы, загруженные через
+            браузер; браузер подменяется выдачей заглушки
+    """
+    async def run():
+        parser = WildberriesParser(backend="api")
+        if browser_pages is not None:
+            async def fetch_page_browser(search_query, page_num):
+                browser_pages.append(page_num)
+                return storefront.page(search_query, page_num)[0]
+            parser._fetch_page_browser = fetch_page_browser
+
+        await parser.initialize()
+        try:
+            positions, _ = await parser.search_articles_positions("чай", articles)
+            return positions
+        finally:
+            await parser.close()
+
+    return asyncio.run(run())
+
+
+def test_fetch_nm_ids_returns_page_in_order(storefront):
+    expected, _ = storefront.page("чай", 2)
+
+    assert _fetch("чай", 2) == expected
+    assert storefront.requests["api"] == 1
+
+
+def test_fetch_nm_ids_past_last_page_is_empty(storefront):
+    assert _fetch("чай", storefront.pages_per_query + 1) == []
+
+
+def test_api_backend_finds_positions(storefront):
+    article = storefront.article_at("чай", 150)
+
+    positions = _search(storefront, [article, "1"])
+
+    assert positions == {article: 150, "1": None}
+    assert storefront.requests["html"] == 0
+
+
+def test_api_error_falls_back_to_browser(storefront):
+    storefront.api_status = 500
+    article = storefront.article_at("чай", 150)
+    browser_pages = []
+
+    positions = _search(storefront, [article], browser_pages)
+
+    assert positions == {article: 150}
+    assert browser_pages == [1, 2]
@@ -0,0 +1,95 @@
+import time
+
+from config import settings
+from utils.sheets_writer import BufferedSheetsWriter, HEADER, REGION_HEADER
+
+
+def _add(writer: BufferedSheetsWriter, article: str, region: str = None) -> bool:
+    return writer.add("01.01.2024 12:00", article, 1, "чай", region)
+
+
+def test_flush_by_size(sheets_client):
+    writer = BufferedSheetsWriter(sheets_client, max_rows=3, max_delay=3600)
+
+    _add(writer, "1")
+    _add(writer, "2")
+    assert sheets_client.service.calls["append"] == 0
+
+    assert _add(writer, "3")
+    assert sheets_client.service.calls["append"] == 1
+    assert [row[1] for row in sheets_client.service.rows[2:]] == ["1", "2", "3"]
+    assert writer.rows == []
+
+
+def test_flush_by_interval(sheets_client):
+    writer = BufferedSheetsWriter(sheets_client, max_rows=100, max_delay=0.05)
+
+    _add(writer, "1")
+    assert writer.flush_if_due()
+    assert sheets_client.service.calls["append"] == 0
+
+    time.sleep(0.06)
+    assert writer.flush_if_due()
+    assert sheets_client.service.calls["append"] == 1
+    assert writer.rows == []
+
+
+def test_context_manager_flushes_rest(sheets_client):
+    with BufferedSheetsWriter(sheets_client, max_rows=100, max_delay=3600) as writer:
+        _add(writer, "1")
+        _add(writer, "2")
+        assert sheets_client.service.calls["append"] == 0
+
+    assert sheets_client.service.calls["append"] == 1
+    assert len(sheets_client.service.rows[2:]) == 2
+
+
+def test_header_written_once_per_spreadsheet(sheets_client):
+    for article in ("1", "2"):
+        writer = BufferedSheetsWriter(sheets_client, max_rows=1)
+        _add(writer, article)
+
+    assert sheets_client.service.rows[1] == HEADER
+    assert sheets_client.service.calls["get"] == 1
+    assert sheets_client.service.calls["update"] == 1
+    assert sheets_client.service.calls["append"] == 2
+
+
+def test_existing_header_not_rewritten(sheets_client):
+    sheets_client.service.rows = [[], list(HEADER)]
+
+    _add(BufferedSheetsWriter(sheets_client, max_rows=1), "1")
+
+    assert sheets_client.service.calls["get"] == 1
+    assert sheets_client.service.calls["update"] == 0
+    assert sheets_client.service.rows[1] == HEADER
+
+
+def test_region_column(sheets_client, monkeypatch):
+    monkeypatch.setattr(settings, "WB_REGIONS", {"Москва": -1257786})
+
+    _add(BufferedSheetsWriter(sheets_client, max_rows=1), "1", "Москва")
+
+    assert sheets_client.service.rows[1] == REGION_HEADER
+    assert sheets_client.service.rows[2][-1] == "Москва"
+
+
+def test_failed_flush_keeps_rows(sheets_client, monkeypatch):
+    service = sheets_client.service
+    execute = service.execute
+
+    def fail_append(method, cell_range, values):
+        if method == "append":
+            raise RuntimeError("quota exceeded")
+        return execute(method, cell_range, values)
+
+    monkeypatch.setattr(service, "execute", fail_append)
+    writer = BufferedSheetsWriter(sheets_client, max_rows=2)
+    _add(writer, "1")
+    assert not _add(writer, "2")
+    assert [row[1] for row in writer.rows] == ["1", "2"]
+
+    monkeypatch.setattr(service, "execute", execute)
+    assert writer.flush()
+    assert [row[1] for row in service.rows[2:]] == ["1", "2"]
+    assert writer.rows == []
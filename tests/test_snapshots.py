@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from config import settings
+from parser import WildberriesParser
+from parser.wildberries import CrawlResult
+from utils import SnapshotStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_KEEP", 2)
+    monkeypatch.setattr(settings, "WB_PAGE_SIZE", 100)
+    return SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+
+
+def test_save_and_query(store):
+    store.save("2025-04-01 10:00:00", "чай", ["11", "12", "13"], [2, 1])
+    store.save("2025-04-01 10:00:00", "чай", ["99"], [1], region="spb")
+
+    snapshot = store.latest("чай")[0]
+    assert len(snapshot) == 3
+    assert snapshot.positions(["12", "14", "артикул"]) == {"12": 2, "14": None, "артикул": None}
+    assert snapshot.top() == [("11", 1, 1), ("12", 2, 1), ("13", 3, 2)]
+    assert [len(item) for item in store.latest("чай", region="spb")] == [1]
+    assert store.at("чай", "2025-04-01 09:00:00") is None
+
+
+def test_diff_and_keep(store):
+    store.save("2025-04-01 10:00:00", "чай", ["1", "2", "3", "4"], [4])
+    assert store.diff_latest("чай") is None
+
+    store.save("2025-04-01 11:00:00", "чай", ["3", "1", "5", "2"], [4])
+    assert store.diff_latest("чай") == {
+        "entered": [("5", 3)],
+        "exited": [("4", 4)],
+        "moved": [("3", 3, 1), ("2", 2, 4), ("1", 1, 2)],
+    }
+
+    store.save("2025-04-01 12:00:00", "чай", ["3"], [1])
+    # Хранятся только SNAPSHOT_KEEP последних снимков
+    assert [snapshot.ts for snapshot in store.latest("чай", count=5)] == [
+        store.at("чай", "2025-04-01 12:00:00").ts, store.at("чай", "2025-04-01 11:00:00").ts
+    ]
+    assert store.at("чай", "2025-04-01 10:30:00") is None
+
+
+def _crawl(nm_ids, complete=True):
+    result = CrawlResult([])
+    result.top_nm_ids = list(nm_ids)
+    result.top_page_sizes = [len(nm_ids)] if nm_ids else []
+    result.complete = complete
+    return result
+
+
+def _parser(store):
+    return WildberriesParser(backend="api", snapshot_store=store)
+
+
+def test_empty_snapshot_is_not_saved(store):
+    _parser(store)._save_snapshot("чай", "2025-04-01 10:00:00", _crawl([]), top_k=300)
+
+    assert store.latest("чай") == []
+
+
+def test_interrupted_crawl_is_not_saved(store):
+    nm_ids = [str(nm_id) for nm_id in range(1, 151)]
+    _parser(store)._save_snapshot("чай", "2025-04-01 10:00:00", _crawl(nm_ids, complete=False), top_k=300)
+
+    assert store.latest("чай") == []
+
+
+def test_truncated_snapshot_after_full_one_is_not_saved(store):
+    parser = _parser(store)
+    full = [str(nm_id) for nm_id in range(1, 301)]
+    parser._save_snapshot("чай", "2025-04-01 10:00:00", _crawl(full), top_k=300)
+
+    parser._save_snapshot("чай", "2025-04-01 11:00:00", _crawl(full[:20]), top_k=300)
+    assert [len(snapshot) for snapshot in store.latest("чай", count=5)] == [300]
+
+    # Короткая выдача без полного снимка до нее сохраняется
+    parser._save_snapshot("кофе", "2025-04-01 11:00:00", _crawl(full[:20]), top_k=300)
+    assert len(store.latest("кофе")[0]) == 20
+
+
+def test_crawl_saves_top_of_search(storefront, store):
+    async def run():
+        parser = WildberriesParser(backend="api", snapshot_store=store)
+        await parser.initialize()
+        try:
+            await parser.search_articles_positions("чай", [storefront.article_at("чай", 10)])
+        finally:
+            await parser.close()
+
+    asyncio.run(run())
+
+    snapshot = store.latest("чай")[0]
+    assert len(snapshot) == settings.SNAPSHOT_TOP_K
+    assert [article for article, _, _ in snapshot.top(3)] == storefront.page("чай", 1)[0][:3]
+    assert snapshot.page_of(settings.SNAPSHOT_TOP_K) == 3
@@ -1,10 +1,58 @@
+from importlib import import_module
+from typing import TYPE_CHECKING
+
 from .logger_utils import log, setup_logging
-from .google_sheets import GoogleSheetsClient
-from .celery_worker import WorkerUtils
+
+if TYPE_CHECKING:
+    from .metrics import Metrics
+    from .google_sheets import GoogleSheetsClient
+    from .sheets_writer import BufferedSheetsWriter
+    from .config_cache import ConfigCache
+    from .position_store import PositionStore
+    from .snapshot_store import SnapshotStore, Snapshot
+    from .check_schedule import CheckSchedule
+    from .celery_worker import WorkerUtils
+    from .async_runner import AsyncRunner
+
+# Имя -> модуль пакета. Модули импортируются при первом обращении к имени,
+# чтобы точка входа загружала только нужные ей подсистемы (Google API, Redis)
+_LAZY = {
+    "Metrics": ".metrics",
+    "GoogleSheetsClient": ".google_sheets",
+    "BufferedSheetsWriter": ".sheets_writer",
+    "ConfigCache": ".config_cache",
+    "PositionStore": ".position_store",
+    "SnapshotStore": ".snapshot_store",
+    "Snapshot": ".snapshot_store",
+    "CheckSchedule": ".check_schedule",
+    "WorkerUtils": ".celery_worker",
+    "AsyncRunner": ".async_runner",
+}
 
 __all__ = [
     "log",
     "setup_logging",
+    "Metrics",
     "GoogleSheetsClient",
-    "WorkerUtils"
-]
\ No newline at end of file
+    "BufferedSheetsWriter",
+    "ConfigCache",
+    "PositionStore",
+    "SnapshotStore",
+    "Snapshot",
+    "CheckSchedule",
+    "WorkerUtils",
+    "AsyncRunner"
+]
+
+
+def __getattr__(name: str):
+    """Импортирует модуль пакета при первом обращении к его имени."""
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
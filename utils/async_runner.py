@@ -0,0 +1,74 @@
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+from utils import log
+
+
+class AsyncRunner:
+    """
+    Постоянный цикл событий процесса.
+
+    Цикл работает в фоновом потоке и живет между задачами Celery, поэтому
+    объекты, привязанные к циклу (браузер Playwright, HTTP-сессии), можно
+    переиспользовать вместо создания заново в каждом asyncio.run().
+    """
+
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _thread: Optional[threading.Thread] = None
+    _pid: Optional[int] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_loop(cls) -> asyncio.AbstractEventLoop:
+        """
+        Возвращает цикл событий процесса, создавая его при первом обращении.
+
+        После fork цикл родителя недоступен, поэтому создается новый.
+
+        Returns:
+            Работающий цикл событий
+        """
+        with cls._lock:
+            if cls._loop is None or cls._pid != os.getpid() or not cls._loop.is_running():
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def run_loop():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                thread = threading.Thread(target=run_loop, name="async-runner", daemon=True)
+                thread.start()
+                started.wait()
+
+                cls._loop, cls._thread, cls._pid = loop, thread, os.getpid()
+                log.debug(f"Запущен постоянный цикл событий в процессе {cls._pid}")
+
+            return cls._loop
+
+    @classmethod
+    def run(cls, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """
+        Выполняет корутину в постоянном цикле и ждет результат.
+
+        Args:
+            coro: Корутина
+            timeout: Максимальное время ожидания в секундах
+
+        Returns:
+            Результат корутины
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, cls.get_loop())
+        return future.result(timeout)
+
+    @classmethod
+    def stop(cls) -> None:
+        """Останавливает цикл событий процесса."""
+        with cls._lock:
+            if cls._loop is not None and cls._pid == os.getpid() and cls._loop.is_running():
+                cls._loop.call_soon_threadsafe(cls._loop.stop)
+                cls._thread.join(timeout=5)
+            cls._loop, cls._thread, cls._pid = None, None, None
@@ -12,9 +12,11 @@ class WorkerUtils:
         """
         from tasks import app
         # Настройка периодических задач
+        # При FANOUT_ENABLED проверка делится на подзадачи по поисковым запросам
         app.conf.beat_schedule = {
             'check-position-every-10-min': {
-                'task': 'check_position',
-                'schedule': settings.UPDATE_INTERVAL,  # Запуск каждые 10 минут
+                'task': 'schedule_checks' if settings.FANOUT_ENABLED else 'check_position',
+                # С адаптивным расписанием запуск частый, а проверяются только пары, срок которых наступил
+                'schedule': settings.ADAPTIVE_TICK if settings.ADAPTIVE_SCHEDULE_ENABLED else settings.UPDATE_INTERVAL,
             },
         }
\ No newline at end of file
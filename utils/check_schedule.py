@@ -0,0 +1,256 @@
+import math
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils import log
+from config import settings
+
+# Изменение интервала после стабильной и изменившейся позиции
+INTERVAL_GROWTH = 1.5
+INTERVAL_SHRINK = 0.5
+# Позиция считается стабильной, если сдвинулась не больше чем на эту долю
+STABLE_RELATIVE_DELTA = 0.05
+
+
+class CheckSchedule:
+    """
+    Адаптивное расписание проверок пар (артикул, запрос).
+
+    У каждой пары свой интервал проверки: он растет, пока позиция стабильна,
+    и сокращается, когда позиция меняется или товар появляется/пропадает из
+    выдачи. За один запуск выбираются пары, срок проверки которых наступил,
+    в пределах бюджета страниц settings.CRAWL_BUDGET_PAGES_PER_HOUR; пары
+    одного запроса выбираются вместе, так как используют одни и те же страницы.
+    Перерасход бюджета (дорогой запрос, выбранный сверх доли запуска) остается
+    долгом и погашается следующими запусками, поэтому за час обходится не больше
+    бюджета страниц.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Инициализация расписания.
+
+        Args:
+            path: Путь к файлу SQLite (по умолчанию settings.ADAPTIVE_SCHEDULE_PATH)
+        """
+        self.path = path or settings.ADAPTIVE_SCHEDULE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS check_schedule (
+                    search_query TEXT NOT NULL,
+                    article TEXT NOT NULL,
+                    interval REAL NOT NULL,
+                    next_due REAL NOT NULL,
+                    pages INTEGER,
+                    last_position INTEGER,
+                    last_checked REAL,
+                    PRIMARY KEY (search_query, article)
+                )
+            """)
+            # Остаток бюджета страниц: отрицательный - долг после перерасхода
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_budget (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    balance REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открывает соединение с файлом расписания."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def select_due(self, targets: List[Tuple[str, str]], now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """
+        Выбирает пары для проверки в этом запуске.
+
+        Запросы упорядочиваются по просрочке (новые пары - первыми) и берутся,
+        пока их оценочная стоимость в страницах (во всех регионах settings.WB_REGIONS)
+        укладывается в остаток бюджета. Остаток пополняется со скоростью
+        settings.CRAWL_BUDGET_PAGES_PER_HOUR, но не больше доли бюджета на один
+        запуск. Если остаток положителен, хотя бы один запрос выбирается всегда,
+        а перерасход становится долгом: пока он не погашен, запуски ничего не
+        выбирают. Выбранным парам срок следующей проверки сдвигается сразу, чтобы
+        параллельный запуск не взял их повторно.
+
+        Args:
+            targets: Все отслеживаемые пары (артикул, запрос)
+            now: Текущее время (unix)
+
+        Returns:
+            Пары для проверки в исходном порядке
+        """
+        now = now or time.time()
+        entries = self._load()
+
+        groups: Dict[str, dict] = {}
+        for article, search_query in targets:
+            entry = entries.get((search_query, article))
+            if entry is None:
+                entry = {'interval': float(settings.UPDATE_INTERVAL), 'next_due': 0.0, 'pages': None}
+            if entry['next_due'] > now:
+                continue
+
+            group = groups.setdefault(search_query, {'targets': [], 'pages': 0, 'urgency': 0.0})
+            group['targets'].append((article, search_query))
+            group['pages'] = max(group['pages'], entry['pages'] or self._miss_depth())
+            urgency = math.inf if not entry['next_due'] else (now - entry['next_due']) / entry['interval']
+            group['urgency'] = max(group['urgency'], urgency)
+
+        balance = self._budget_balance(now)
+        # Каждый регион доставки обходит выдачу запроса отдельно
+        regions = max(len(settings.WB_REGIONS), 1)
+        selected, spent = [], 0
+        if balance > 0:
+            for search_query, group in sorted(groups.items(), key=lambda item: -item[1]['urgency']):
+                cost = group['pages'] * regions
+                if selected and spent + cost > balance:
+                    continue
+                selected.extend(group['targets'])
+                spent += cost
+
+        self._reserve(selected, entries, now)
+        self._save_budget(balance - spent, now)
+        if spent > balance:
+            log.info(f"Адаптивное расписание: перерасход бюджета {spent - balance:.0f} стр. "
+                     f"погашается следующими запусками")
+
+        due = sum(len(group['targets']) for group in groups.values())
+        (log.info if selected else log.debug)(
+            f"Адаптивное расписание: к проверке {due} из {len(targets)}, выбрано {len(selected)} "
+            f"(~{spent} стр. из остатка бюджета {balance:.0f})"
+        )
+
+        chosen = set(selected)
+        return [target for target in targets if target in chosen]
+
+    def record(self, results: Iterable[Tuple[str, str, Optional[int]]], now: Optional[float] = None) -> None:
+        """
+        Обновляет интервалы проверок по результатам.
+
+        Args:
+            results: Кортежи (артикул, запрос, позиция или None)
+            now: Время проверки (unix)
+        """
+        now = now or time.time()
+        entries = self._load()
+        rows = []
+
+        for article, search_query, position in results:
+            entry = entries.get((search_query, article))
+            interval = entry['interval'] if entry else float(settings.UPDATE_INTERVAL)
+
+            # Первая проверка пары не меняет интервал: сравнивать не с чем
+            if entry and entry['last_checked'] is not None:
+                stable = self._is_stable(entry['last_position'], position)
+                interval *= INTERVAL_GROWTH if stable else INTERVAL_SHRINK
+            interval = min(max(interval, settings.ADAPTIVE_MIN_INTERVAL), settings.ADAPTIVE_MAX_INTERVAL)
+
+            pages = math.ceil(position / settings.WB_PAGE_SIZE) if position else self._miss_depth()
+            rows.append((search_query, article, interval, now + interval, pages, position, now))
+
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("""
+                INSERT INTO check_schedule (search_query, article, interval, next_due, pages,
+                                            last_position, last_checked)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (search_query, article) DO UPDATE SET
+                    interval = excluded.interval,
+                    next_due = excluded.next_due,
+                    pages = excluded.pages,
+                    last_position = excluded.last_position,
+                    last_checked = excluded.last_checked
+            """, rows)
+
+    def record_errors(self, targets: List[Tuple[str, str]], now: Optional[float] = None) -> None:
+        """
+        Назначает повторную проверку пар, результат которых неизвестен из-за ошибки.
+
+        Интервал пары не меняется, а следующая проверка назначается через
+        settings.ADAPTIVE_MIN_INTERVAL, а не через полный интервал.
+
+        Args:
+            targets: Пары (артикул, запрос)
+            now: Время проверки (unix)
+        """
+        if not targets:
+            return
+
+        now = now or time.time()
+        rows = [(search_query, article, float(settings.UPDATE_INTERVAL), now + settings.ADAPTIVE_MIN_INTERVAL)
+                for article, search_query in targets]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("""
+                INSERT INTO check_schedule (search_query, article, interval, next_due)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (search_query, article) DO UPDATE SET next_due = excluded.next_due
+            """, rows)
+
+    def _budget_balance(self, now: float) -> float:
+        """
+        Возвращает остаток бюджета страниц, пополненный за время с прошлого запуска.
+
+        Args:
+            now: Текущее время (unix)
+
+        Returns:
+            Остаток в страницах: не больше доли бюджета на один запуск, отрицательный при долге
+        """
+        allowance = settings.CRAWL_BUDGET_PAGES_PER_HOUR * settings.ADAPTIVE_TICK / 3600
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT balance, updated_at FROM crawl_budget WHERE id = 1").fetchone()
+        if row is None:
+            return allowance
+
+        refill = max(now - row['updated_at'], 0.0) * settings.CRAWL_BUDGET_PAGES_PER_HOUR / 3600
+        return min(row['balance'] + refill, allowance)
+
+    def _save_budget(self, balance: float, now: float) -> None:
+        """Сохраняет остаток бюджета страниц после запуска."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                INSERT INTO crawl_budget (id, balance, updated_at) VALUES (1, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET balance = excluded.balance, updated_at = excluded.updated_at
+            """, (balance, now))
+
+    def _load(self) -> Dict[Tuple[str, str], dict]:
+        """Загружает записи расписания: (запрос, артикул) -> запись."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT * FROM check_schedule").fetchall()
+        return {(row['search_query'], row['article']): dict(row) for row in rows}
+
+    def _reserve(self, targets: List[Tuple[str, str]], entries: Dict[Tuple[str, str], dict], now: float) -> None:
+        """Сдвигает срок следующей проверки выбранных пар на их интервал."""
+        rows = []
+        for article, search_query in targets:
+            entry = entries.get((search_query, article))
+            interval = entry['interval'] if entry else float(settings.UPDATE_INTERVAL)
+            rows.append((search_query, article, interval, now + interval))
+
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("""
+                INSERT INTO check_schedule (search_query, article, interval, next_due)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (search_query, article) DO UPDATE SET next_due = excluded.next_due
+            """, rows)
+
+    @staticmethod
+    def _is_stable(previous: Optional[int], position: Optional[int]) -> bool:
+        """Проверяет, что позиция не изменилась существенно с прошлой проверки."""
+        if previous is None or position is None:
+            return previous is None and position is None
+        return abs(position - previous) <= max(settings.ADAPTIVE_STABLE_DELTA, previous * STABLE_RELATIVE_DELTA)
+
+    @staticmethod
+    def _miss_depth() -> int:
+        """Оценка числа страниц проверки, когда позиция неизвестна."""
+        return settings.MAX_SAFE_SEARCH if settings.SAFE_SEARCH else settings.RANK_INDEX_MAX_DEPTH
@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from utils import log
+from utils.google_sheets import GoogleSheetsClient
+from utils.redis_client import get_redis
+from utils.metrics import Metrics
+from config import settings
+
+# Ключ общего для всех воркеров кэша конфигурации в Redis
+REDIS_KEY = "wb_parser:config_targets"
+
+
+class ConfigCache:
+    """
+    Кэш списка отслеживаемых пар (артикул, поисковый запрос).
+
+    Конфигурация читается из таблицы не чаще одного раза в settings.CONFIG_CACHE_TTL
+    секунд, поэтому правка таблицы становится видна воркерам не позже чем через TTL.
+    При CONFIG_CACHE_BACKEND="redis" прочитанный список дополнительно кладется
+    в Redis, и таблицу за период TTL читает только один воркер из всех.
+    """
+
+    _targets: Optional[List[Tuple[str, str]]] = None
+    _expires_at: float = 0.0
+    _lock = threading.Lock()
+
+    hits = 0
+    redis_hits = 0
+    misses = 0
+
+    @classmethod
+    def get_targets(cls, client: Optional[GoogleSheetsClient] = None) -> List[Tuple[str, str]]:
+        """
+        Возвращает список отслеживаемых пар из кэша или из таблицы.
+
+        Клиент Google Sheets создается только при промахе, поэтому попадание
+        не тратит время на авторизацию и сборку сервиса.
+
+        Args:
+            client: Клиент Google Sheets для чтения при промахе
+                (по умолчанию создается при промахе)
+
+        Returns:
+            Список кортежей (артикул, поисковый запрос)
+        """
+        ttl = settings.CONFIG_CACHE_TTL
+
+        with cls._lock:
+            if ttl > 0 and cls._targets is not None and time.monotonic() < cls._expires_at:
+                cls.hits += 1
+                Metrics.inc('wb_config_cache_total', result='hit')
+                return list(cls._targets)
+
+        if ttl > 0 and settings.CONFIG_CACHE_BACKEND == "redis":
+            targets, remaining = cls._get_from_redis(ttl)
+            if targets:
+                with cls._lock:
+                    cls.redis_hits += 1
+                Metrics.inc('wb_config_cache_total', result='redis_hit')
+                # Локальная копия живет не дольше ключа в Redis, иначе устаревание достигало бы 2 x TTL
+                cls._store(targets, remaining)
+                return list(targets)
+
+        with cls._lock:
+            cls.misses += 1
+        Metrics.inc('wb_config_cache_total', result='miss')
+
+        targets = (client or GoogleSheetsClient()).get_tracking_targets()
+        log.debug(f"Конфигурация прочитана из таблицы (попаданий: {cls.hits + cls.redis_hits}, "
+                  f"промахов: {cls.misses})")
+
+        # Пустой результат может означать ошибку чтения, поэтому его не кэшируем
+        if ttl > 0 and targets:
+            cls._store(targets, ttl)
+            if settings.CONFIG_CACHE_BACKEND == "redis":
+                cls._put_to_redis(targets, ttl)
+
+        return targets
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Сбрасывает локальный кэш процесса."""
+        with cls._lock:
+            cls._targets = None
+            cls._expires_at = 0.0
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Возвращает счетчики обращений к кэшу.
+
+        Returns:
+            dict: Попадания в локальный кэш, в Redis и промахи
+        """
+        return {'hits': cls.hits, 'redis_hits': cls.redis_hits, 'misses': cls.misses}
+
+    @classmethod
+    def _store(cls, targets: List[Tuple[str, str]], ttl: float) -> None:
+        """Сохраняет список в локальный кэш процесса."""
+        with cls._lock:
+            cls._targets = list(targets)
+            cls._expires_at = time.monotonic() + ttl
+
+    @staticmethod
+    def _get_from_redis(ttl: int) -> Tuple[Optional[List[Tuple[str, str]]], float]:
+        """
+        Читает список и оставшееся время жизни ключа из Redis.
+
+        Ошибки Redis не мешают чтению из таблицы.
+
+        Args:
+            ttl: Время жизни кэша в секундах; используется, если у ключа нет срока
+
+        Returns:
+            Кортеж (список или None, оставшееся время жизни в секундах)
+        """
+        try:
+            pipe = get_redis().pipeline()
+            pipe.get(REDIS_KEY)
+            pipe.pttl(REDIS_KEY)
+            payload, remaining_ms = pipe.execute()
+        except Exception as e:
+            log.warning(f"Не удалось прочитать конфигурацию из Redis: {e}")
+            return None, 0.0
+
+        if not payload or remaining_ms == -2:
+            return None, 0.0
+        remaining = min(remaining_ms / 1000, ttl) if remaining_ms > 0 else ttl
+        return [tuple(target) for target in json.loads(payload)], remaining
+
+    @staticmethod
+    def _put_to_redis(targets: List[Tuple[str, str]], ttl: int) -> None:
+        """Сохраняет список в Redis на время TTL."""
+        try:
+            get_redis().setex(REDIS_KEY, ttl, json.dumps(targets, ensure_ascii=False))
+        except Exception as e:
+            log.warning(f"Не удалось сохранить конфигурацию в Redis: {e}")
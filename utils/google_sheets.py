@@ -1,13 +1,24 @@
-from typing import Tuple, Optional
+import os
+import threading
+from typing import Dict, List, Tuple, Optional
+import httplib2
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 
 from utils import log
+from utils.metrics import Metrics
 from config import settings
 
 # Области доступа для Google Sheets API
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 
+# Учетные данные процесса: (pid, файл учетных данных) -> Credentials
+_credentials_cache: Dict[tuple, service_account.Credentials] = {}
+_credentials_lock = threading.Lock()
+# Сервисы Google Sheets текущего потока
+_thread_cache = threading.local()
+
 
 class GoogleSheetsClient:
     """Клиент для работы с Google Sheets API."""
@@ -20,38 +31,84 @@ class GoogleSheetsClient:
             spreadsheet_id: ID таблицы Google Sheets
         """
         self.spreadsheet_id = spreadsheet_id
-        self.service = self._get_service()
+        # Сервис создается сразу, чтобы ошибка учетных данных проявилась при создании клиента
+        self._get_service()
+
+    @property
+    def service(self):
+        """
+        Сервис Google Sheets текущего потока.
+
+        Клиент можно передавать между потоками (например, в asyncio.to_thread):
+        каждый поток работает через свой сервис и свои HTTP-соединения.
+        """
+        return self._get_service()
 
     def _get_service(self):
         """
-        Создает и авторизует сервис для работы с Google Sheets API.
+        Возвращает авторизованный сервис для работы с Google Sheets API.
+
+        Учетные данные загружаются один раз на процесс и обновляют токен только
+        по истечении срока. Сервис создается один раз на поток (httplib2 не
+        потокобезопасен) и переиспользует HTTP-соединения между задачами;
+        описание API берется из статического discovery-документа без запроса в сеть.
 
         Returns:
             Авторизованный сервис Google Sheets
         """
-        creds = None
-
-        # Проверяем, используем ли мы учетные данные сервисного аккаунта
-        if str(settings.CREDENTIALS_FILE).endswith('.json'):
-            try:
-                creds = service_account.Credentials.from_service_account_file(
-                    settings.CREDENTIALS_FILE, scopes=SCOPES
-                )
-            except Exception as e:
-                log.error(f"Ошибка при загрузке учетных данных сервисного аккаунта: {e}")
-                raise
-
-        if not creds:
-            log.error("Не удалось создать учетные данные")
-            raise ValueError("Не удалось создать учетные данные")
+        cache_key = (os.getpid(), str(settings.CREDENTIALS_FILE))
+        services = getattr(_thread_cache, 'services', None)
+        if services is None:
+            services = _thread_cache.services = {}
 
-        try:
-            service = build('sheets', 'v4', credentials=creds)
+        service = services.get(cache_key)
+        if service is not None:
             return service
+
+        creds = self._get_credentials()
+
+        try:
+            http = AuthorizedHttp(creds, http=httplib2.Http(timeout=settings.SHEETS_HTTP_TIMEOUT))
+            service = build('sheets', 'v4', http=http, cache_discovery=False, static_discovery=True)
         except Exception as e:
             log.error(f"Ошибка при создании сервиса Google Sheets: {e}")
             raise
 
+        services[cache_key] = service
+        return service
+
+    @staticmethod
+    def _get_credentials() -> service_account.Credentials:
+        """
+        Возвращает учетные данные сервисного аккаунта, общие для всего процесса.
+
+        Returns:
+            Учетные данные сервисного аккаунта
+        """
+        cache_key = (os.getpid(), str(settings.CREDENTIALS_FILE))
+
+        with _credentials_lock:
+            creds = _credentials_cache.get(cache_key)
+            if creds is not None:
+                return creds
+
+            # Проверяем, используем ли мы учетные данные сервисного аккаунта
+            if str(settings.CREDENTIALS_FILE).endswith('.json'):
+                try:
+                    creds = service_account.Credentials.from_service_account_file(
+                        settings.CREDENTIALS_FILE, scopes=SCOPES
+                    )
+                except Exception as e:
+                    log.error(f"Ошибка при загрузке учетных данных сервисного аккаунта: {e}")
+                    raise
+
+            if not creds:
+                log.error("Не удалось создать учетные данные")
+                raise ValueError("Не удалось создать учетные данные")
+
+            _credentials_cache[cache_key] = creds
+            return creds
+
     def get_config_data(self) -> Tuple[Optional[str], Optional[str]]:
         """
         Получает данные конфигурации из ячеек A1 и B1.
@@ -79,7 +136,46 @@ class GoogleSheetsClient:
             log.error(f"Ошибка при получении данных из Google Sheets: {e}")
             return None, None
 
-    def add_position_data(self, timestamp: str, article: str, position: int) -> bool:
+    def get_tracking_targets(self) -> List[Tuple[str, str]]:
+        """
+        Получает список отслеживаемых пар из диапазона конфигурации.
+
+        Каждая строка диапазона settings.CONFIG_RANGE содержит артикул и поисковый
+        запрос. Пустые и неполные строки пропускаются, повторы удаляются.
+
+        Returns:
+            Список кортежей (артикул, поисковый запрос)
+        """
+        try:
+            with Metrics.timer('sheets_config'):
+                result = self.service.spreadsheets().values().get(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=settings.CONFIG_RANGE
+                ).execute()
+        except Exception as e:
+            log.error(f"Ошибка при получении данных из Google Sheets: {e}")
+            return []
+
+        targets = []
+        seen = set()
+        for row in result.get('values', []):
+            article = str(row[0]).strip() if len(row) > 0 else ''
+            search_query = str(row[1]).strip() if len(row) > 1 else ''
+            if not article or not search_query:
+                continue
+
+            target = (article, search_query)
+            if target not in seen:
+                seen.add(target)
+                targets.append(target)
+
+        if not targets:
+            log.warning(f"Не найдены данные в диапазоне {settings.CONFIG_RANGE}")
+
+        return targets
+
+    def add_position_data(self, timestamp: str, article: str, position: int,
+                          search_query: Optional[str] = None) -> bool:
         """
         Добавляет данные о позиции товара в таблицу.
 
@@ -87,6 +183,7 @@ class GoogleSheetsClient:
             timestamp: Время в формате строки
             article: Артикул товара
             position: Позиция в поисковой выдаче
+            search_query: Поисковый запрос, по которому найдена позиция
 
         Returns:
             bool: Успешно ли добавлены данные
@@ -95,7 +192,7 @@ class GoogleSheetsClient:
             # Получаем последнюю строку в таблице
             result = self.service.spreadsheets().values().get(
                 spreadsheetId=self.spreadsheet_id,
-                range='A:C'
+                range='A:D'
             ).execute()
 
             values = result.get('values', [])
@@ -105,10 +202,10 @@ class GoogleSheetsClient:
             if next_row == 1 or (len(values) == 1 and values[0][0] != 'Время'):
                 self.service.spreadsheets().values().update(
                     spreadsheetId=self.spreadsheet_id,
-                    range='A2:C2',
+                    range='A2:D2',
                     valueInputOption='USER_ENTERED',
                     body={
-                        'values': [['Время', 'Артикул', 'Позиция']]
+                        'values': [['Время', 'Артикул', 'Позиция', 'Запрос']]
                     }
                 ).execute()
                 next_row = 3
@@ -118,10 +215,10 @@ class GoogleSheetsClient:
             # Добавляем новые данные
             self.service.spreadsheets().values().update(
                 spreadsheetId=self.spreadsheet_id,
-                range=f'A{next_row}:C{next_row}',
+                range=f'A{next_row}:D{next_row}',
                 valueInputOption='USER_ENTERED',
                 body={
-                    'values': [[timestamp, article, position]]
+                    'values': [[timestamp, article, position, search_query or '']]
                 }
             ).execute()
 
@@ -0,0 +1,235 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import log
+from config import settings
+
+# Границы корзин гистограмм длительности (в секундах)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Описание метрик: имя -> (тип, описание)
+DEFINITIONS = {
+    'wb_stage_duration_seconds': ('histogram', 'Длительность этапа проверки'),
+    'wb_pages_crawled_total': ('counter', 'Загружено страниц выдачи'),
+    'wb_items_scanned_total': ('counter', 'Просмотрено карточек товаров'),
+    'wb_page_cache_total': ('counter', 'Обращения к кэшу страниц по результату'),
+    'wb_config_cache_total': ('counter', 'Обращения к кэшу конфигурации по результату'),
+    'wb_retries_total': ('counter', 'Повторные попытки загрузки страниц'),
+    'wb_checks_total': ('counter', 'Проверки пар (артикул, запрос) по статусу'),
+    'wb_browser_memory_bytes': ('gauge', 'Память процессов браузера и драйвера Playwright'),
+    'wb_worker_memory_bytes': ('gauge', 'Память процесса воркера'),
+    'wb_browser_recycles_total': ('counter', 'Перезапуски браузера пула по причине'),
+    'wb_memory_recycles_total': ('counter', 'Очистки памяти по пределу'),
+    'wb_memory_reclaimed_bytes_total': ('counter', 'Память, освобожденная очистками и перезапусками браузера'),
+    'wb_memory_leak_warnings_total': ('counter', 'Предупреждения о возможной утечке памяти'),
+    'wb_pipeline_queue_depth': ('gauge', 'Результаты запросов в очереди конвейера перед сохранением'),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Metrics:
+    """
+    Метрики горячего пути в текстовом формате Prometheus.
+
+    Счетчики, гистограммы и датчики хранятся в памяти процесса и отдаются
+    HTTP-сервером воркера. При METRICS_ENABLED=False все методы возвращаются
+    сразу, не захватывая блокировку и не читая часы. Настройка читается при
+    каждом вызове, поэтому метрики можно включить после импорта модуля.
+    """
+
+    _counters: Dict[str, Dict[LabelKey, float]] = {}
+    _gauges: Dict[str, Dict[LabelKey, float]] = {}
+    _histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+    _callbacks: List[Callable[[], None]] = []
+    _lock = threading.Lock()
+    _server: Optional[ThreadingHTTPServer] = None
+
+    @classmethod
+    def inc(cls, name: str, value: float = 1, **labels) -> None:
+        """
+        Увеличивает счетчик.
+
+        Args:
+            name: Имя метрики
+            value: Приращение
+            **labels: Метки
+        """
+        if not settings.METRICS_ENABLED:
+            return
+        key = tuple(sorted(labels.items()))
+        with cls._lock:
+            series = cls._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    @classmethod
+    def set_gauge(cls, name: str, value: float, **labels) -> None:
+        """
+        Устанавливает значение датчика.
+
+        Args:
+            name: Имя метрики
+            value: Значение
+            **labels: Метки
+        """
+        if not settings.METRICS_ENABLED:
+            return
+        key = tuple(sorted(labels.items()))
+        with cls._lock:
+            cls._gauges.setdefault(name, {})[key] = value
+
+    @classmethod
+    def observe(cls, name: str, value: float, **labels) -> None:
+        """
+        Добавляет наблюдение в гистограмму.
+
+        Args:
+            name: Имя метрики
+            value: Наблюдаемое значение
+            **labels: Метки
+        """
+        if not settings.METRICS_ENABLED:
+            return
+        key = tuple(sorted(labels.items()))
+        with cls._lock:
+            series = cls._histograms.setdefault(name, {})
+            # Счетчики корзин, затем сумма и количество наблюдений
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * (len(DEFAULT_BUCKETS) + 2)
+            for index, bound in enumerate(DEFAULT_BUCKETS):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @classmethod
+    def timer(cls, stage: str):
+        """
+        Возвращает контекстный менеджер, измеряющий длительность этапа.
+
+        Args:
+            stage: Название этапа (goto, scroll, extract, sheets_append, ...)
+
+        Returns:
+            Контекстный менеджер; при выключенных метриках - пустой
+        """
+        if not settings.METRICS_ENABLED:
+            return nullcontext()
+        return cls._timer(stage)
+
+    @classmethod
+    @contextmanager
+    def _timer(cls, stage: str):
+        """Измеряет длительность блока и записывает ее в wb_stage_duration_seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.observe('wb_stage_duration_seconds', time.perf_counter() - started, stage=stage)
+
+    @classmethod
+    def register_callback(cls, callback: Callable[[], None]) -> None:
+        """
+        Регистрирует функцию, обновляющую датчики перед каждой выгрузкой метрик.
+
+        Args:
+            callback: Функция без аргументов
+        """
+        with cls._lock:
+            if callback not in cls._callbacks:
+                cls._callbacks.append(callback)
+
+    @classmethod
+    def render(cls) -> str:
+        """
+        Формирует текст метрик в формате Prometheus.
+
+        Returns:
+            Текст для выгрузки
+        """
+        for callback in list(cls._callbacks):
+            try:
+                callback()
+            except Exception as e:
+                log.debug(f"Ошибка при обновлении метрик: {e}")
+
+        lines = []
+        with cls._lock:
+            for kind, storage in (('counter', cls._counters), ('gauge', cls._gauges)):
+                for name, series in sorted(storage.items()):
+                    cls._header(lines, name, kind)
+                    for key, value in series.items():
+                        lines.append(f"{name}{cls._labels(key)} {value:g}")
+
+            for name, series in sorted(cls._histograms.items()):
+                cls._header(lines, name, 'histogram')
+                for key, state in series.items():
+                    for index, bound in enumerate(DEFAULT_BUCKETS):
+                        lines.append(f"{name}_bucket{cls._labels(key, le=f'{bound:g}')} {state[index]}")
+                    lines.append(f"{name}_bucket{cls._labels(key, le='+Inf')} {state[-1]}")
+                    lines.append(f"{name}_sum{cls._labels(key)} {state[-2]:g}")
+                    lines.append(f"{name}_count{cls._labels(key)} {state[-1]}")
+
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def start_server(cls, port: Optional[int] = None) -> None:
+        """
+        Запускает HTTP-сервер метрик (GET /metrics) в фоновом потоке.
+
+        Args:
+            port: Порт (по умолчанию settings.METRICS_PORT)
+        """
+        if not settings.METRICS_ENABLED or cls._server is not None:
+            return
+
+        port = port or settings.METRICS_PORT
+        cls._server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        thread = threading.Thread(target=cls._server.serve_forever, name="metrics-server", daemon=True)
+        thread.start()
+        log.info(f"Метрики доступны на порту {port} (/metrics)")
+
+    @staticmethod
+    def _header(lines: List[str], name: str, kind: str) -> None:
+        """Добавляет строки HELP и TYPE метрики."""
+        kind, description = DEFINITIONS.get(name, (kind, name))
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    @staticmethod
+    def _labels(key: LabelKey, **extra) -> str:
+        """Форматирует метки серии."""
+        pairs = list(key) + list(extra.items())
+        if not pairs:
+            return ""
+        body = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return "{" + body + "}"
+
+
+def _escape(value) -> str:
+    """Экранирует значение метки по правилам формата Prometheus."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Обработчик HTTP-запросов к метрикам."""
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+
+        body = Metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Запросы сборщика метрик не пишем в лог
+        return
@@ -0,0 +1,255 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from config import settings
+
+# Формат времени проверки (UTC) в результатах, таблице и хранилищах
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Размер интервала агрегации в секундах
+BUCKETS = {
+    'hour': 3600,
+    'day': 86400,
+}
+
+TimeValue = Union[str, datetime, int, float]
+
+
+def utc_now() -> str:
+    """
+    Возвращает текущее время проверки.
+
+    Returns:
+        Время UTC в формате TIMESTAMP_FORMAT
+    """
+    return datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def to_unix(value: TimeValue) -> int:
+    """
+    Приводит время к unix-времени в секундах.
+
+    Строки и datetime без часового пояса считаются временем UTC, как и интервалы
+    агрегации, поэтому результат не зависит от часового пояса сервера.
+
+    Args:
+        value: Строка TIMESTAMP_FORMAT (UTC), datetime или число секунд
+
+    Returns:
+        Unix-время в секундах
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.strptime(value, TIMESTAMP_FORMAT)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+class PositionStore:
+    """
+    Локальное хранилище истории позиций (только добавление записей).
+
+    Каждая проверка пары (артикул, запрос) сохраняется одной строкой SQLite
+    с индексами по артикулу, запросу и времени. При проверке в нескольких
+    регионах доставки результаты регионов хранятся рядом: строки с одним
+    временем проверки и разным значением region. Хранилище поддерживает выборку
+    по диапазону времени и агрегаты min/avg/max по часам и дням (UTC).
+    Сохранение результатов использует одно хранилище на процесс (instance()),
+    чтобы не настраивать файл SQLite при каждой записи.
+    """
+
+    _instance: Optional["PositionStore"] = None
+    _instance_pid: Optional[int] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Инициализация хранилища.
+
+        Args:
+            path: Путь к файлу SQLite (по умолчанию settings.POSITION_STORE_PATH)
+        """
+        self.path = path or settings.POSITION_STORE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS positions (
+                    id INTEGER PRIMARY KEY,
+                    ts INTEGER NOT NULL,
+                    article TEXT NOT NULL,
+                    search_query TEXT NOT NULL,
+                    position INTEGER,
+                    status TEXT NOT NULL,
+                    region TEXT NOT NULL DEFAULT ''
+                )
+            """)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(positions)")}
+            if 'region' not in columns:
+                # Хранилище, созданное до поддержки регионов
+                conn.execute("ALTER TABLE positions ADD COLUMN region TEXT NOT NULL DEFAULT ''")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_positions_article_query_ts "
+                         "ON positions (article, search_query, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_positions_query_ts "
+                         "ON positions (search_query, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_positions_ts ON positions (ts)")
+
+    @classmethod
+    def instance(cls) -> "PositionStore":
+        """
+        Возвращает хранилище текущего процесса.
+
+        Returns:
+            Экземпляр PositionStore
+        """
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance_pid != os.getpid():
+                cls._instance = cls()
+                cls._instance_pid = os.getpid()
+            return cls._instance
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открывает соединение с файлом хранилища."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def append(self, timestamp: TimeValue, article: str, search_query: str,
+               position: Optional[int], status: Optional[str] = None, region: Optional[str] = None) -> None:
+        """
+        Добавляет результат одной проверки.
+
+        Args:
+            timestamp: Время проверки
+            article: Артикул товара
+            search_query: Поисковый запрос
+            position: Позиция или None, если товар не найден
+            status: Статус проверки: "found", "not_found" или "error" (результат неизвестен
+                из-за ошибки); по умолчанию "found" или "not_found" по позиции
+            region: Регион доставки (None - регион по умолчанию)
+        """
+        self.append_many([(timestamp, article, search_query, position, status, region)])
+
+    def append_many(self, rows: Iterable[Tuple]) -> int:
+        """
+        Добавляет результаты нескольких проверок одной транзакцией.
+
+        Args:
+            rows: Кортежи (время, артикул, запрос, позиция[, статус[, регион]])
+
+        Returns:
+            Количество добавленных строк
+        """
+        records = []
+        for row in rows:
+            timestamp, article, search_query, position = row[:4]
+            status = row[4] if len(row) > 4 and row[4] else ('found' if position is not None else 'not_found')
+            region = row[5] if len(row) > 5 and row[5] else ''
+            records.append((to_unix(timestamp), article, search_query, position, status, region))
+
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO positions (ts, article, search_query, position, status, region) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                records
+            )
+        return len(records)
+
+    def query(self, article: Optional[str] = None, search_query: Optional[str] = None,
+              since: Optional[TimeValue] = None, until: Optional[TimeValue] = None,
+              limit: Optional[int] = None, region: Optional[str] = None) -> List[Dict]:
+        """
+        Возвращает историю проверок по фильтрам.
+
+        Args:
+            article: Артикул товара
+            search_query: Поисковый запрос
+            since: Начало интервала (включительно)
+            until: Конец интервала (не включительно)
+            limit: Максимальное число записей (самые свежие)
+            region: Регион доставки ("" - регион по умолчанию, None - все регионы)
+
+        Returns:
+            Список записей с полями ts, article, search_query, region, position, status
+            по возрастанию времени
+        """
+        where, params = self._where(article, search_query, since, until, region)
+        sql = (f"SELECT ts, article, search_query, region, position, status FROM positions {where} "
+               f"ORDER BY ts DESC")
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def aggregate(self, article: Optional[str] = None, search_query: Optional[str] = None,
+                  bucket: str = 'hour', since: Optional[TimeValue] = None,
+                  until: Optional[TimeValue] = None, region: Optional[str] = None) -> List[Dict]:
+        """
+        Возвращает агрегаты позиций по интервалам времени.
+
+        Args:
+            article: Артикул товара
+            search_query: Поисковый запрос
+            bucket: Интервал агрегации: "hour" или "day" (UTC)
+            since: Начало интервала (включительно)
+            until: Конец интервала (не включительно)
+            region: Регион доставки ("" - регион по умолчанию, None - все регионы)
+
+        Returns:
+            Список записей с полями bucket (unix-время начала интервала), article,
+            search_query, region, min, avg, max, checks (без проверок с ошибкой) и found
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"Неизвестный интервал агрегации: {bucket}")
+
+        size = BUCKETS[bucket]
+        where, params = self._where(article, search_query, since, until, region)
+        sql = f"""
+            SELECT ts - ts % {size} AS bucket, article, search_query, region,
+                   MIN(position) AS min, AVG(position) AS avg, MAX(position) AS max,
+                   SUM(status != 'error') AS checks, COUNT(position) AS found
+            FROM positions {where}
+            GROUP BY bucket, article, search_query, region
+            ORDER BY bucket, article, search_query, region
+        """
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _where(article: Optional[str], search_query: Optional[str],
+               since: Optional[TimeValue], until: Optional[TimeValue],
+               region: Optional[str] = None) -> Tuple[str, list]:
+        """Собирает условие WHERE по заданным фильтрам."""
+        conditions, params = [], []
+        if article is not None:
+            conditions.append("article = ?")
+            params.append(article)
+        if search_query is not None:
+            conditions.append("search_query = ?")
+            params.append(search_query)
+        if region is not None:
+            conditions.append("region = ?")
+            params.append(region)
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(to_unix(since))
+        if until is not None:
+            conditions.append("ts < ?")
+            params.append(to_unix(until))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
@@ -0,0 +1,30 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from config import settings
+
+if TYPE_CHECKING:
+    import redis
+
+_client: Optional["redis.Redis"] = None
+_client_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def get_redis() -> "redis.Redis":
+    """
+    Возвращает клиент Redis процесса (тот же Redis, что используется брокером Celery).
+
+    Returns:
+        Клиент Redis с пулом соединений
+    """
+    global _client, _client_pid
+    # Клиент Redis импортируется при первом обращении: справке и проверке без кэшей он не нужен
+    import redis
+
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=5)
+            _client_pid = os.getpid()
+        return _client
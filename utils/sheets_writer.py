@@ -0,0 +1,162 @@
+import threading
+import time
+from typing import List, Optional, Set, Union
+
+from utils import log
+from utils.google_sheets import GoogleSheetsClient
+from utils.metrics import Metrics
+from config import settings
+
+# Заголовок таблицы результатов (строка 2)
+HEADER = ['Время', 'Артикул', 'Позиция', 'Запрос']
+HEADER_RANGE = 'A2:D2'
+DATA_RANGE = 'A2:D'
+# Заголовок и диапазоны при проверке в нескольких регионах доставки (settings.WB_REGIONS)
+REGION_HEADER = HEADER + ['Регион']
+REGION_HEADER_RANGE = 'A2:E2'
+REGION_DATA_RANGE = 'A2:E'
+
+
+class BufferedSheetsWriter:
+    """
+    Буферизованная запись результатов проверок в Google Sheets.
+
+    Строки накапливаются в памяти и отправляются одним вызовом values.append:
+    при накоплении settings.SHEETS_FLUSH_SIZE строк, когда самая старая строка
+    ждет дольше settings.SHEETS_FLUSH_INTERVAL секунд, или при явном flush().
+    Заголовок проверяется один раз на таблицу за время жизни процесса.
+    """
+
+    # Таблицы, для которых заголовок уже проверен в этом процессе
+    _header_checked: Set[str] = set()
+    _header_lock = threading.Lock()
+
+    def __init__(self, client: Optional[GoogleSheetsClient] = None,
+                 max_rows: Optional[int] = None, max_delay: Optional[float] = None):
+        """
+        Инициализация буфера.
+
+        Args:
+            client: Клиент Google Sheets (по умолчанию создается новый)
+            max_rows: Размер буфера, при котором выполняется запись
+            max_delay: Максимальное время ожидания строки в буфере в секундах
+        """
+        self.client = client or GoogleSheetsClient()
+        self.max_rows = max_rows or settings.SHEETS_FLUSH_SIZE
+        self.max_delay = max_delay if max_delay is not None else settings.SHEETS_FLUSH_INTERVAL
+        self.rows: List[list] = []
+        self._first_row_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "BufferedSheetsWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.flush()
+
+    def add(self, timestamp: str, article: str, position: Union[int, str],
+            search_query: Optional[str] = None, region: Optional[str] = None) -> bool:
+        """
+        Добавляет результат проверки в буфер и записывает буфер, если пора.
+
+        Args:
+            timestamp: Время в формате строки
+            article: Артикул товара
+            position: Позиция в поисковой выдаче или текстовый статус
+            search_query: Поисковый запрос
+            region: Регион доставки; при заданных settings.WB_REGIONS пишется в столбец "Регион"
+
+        Returns:
+            bool: False, если запись буфера завершилась ошибкой
+        """
+        row = [timestamp, article, position, search_query or '']
+        if settings.WB_REGIONS:
+            row.append(region or '')
+
+        with self._lock:
+            if not self.rows:
+                self._first_row_at = time.monotonic()
+            self.rows.append(row)
+
+        return self.flush_if_due()
+
+    def flush_if_due(self) -> bool:
+        """
+        Записывает буфер, если он заполнен или строки ждут слишком долго.
+
+        Returns:
+            bool: False, если запись буфера завершилась ошибкой
+        """
+        with self._lock:
+            due = bool(self.rows) and (
+                len(self.rows) >= self.max_rows
+                or time.monotonic() - self._first_row_at >= self.max_delay
+            )
+
+        return self.flush() if due else True
+
+    def flush(self) -> bool:
+        """
+        Отправляет все накопленные строки одним вызовом values.append.
+
+        При ошибке строки остаются в буфере до следующей попытки.
+
+        Returns:
+            bool: Успешно ли записаны данные
+        """
+        with self._lock:
+            rows, self.rows = self.rows, []
+            first_row_at, self._first_row_at = self._first_row_at, None
+
+        if not rows:
+            return True
+
+        try:
+            self._ensure_header()
+            with Metrics.timer('sheets_append'):
+                self.client.service.spreadsheets().values().append(
+                    spreadsheetId=self.client.spreadsheet_id,
+                    range=REGION_DATA_RANGE if settings.WB_REGIONS else DATA_RANGE,
+                    valueInputOption='USER_ENTERED',
+                    insertDataOption='INSERT_ROWS',
+                    body={'values': rows}
+                ).execute()
+
+            log.info(f"В Google Sheets добавлено строк: {len(rows)}")
+            return True
+        except Exception as e:
+            log.error(f"Ошибка при добавлении данных в Google Sheets: {e}")
+            with self._lock:
+                self.rows = rows + self.rows
+                self._first_row_at = first_row_at
+            return False
+
+    def _ensure_header(self) -> None:
+        """Записывает заголовок в строку 2, если его там нет. Проверка кэшируется на таблицу."""
+        spreadsheet_id = self.client.spreadsheet_id
+        if spreadsheet_id in self._header_checked:
+            return
+
+        with self._header_lock:
+            if spreadsheet_id in self._header_checked:
+                return
+
+            if settings.WB_REGIONS:
+                header, header_range = REGION_HEADER, REGION_HEADER_RANGE
+            else:
+                header, header_range = HEADER, HEADER_RANGE
+
+            sheet_values = self.client.service.spreadsheets().values()
+            result = sheet_values.get(spreadsheetId=spreadsheet_id, range=header_range).execute()
+            values = result.get('values', [])
+
+            if not values or values[0][:len(header)] != header:
+                sheet_values.update(
+                    spreadsheetId=spreadsheet_id,
+                    range=header_range,
+                    valueInputOption='USER_ENTERED',
+                    body={'values': [header]}
+                ).execute()
+                log.info("Добавлен заголовок таблицы результатов")
+
+            self._header_checked.add(spreadsheet_id)
@@ -0,0 +1,312 @@
+import os
+import sqlite3
+import sys
+from array import array
+from bisect import bisect_left
+from contextlib import closing
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import settings
+from utils.position_store import TimeValue, to_unix
+
+# Артикулы хранятся как uint64, число товаров на страницах - как uint16 (little-endian)
+NM_ID_TYPECODE = "Q"
+PAGE_SIZE_TYPECODE = "H"
+
+
+def _pack(typecode: str, values: Iterable[int]) -> bytes:
+    """Упаковывает числа в little-endian массив."""
+    packed = array(typecode, values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(typecode: str, data: bytes) -> array:
+    """Распаковывает little-endian массив чисел."""
+    unpacked = array(typecode)
+    unpacked.frombytes(data)
+    if sys.byteorder != "little":
+        unpacked.byteswap()
+    return unpacked
+
+
+class Snapshot:
+    """
+    Упорядоченный топ выдачи по запросу на момент проверки.
+
+    Артикулы хранятся одним массивом в порядке выдачи: позиция товара - индекс
+    в массиве плюс один. Страница позиции восстанавливается по массиву числа
+    товаров на каждой странице. Словарь артикул -> позиция строится лениво при
+    первом поиске и позволяет отвечать на вопрос "где артикул X" за O(1).
+    """
+
+    def __init__(self, search_query: str, ts: int, nm_ids: array, page_sizes: array, region: str = ""):
+        """
+        Args:
+            search_query: Поисковый запрос
+            ts: Время снимка (unix)
+            nm_ids: Артикулы в порядке выдачи (0 - карточка без числового артикула)
+            page_sizes: Число товаров снимка на каждой странице
+            region: Регион доставки ("" - регион по умолчанию)
+        """
+        self.search_query = search_query
+        self.ts = ts
+        self.nm_ids = nm_ids
+        self.page_sizes = page_sizes
+        self.region = region
+        self._index: Optional[Dict[int, int]] = None
+        self._page_ends: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.nm_ids)
+
+    @property
+    def index(self) -> Dict[int, int]:
+        """Словарь артикул -> позиция (первое вхождение)."""
+        if self._index is None:
+            index = {}
+            for position, nm_id in enumerate(self.nm_ids, 1):
+                index.setdefault(nm_id, position)
+            self._index = index
+        return self._index
+
+    def position_of(self, article: str) -> Optional[int]:
+        """
+        Возвращает позицию артикула в снимке.
+
+        Args:
+            article: Артикул товара
+
+        Returns:
+            Позиция или None, если товара нет в топе
+        """
+        if not article.isdigit():
+            return None
+        return self.index.get(int(article))
+
+    def positions(self, articles: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        Возвращает позиции нескольких артикулов.
+
+        Args:
+            articles: Артикулы товаров
+
+        Returns:
+            Словарь артикул -> позиция или None
+        """
+        return {article: self.position_of(article) for article in articles}
+
+    def page_of(self, position: int) -> int:
+        """
+        Возвращает номер страницы выдачи для позиции.
+
+        Args:
+            position: Позиция в снимке (начиная с 1)
+
+        Returns:
+            Номер страницы (начиная с 1)
+        """
+        if self._page_ends is None:
+            self._page_ends = list(accumulate(self.page_sizes))
+        return bisect_left(self._page_ends, position) + 1
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """
+        Возвращает первые k товаров снимка.
+
+        Args:
+            k: Число товаров (по умолчанию весь снимок)
+
+        Returns:
+            Список (артикул, позиция, страница)
+        """
+        count = len(self.nm_ids) if k is None else min(k, len(self.nm_ids))
+        return [(str(self.nm_ids[index]), index + 1, self.page_of(index + 1)) for index in range(count)]
+
+    def diff(self, newer: "Snapshot", limit: Optional[int] = None) -> Dict[str, list]:
+        """
+        Сравнивает снимок с более новым снимком того же запроса.
+
+        Args:
+            newer: Более новый снимок
+            limit: Сравнивать только первые limit позиций обоих снимков
+
+        Returns:
+            Словарь:
+                entered - [(артикул, позиция)] товары, вошедшие в топ;
+                exited - [(артикул, прежняя позиция)] товары, выбывшие из топа;
+                moved - [(артикул, прежняя позиция, новая позиция)] по убыванию сдвига
+        """
+        old_count = len(self.nm_ids) if limit is None else min(limit, len(self.nm_ids))
+        new_count = len(newer.nm_ids) if limit is None else min(limit, len(newer.nm_ids))
+        old_index: Dict[int, int] = {}
+        for position, nm_id in enumerate(self.nm_ids[:old_count], 1):
+            old_index.setdefault(nm_id, position)
+
+        entered, moved = [], []
+        seen = set()
+        for position, nm_id in enumerate(newer.nm_ids[:new_count], 1):
+            if nm_id in seen or not nm_id:
+                continue
+            seen.add(nm_id)
+            previous = old_index.get(nm_id)
+            if previous is None:
+                entered.append((str(nm_id), position))
+            elif previous != position:
+                moved.append((str(nm_id), previous, position))
+
+        exited = [(str(nm_id), position) for nm_id, position in old_index.items()
+                  if nm_id and nm_id not in seen]
+        exited.sort(key=lambda item: item[1])
+        moved.sort(key=lambda item: -abs(item[2] - item[1]))
+
+        return {'entered': entered, 'exited': exited, 'moved': moved}
+
+
+class SnapshotStore:
+    """
+    Хранилище снимков топа выдачи по запросам.
+
+    Каждый снимок - одна строка SQLite: артикулы топа упакованы в массив uint64,
+    число товаров на страницах - в массив uint16. Для каждой пары (запрос, регион)
+    хранятся последние settings.SNAPSHOT_KEEP снимков.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Инициализация хранилища.
+
+        Args:
+            path: Путь к файлу SQLite (по умолчанию settings.SNAPSHOT_STORE_PATH)
+        """
+        self.path = path or settings.SNAPSHOT_STORE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY,
+                    search_query TEXT NOT NULL,
+                    region TEXT NOT NULL DEFAULT '',
+                    ts INTEGER NOT NULL,
+                    nm_ids BLOB NOT NULL,
+                    page_sizes BLOB NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_query_region_ts "
+                         "ON snapshots (search_query, region, ts)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открывает соединение с файлом хранилища."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def save(self, timestamp: TimeValue, search_query: str, nm_ids: Iterable[str],
+             page_sizes: Iterable[int], region: Optional[str] = None) -> Snapshot:
+        """
+        Сохраняет снимок топа выдачи и удаляет снимки сверх settings.SNAPSHOT_KEEP.
+
+        Args:
+            timestamp: Время проверки
+            search_query: Поисковый запрос
+            nm_ids: Артикулы в порядке выдачи
+            page_sizes: Число товаров снимка на каждой странице
+            region: Регион доставки (None - регион по умолчанию)
+
+        Returns:
+            Сохраненный снимок
+        """
+        region = region or ""
+        snapshot = Snapshot(
+            search_query, to_unix(timestamp),
+            array(NM_ID_TYPECODE, (int(nm_id) if nm_id.isdigit() else 0 for nm_id in nm_ids)),
+            array(PAGE_SIZE_TYPECODE, page_sizes),
+            region
+        )
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO snapshots (search_query, region, ts, nm_ids, page_sizes) VALUES (?, ?, ?, ?, ?)",
+                (search_query, region, snapshot.ts, _pack(NM_ID_TYPECODE, snapshot.nm_ids),
+                 _pack(PAGE_SIZE_TYPECODE, snapshot.page_sizes))
+            )
+            conn.execute("""
+                DELETE FROM snapshots
+                WHERE search_query = ? AND region = ? AND id NOT IN (
+                    SELECT id FROM snapshots WHERE search_query = ? AND region = ?
+                    ORDER BY ts DESC, id DESC LIMIT ?
+                )
+            """, (search_query, region, search_query, region, settings.SNAPSHOT_KEEP))
+
+        return snapshot
+
+    def latest(self, search_query: str, region: Optional[str] = None, count: int = 1) -> List[Snapshot]:
+        """
+        Возвращает последние снимки запроса.
+
+        Args:
+            search_query: Поисковый запрос
+            region: Регион доставки (None - регион по умолчанию)
+            count: Число снимков
+
+        Returns:
+            Снимки от нового к старому
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT search_query, region, ts, nm_ids, page_sizes FROM snapshots "
+                "WHERE search_query = ? AND region = ? ORDER BY ts DESC, id DESC LIMIT ?",
+                (search_query, region or "", count)
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def at(self, search_query: str, timestamp: TimeValue, region: Optional[str] = None) -> Optional[Snapshot]:
+        """
+        Возвращает последний снимок запроса, сделанный не позже заданного времени.
+
+        Args:
+            search_query: Поисковый запрос
+            timestamp: Время
+            region: Регион доставки (None - регион по умолчанию)
+
+        Returns:
+            Снимок или None
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT search_query, region, ts, nm_ids, page_sizes FROM snapshots "
+                "WHERE search_query = ? AND region = ? AND ts <= ? ORDER BY ts DESC, id DESC LIMIT 1",
+                (search_query, region or "", to_unix(timestamp))
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def diff_latest(self, search_query: str, region: Optional[str] = None,
+                    limit: Optional[int] = None) -> Optional[Dict[str, list]]:
+        """
+        Сравнивает два последних снимка запроса.
+
+        Args:
+            search_query: Поисковый запрос
+            region: Регион доставки (None - регион по умолчанию)
+            limit: Сравнивать только первые limit позиций
+
+        Returns:
+            Результат Snapshot.diff или None, если снимков меньше двух
+        """
+        snapshots = self.latest(search_query, region, count=2)
+        if len(snapshots) < 2:
+            return None
+        newer, older = snapshots
+        return older.diff(newer, limit)
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Snapshot:
+        """Восстанавливает снимок из строки таблицы."""
+        return Snapshot(row['search_query'], row['ts'], _unpack(NM_ID_TYPECODE, row['nm_ids']),
+                        _unpack(PAGE_SIZE_TYPECODE, row['page_sizes']), row['region'])